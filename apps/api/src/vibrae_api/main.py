@@ -6,18 +6,25 @@ import asyncio
 import time
 import os
 from vibrae_core.config import Settings
-from vibrae_core.player import Player
+from vibrae_core.library import SceneLibrary
 from vibrae_core.scheduler import Scheduler
-from vibrae_core.db import Base, engine
+from vibrae_core.zones import ZoneManager
+from vibrae_core.db import async_engine
+from vibrae_core.migrations import migrate
 from vibrae_core.logging_config import configure_logging
-from .routes import users, scenes, schedule, logs, control
+from .routes import users, scenes, schedule, logs, control, zones as zone_routes
 
 logger = logging.getLogger("vibrae_api")
 
 configure_logging()
 settings = Settings()
-player = Player(settings.effective_music_base())
-scheduler = Scheduler(player=player)
+zones = ZoneManager(
+    settings.effective_music_base(),
+    scenes=SceneLibrary(max_depth=settings.effective_scan_depth(), symlinks=settings.scan_symlinks),
+    snapshot_dir=settings.effective_snapshot_dir(),
+)
+player = zones.default
+scheduler = Scheduler(player=player, zones=zones)
 
 app = FastAPI(title="Vibrae API", version="0.1.0")
 
@@ -51,6 +58,7 @@ api_router.include_router(scenes.router)
 api_router.include_router(schedule.router)
 api_router.include_router(logs.router)
 api_router.include_router(control.router)
+api_router.include_router(zone_routes.router)
 app.include_router(api_router)
 
 # Legacy root (non /api) paths still included for backward compatibility
@@ -59,10 +67,13 @@ app.include_router(scenes.router)
 app.include_router(schedule.router)
 app.include_router(logs.router)
 app.include_router(control.router)
+app.include_router(zone_routes.router)
 
 @app.on_event("startup")
 async def on_startup():
-    Base.metadata.create_all(bind=engine)
+    migrate()
+    zones.load()
+    zones.resume()
     loop = asyncio.get_event_loop()
     from .routes.control import set_main_loop
     set_main_loop(loop)
@@ -75,6 +86,9 @@ async def on_shutdown():
         scheduler.stop_background()
     except Exception:  # pragma: no cover
         pass
+    zones.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
     logger.info("api.stop")
 
 @app.get("/health")
@@ -97,5 +111,5 @@ async def api_health():
         "version": app.version,
     }
 
-__all__ = ["app", "player", "scheduler", "settings"]
+__all__ = ["app", "player", "scheduler", "settings", "zones"]
 
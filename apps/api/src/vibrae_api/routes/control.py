@@ -1,9 +1,12 @@
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Depends, status
-import logging
 import asyncio
+import logging
 from typing import Optional, Set
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
 from vibrae_core.auth import decode_token, get_current_user
-from vibrae_core.player import register_player_listener, unregister_player_listener
+from vibrae_core.player import register_zone_listener
+
+from .zones import resolve_zone
 
 router = APIRouter(prefix="/control", tags=["control"])
 api_log = logging.getLogger("vibrae_api")
@@ -30,50 +33,69 @@ def notify_ws_clients_threadsafe(data):
         return
     asyncio.run_coroutine_threadsafe(notify_ws_clients(data), main_loop)
 
-def _player_listener(song: Optional[str], volume: Optional[int]):
-    notify_ws_clients_threadsafe({"type": "now_playing", "now_playing": song})
+def _zone_payload(data: dict, zone: Optional[int]) -> dict:
+    # Default-zone messages keep their legacy shape; other zones are tagged.
+    if zone is not None:
+        data["zone"] = zone
+    return data
+
+def _player_listener(zone: Optional[int], song: Optional[str], volume: Optional[int]):
+    notify_ws_clients_threadsafe(_zone_payload({"type": "now_playing", "now_playing": song}, zone))
     if volume is not None:
-        notify_ws_clients_threadsafe({"type": "volume", "volume": volume})
+        notify_ws_clients_threadsafe(_zone_payload({"type": "volume", "volume": volume}, zone))
+
+register_zone_listener(_player_listener)
 
-register_player_listener(_player_listener)
+def _zone_player(zone: Optional[int]):
+    from apps.api.src.vibrae_api.main import zones
+    zone_id = resolve_zone(zone)
+    return zone_id, zones.get(zone_id)
 
 @router.post("/volume")
-def set_volume(level: int, user = Depends(get_current_user)):
+def set_volume(level: int, zone: Optional[int] = None, user = Depends(get_current_user)):
     if not (0 <= level <= 100):
         raise HTTPException(status_code=400, detail="Volume must be 0-100")
-    from apps.api.src.vibrae_api.main import player
+    zone_id, player = _zone_player(zone)
     player.set_volume(level)
-    notify_ws_clients_threadsafe({"type": "volume", "volume": level})
-    api_log.info("control.volume level=%d actor=%s", level, getattr(user, "username", "?"))
+    notify_ws_clients_threadsafe(_zone_payload({"type": "volume", "volume": level}, zone_id))
+    api_log.info("control.volume level=%d zone=%s actor=%s", level, zone_id, getattr(user, "username", "?"))
     return {"status": "ok", "volume": level}
 
 @router.post("/stop")
-def stop_music(user = Depends(get_current_user)):
-    from apps.api.src.vibrae_api.main import player
+def stop_music(zone: Optional[int] = None, user = Depends(get_current_user)):
+    zone_id, player = _zone_player(zone)
     player.stop()
-    notify_ws_clients_threadsafe({"type": "now_playing", "now_playing": None})
-    api_log.info("control.stop actor=%s", getattr(user, "username", "?"))
+    notify_ws_clients_threadsafe(_zone_payload({"type": "now_playing", "now_playing": None}, zone_id))
+    api_log.info("control.stop zone=%s actor=%s", zone_id, getattr(user, "username", "?"))
     return {"status": "ok", "message": "Music stopped"}
 
 @router.post("/now_playing")
-def get_now_playing(user = Depends(get_current_user)):
-    from apps.api.src.vibrae_api.main import player
-    api_log.info("control.now_playing actor=%s", getattr(user, "username", "?"))
+def get_now_playing(zone: Optional[int] = None, user = Depends(get_current_user)):
+    zone_id, player = _zone_player(zone)
+    api_log.info("control.now_playing zone=%s actor=%s", zone_id, getattr(user, "username", "?"))
     return {"now_playing": player.get_now_playing()}
 
 @router.post("/get_volume")
-def get_volume(user = Depends(get_current_user)):
-    from apps.api.src.vibrae_api.main import player
-    api_log.info("control.get_volume actor=%s", getattr(user, "username", "?"))
+def get_volume(zone: Optional[int] = None, user = Depends(get_current_user)):
+    zone_id, player = _zone_player(zone)
+    api_log.info("control.get_volume zone=%s actor=%s", zone_id, getattr(user, "username", "?"))
     return {"volume": player.get_volume()}
 
+@router.get("/metrics/playback")
+def playback_metrics(zone: Optional[int] = None, user = Depends(get_current_user)):
+    zone_id, player = _zone_player(zone)
+    api_log.info("control.metrics.playback zone=%s actor=%s", zone_id, getattr(user, "username", "?"))
+    return player.get_playback_metrics()
+
 @router.post("/resume")
-def resume_schedule(user = Depends(get_current_user)):
-    from apps.api.src.vibrae_api.main import scheduler, player
-    scheduler.resume_if_should_play()
-    notify_ws_clients_threadsafe({"type": "now_playing", "now_playing": player.get_now_playing()})
-    notify_ws_clients_threadsafe({"type": "volume", "volume": player.get_volume()})
-    api_log.info("control.resume actor=%s", getattr(user, "username", "?"))
+def resume_schedule(zone: Optional[int] = None, user = Depends(get_current_user)):
+    from apps.api.src.vibrae_api.main import scheduler
+    zone_id, player = _zone_player(zone)
+    # Without a zone every zone resumes; with one only that zone does.
+    scheduler.resume_if_should_play(zone_id, all_zones=zone is None)
+    notify_ws_clients_threadsafe(_zone_payload({"type": "now_playing", "now_playing": player.get_now_playing()}, zone_id))
+    notify_ws_clients_threadsafe(_zone_payload({"type": "volume", "volume": player.get_volume()}, zone_id))
+    api_log.info("control.resume zone=%s actor=%s", zone_id, getattr(user, "username", "?"))
     return {"status": "ok", "message": "Schedule resumed if applicable"}
 
 @router.get("/status")
@@ -3,9 +3,8 @@ import logging
 from pydantic import BaseModel
 from typing import Optional
 import os
-from sqlalchemy.orm import Session
-from vibrae_core.auth import get_current_user
-from vibrae_core.db import SessionLocal
+from sqlalchemy import select
+from vibrae_core.auth import get_async_db as get_db, get_current_user_async as get_current_user
 from vibrae_core.models import Scene
 
 router = APIRouter(prefix="/scenes", tags=["scenes"])
@@ -14,13 +13,6 @@ log = logging.getLogger("vibrae_api")
 MUSIC_DIR_ENV = os.getenv("MUSIC_DIR") or "music"
 MUSIC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../../", MUSIC_DIR_ENV))
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 class SceneCreateRequest(BaseModel):
     name: str
     path: str
@@ -29,9 +21,13 @@ class SceneUpdateRequest(BaseModel):
     name: Optional[str] = None
     path: Optional[str] = None
 
+def _schedule_changed():
+    from apps.api.src.vibrae_api.main import scheduler
+    scheduler.notify_schedule_changed()
+
 @router.get("/")
-def list_scenes(user = Depends(get_current_user), db: Session = Depends(get_db)):
-    items = db.query(Scene).all()
+async def list_scenes(user = Depends(get_current_user), db = Depends(get_db)):
+    items = (await db.execute(select(Scene))).scalars().all()
     log.info("scenes.list count=%d actor=%s", len(items), getattr(user, "username", "?"))
     return items
 
@@ -46,28 +42,29 @@ def list_music_folders(user = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/")
-def create_scene(data: SceneCreateRequest, user = Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_scene(data: SceneCreateRequest, user = Depends(get_current_user), db = Depends(get_db)):
     scene = Scene(name=data.name, path=data.path)
     db.add(scene)
-    db.commit()
-    db.refresh(scene)
+    await db.commit()
+    await db.refresh(scene)
     log.info("scenes.create id=%s name=%s actor=%s", scene.id, scene.name, getattr(user, "username", "?"))
     return scene
 
 @router.delete("/{scene_id}/")
-def delete_scene(scene_id: int, user = Depends(get_current_user), db: Session = Depends(get_db)):
-    scene = db.query(Scene).filter(Scene.id == scene_id).first()
+async def delete_scene(scene_id: int, user = Depends(get_current_user), db = Depends(get_db)):
+    scene = await db.get(Scene, scene_id)
     if not scene:
         log.warning("scenes.delete not_found id=%s actor=%s", scene_id, getattr(user, "username", "?"))
         raise HTTPException(status_code=404, detail="Scene not found")
-    db.delete(scene)
-    db.commit()
+    await db.delete(scene)
+    await db.commit()
+    _schedule_changed()
     log.info("scenes.delete ok id=%s actor=%s", scene_id, getattr(user, "username", "?"))
     return {"status": "deleted"}
 
 @router.put("/{scene_id}/")
-def update_scene(scene_id: int, update: SceneUpdateRequest, user = Depends(get_current_user), db: Session = Depends(get_db)):
-    scene = db.query(Scene).filter(Scene.id == scene_id).first()
+async def update_scene(scene_id: int, update: SceneUpdateRequest, user = Depends(get_current_user), db = Depends(get_db)):
+    scene = await db.get(Scene, scene_id)
     if not scene:
         log.warning("scenes.update not_found id=%s actor=%s", scene_id, getattr(user, "username", "?"))
         raise HTTPException(status_code=404, detail="Scene not found")
@@ -75,7 +72,8 @@ def update_scene(scene_id: int, update: SceneUpdateRequest, user = Depends(get_c
         scene.name = update.name
     if update.path is not None:
         scene.path = update.path
-    db.commit()
-    db.refresh(scene)
+    await db.commit()
+    await db.refresh(scene)
+    _schedule_changed()
     log.info("scenes.update ok id=%s actor=%s", scene.id, getattr(user, "username", "?"))
     return scene
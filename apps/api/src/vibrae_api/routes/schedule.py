@@ -1,22 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
 import logging
-from pydantic import BaseModel
-from typing import Optional
-from sqlalchemy.orm import Session
-from vibrae_core.auth import get_current_user
-from vibrae_core.db import SessionLocal
+from dataclasses import asdict
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import select
+from vibrae_core.auth import get_async_db as get_db
+from vibrae_core.auth import get_current_user_async as get_current_user
 from vibrae_core.models import Routine
+from vibrae_core.routine_index import find_conflicts
+
+from .zones import resolve_zone
 
 router = APIRouter(prefix="/schedule", tags=["schedule"])
 log = logging.getLogger("vibrae_api")
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 class RoutineCreateRequest(BaseModel):
     scene_id: int
     start_time: str
@@ -24,6 +23,21 @@ class RoutineCreateRequest(BaseModel):
     weekdays: str
     months: str
     volume: int
+    zone_id: Optional[int] = None
+    priority: int = 0
+
+class RoutineResponse(BaseModel):
+    # Times and day/month lists in the "08:00" / "mon,tue" form the web app uses.
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    scene_id: Optional[int] = None
+    zone_id: Optional[int] = None
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    weekdays: Optional[str] = None
+    months: Optional[str] = None
+    volume: Optional[int] = None
+    priority: Optional[int] = None
 
 class RoutineUpdateRequest(BaseModel):
     scene_id: Optional[int] = None
@@ -32,59 +46,111 @@ class RoutineUpdateRequest(BaseModel):
     weekdays: Optional[str] = None
     months: Optional[str] = None
     volume: Optional[int] = None
+    zone_id: Optional[int] = None  # 0 moves the routine back to the default zone
+    priority: Optional[int] = None
+
+def _schedule_changed():
+    from apps.api.src.vibrae_api.main import scheduler
+    scheduler.notify_schedule_changed()
 
-@router.get("/")
-def list_routines(user = Depends(get_current_user), db: Session = Depends(get_db)):
-    items = db.query(Routine).all()
+@router.get("/", response_model=List[RoutineResponse])
+async def list_routines(
+    scene_id: Optional[int] = None,
+    zone: Optional[int] = None,
+    at: Optional[datetime] = None,
+    user = Depends(get_current_user),
+    db = Depends(get_db),
+):
+    """Routines, optionally only those of a scene, a zone (0 = default) or whose window contains ``at``."""
+    query = select(Routine).order_by(Routine.id)
+    if scene_id is not None:
+        query = query.where(Routine.scene_id == scene_id)
+    if zone is not None:
+        zone_id = resolve_zone(zone)
+        query = query.where(Routine.zone_id == zone_id if zone_id is not None else Routine.zone_id.is_(None))
+    if at is not None:
+        query = query.where(Routine.active_at(at))
+    items = (await db.execute(query)).scalars().all()
     log.info("schedule.list count=%d actor=%s", len(items), getattr(user, "username", "?"))
     return items
 
-@router.post("/")
-def create_routine(data: RoutineCreateRequest, user = Depends(get_current_user), db: Session = Depends(get_db)):
-    routine = Routine(
-        scene_id=data.scene_id,
-        start_time=data.start_time,
-        end_time=data.end_time,
-        weekdays=data.weekdays,
-        months=data.months,
-        volume=data.volume,
-    )
+@router.get("/conflicts")
+async def list_conflicts(user = Depends(get_current_user), db = Depends(get_db)):
+    """Overlapping routine pairs per zone, with the routine that plays in each overlap."""
+    conflicts = [asdict(c) for c in find_conflicts((await db.execute(select(Routine))).scalars().all())]
+    log.info("schedule.conflicts count=%d actor=%s", len(conflicts), getattr(user, "username", "?"))
+    return conflicts
+
+@router.get("/forecast")
+def forecast(days: int = Query(7, ge=1, le=366), zone: Optional[int] = None, user = Depends(get_current_user)):
+    """Routine, scene and volume segments (gaps included) from now for ``days`` days."""
+    from apps.api.src.vibrae_api.main import scheduler
+    zone = resolve_zone(zone)
+    segments = scheduler.routine_index().forecast(scheduler.clock.now(), days, zone)
+    log.info("schedule.forecast days=%d zone=%s segments=%d actor=%s", days, zone, len(segments), getattr(user, "username", "?"))
+    return [asdict(s) for s in segments]
+
+@router.post("/", response_model=RoutineResponse)
+async def create_routine(data: RoutineCreateRequest, user = Depends(get_current_user), db = Depends(get_db)):
+    try:
+        routine = Routine(
+            scene_id=data.scene_id,
+            start_time=data.start_time,
+            end_time=data.end_time,
+            weekdays=data.weekdays,
+            months=data.months,
+            volume=data.volume,
+            zone_id=resolve_zone(data.zone_id),
+            priority=data.priority,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     db.add(routine)
-    db.commit()
-    db.refresh(routine)
+    await db.commit()
+    await db.refresh(routine)
+    _schedule_changed()
     log.info("schedule.create id=%s actor=%s", routine.id, getattr(user, "username", "?"))
     return routine
 
-@router.put("/{routine_id}")
-def update_routine(routine_id: int, update: RoutineUpdateRequest, user = Depends(get_current_user), db: Session = Depends(get_db)):
-    routine = db.query(Routine).filter(Routine.id == routine_id).first()
+@router.put("/{routine_id}", response_model=RoutineResponse)
+async def update_routine(routine_id: int, update: RoutineUpdateRequest, user = Depends(get_current_user), db = Depends(get_db)):
+    routine = await db.get(Routine, routine_id)
     if not routine:
         log.warning("schedule.update not_found id=%s actor=%s", routine_id, getattr(user, "username", "?"))
         raise HTTPException(status_code=404, detail="Routine not found")
     if update.scene_id is not None:
         routine.scene_id = update.scene_id
-    if update.start_time is not None:
-        routine.start_time = update.start_time
-    if update.end_time is not None:
-        routine.end_time = update.end_time
-    if update.weekdays is not None:
-        routine.weekdays = update.weekdays if update.weekdays != "" else None
-    if update.months is not None:
-        routine.months = update.months if update.months != "" else None
+    try:
+        if update.start_time is not None:
+            routine.start_time = update.start_time
+        if update.end_time is not None:
+            routine.end_time = update.end_time
+        if update.weekdays is not None:
+            routine.weekdays = update.weekdays if update.weekdays != "" else None
+        if update.months is not None:
+            routine.months = update.months if update.months != "" else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     if update.volume is not None:
         routine.volume = update.volume
-    db.commit()
-    db.refresh(routine)
+    if update.zone_id is not None:
+        routine.zone_id = resolve_zone(update.zone_id)
+    if update.priority is not None:
+        routine.priority = update.priority
+    await db.commit()
+    await db.refresh(routine)
+    _schedule_changed()
     log.info("schedule.update ok id=%s actor=%s", routine.id, getattr(user, "username", "?"))
     return routine
 
 @router.delete("/{routine_id}/")
-def delete_routine(routine_id: int, user = Depends(get_current_user), db: Session = Depends(get_db)):
-    routine = db.query(Routine).filter(Routine.id == routine_id).first()
+async def delete_routine(routine_id: int, user = Depends(get_current_user), db = Depends(get_db)):
+    routine = await db.get(Routine, routine_id)
     if not routine:
         log.warning("schedule.delete not_found id=%s actor=%s", routine_id, getattr(user, "username", "?"))
         raise HTTPException(status_code=404, detail="Routine not found")
-    db.delete(routine)
-    db.commit()
+    await db.delete(routine)
+    await db.commit()
+    _schedule_changed()
     log.info("schedule.delete ok id=%s actor=%s", routine_id, getattr(user, "username", "?"))
     return {"status": "deleted"}
@@ -1,20 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, Form, Request
 import logging
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from typing import Optional
+import asyncio
 import os
-from vibrae_core.db import SessionLocal
 from vibrae_core.models import User
 from vibrae_core.auth import (
+    authenticate_user_async,
     hash_password,
-    verify_password,
     create_access_token,
     decode_token,
     ExpiredSignatureError,
     JWTError,
     oauth2_scheme,
-    get_current_user,
+    get_async_db as get_db,
 )
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -23,13 +23,6 @@ auth_log = logging.getLogger("vibrae_api.auth")
 
 ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 class UserCreateRequest(BaseModel):
     username: str
     password: str
@@ -41,19 +34,19 @@ class UserLoginRequest(BaseModel):
 
 @router.post("/")
 @router.post("", include_in_schema=False)
-def create_user(request: UserCreateRequest, db: Session = Depends(get_db)):
-    first_userless = db.query(User).first() is None
+async def create_user(request: UserCreateRequest, db = Depends(get_db)):
+    first_userless = (await db.execute(select(User.id).limit(1))).first() is None
     if not first_userless:
         if not ADMIN_TOKEN or request.admin_token != ADMIN_TOKEN:
             auth_log.warning("user.create denied: invalid admin token for username=%s", request.username)
             raise HTTPException(status_code=403, detail="Invalid admin token")
-    if db.query(User).filter(User.username == request.username).first():
+    if (await db.execute(select(User.id).where(User.username == request.username))).first():
         log.warning("user.create conflict: username exists username=%s", request.username)
         raise HTTPException(status_code=400, detail="Username already exists")
-    user = User(username=request.username, password_hash=hash_password(request.password))
+    user = User(username=request.username, password_hash=await asyncio.to_thread(hash_password, request.password))
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     log.info("user.create ok: id=%s username=%s", user.id, user.username)
     return {"id": user.id, "username": user.username}
 
@@ -61,7 +54,7 @@ def create_user(request: UserCreateRequest, db: Session = Depends(get_db)):
 @router.post("/login/", include_in_schema=False)
 async def login(
     request: Request,
-    db: Session = Depends(get_db),
+    db = Depends(get_db),
     username: Optional[str] = Form(None),
     password: Optional[str] = Form(None),
 ):
@@ -76,8 +69,8 @@ async def login(
     if not username or not password:
         raise HTTPException(status_code=400, detail="Missing credentials")
 
-    user = db.query(User).filter(User.username == username).first()
-    if not user or not verify_password(password, user.password_hash):
+    user = await authenticate_user_async(username, password, db)
+    if not user:
         auth_log.warning("user.login fail: username=%s", username)
         raise HTTPException(status_code=401, detail="Login no válido")
 
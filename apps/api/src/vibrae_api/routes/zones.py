@@ -0,0 +1,89 @@
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from vibrae_core.auth import get_current_user, get_db
+from vibrae_core.models import Routine, Zone
+
+router = APIRouter(prefix="/zones", tags=["zones"])
+log = logging.getLogger("vibrae_api")
+
+def resolve_zone(zone_id: Optional[int]) -> Optional[int]:
+    """Zone a request names: 0 and None are the default zone, unknown ids are rejected with 422."""
+    from apps.api.src.vibrae_api.main import zones
+    zone_id = zone_id or None
+    if zones.get(zone_id) is None:
+        raise HTTPException(status_code=422, detail=f"Unknown zone {zone_id}")
+    return zone_id
+
+class ZoneCreateRequest(BaseModel):
+    name: str
+    audio_device: Optional[str] = None
+
+class ZoneUpdateRequest(BaseModel):
+    name: Optional[str] = None
+    audio_device: Optional[str] = None
+
+def _reload_players(db: Session):
+    from apps.api.src.vibrae_api.main import zones
+    zones.sync(db.query(Zone).all())
+
+@router.get("/")
+def list_zones(user = Depends(get_current_user)):
+    from apps.api.src.vibrae_api.main import zones
+    items = [
+        {
+            "id": zone_id,
+            "name": zones.name(zone_id),
+            "audio_device": player.audio_device,
+            "now_playing": player.get_now_playing(),
+            "volume": player.get_volume(),
+            "playing": player.is_playing(),
+        }
+        for zone_id, player in zones.items()
+    ]
+    log.info("zones.list count=%d actor=%s", len(items), getattr(user, "username", "?"))
+    return items
+
+@router.post("/")
+def create_zone(data: ZoneCreateRequest, user = Depends(get_current_user), db: Session = Depends(get_db)):
+    zone = Zone(name=data.name, audio_device=data.audio_device or None)
+    db.add(zone)
+    db.commit()
+    db.refresh(zone)
+    _reload_players(db)
+    log.info("zones.create id=%s name=%s actor=%s", zone.id, zone.name, getattr(user, "username", "?"))
+    return zone
+
+@router.put("/{zone_id}/")
+def update_zone(zone_id: int, update: ZoneUpdateRequest, user = Depends(get_current_user), db: Session = Depends(get_db)):
+    zone = db.query(Zone).filter(Zone.id == zone_id).first()
+    if not zone:
+        log.warning("zones.update not_found id=%s actor=%s", zone_id, getattr(user, "username", "?"))
+        raise HTTPException(status_code=404, detail="Zone not found")
+    if update.name is not None:
+        zone.name = update.name
+    if update.audio_device is not None:
+        zone.audio_device = update.audio_device if update.audio_device != "" else None
+    db.commit()
+    db.refresh(zone)
+    _reload_players(db)
+    log.info("zones.update ok id=%s actor=%s", zone.id, getattr(user, "username", "?"))
+    return zone
+
+@router.delete("/{zone_id}/")
+def delete_zone(zone_id: int, user = Depends(get_current_user), db: Session = Depends(get_db)):
+    zone = db.query(Zone).filter(Zone.id == zone_id).first()
+    if not zone:
+        log.warning("zones.delete not_found id=%s actor=%s", zone_id, getattr(user, "username", "?"))
+        raise HTTPException(status_code=404, detail="Zone not found")
+    if db.query(Routine).filter(Routine.zone_id == zone_id).count():
+        log.warning("zones.delete in_use id=%s actor=%s", zone_id, getattr(user, "username", "?"))
+        raise HTTPException(status_code=409, detail="Zone has routines")
+    db.delete(zone)
+    db.commit()
+    _reload_players(db)
+    log.info("zones.delete ok id=%s actor=%s", zone_id, getattr(user, "username", "?"))
+    return {"status": "deleted"}
@@ -1,25 +1,32 @@
 """Authentication helpers."""
 
 # Standard library
+import asyncio
 import logging
 import warnings
 import os
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, Dict, Iterator
+from typing import AsyncIterator, Optional, Dict, Iterator
 
 # Third-party
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError, ExpiredSignatureError
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 # Local
-from vibrae_core.db import SessionLocal
+from vibrae_core.db import AsyncSessionLocal, SessionLocal
 from vibrae_core.models import User
 from vibrae_core.config import Settings
 
+try:
+    from sqlalchemy.ext.asyncio import AsyncSession
+except ImportError:  # pragma: no cover - needs greenlet (sqlalchemy[asyncio]); see vibrae_core.db
+    AsyncSession = None
+
 
 try:  # Optional dependency; provide lightweight fallback for test environments
     from passlib.context import CryptContext  # type: ignore
@@ -119,6 +126,16 @@ def authenticate_user(username: str, password: str, db: Session) -> Optional[Use
         return None
     return user
 
+
+async def authenticate_user_async(username: str, password: str, db) -> Optional[User]:
+    """``authenticate_user`` on an ``AsyncSession``; the password hash is checked off the event loop."""
+    user = (await db.execute(select(User).where(User.username == username))).scalars().first()
+    if not user:
+        return None
+    if not await asyncio.to_thread(verify_password, password, getattr(user, "password_hash", "")):
+        return None
+    return user
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a signed JWT access token containing ``data``.
 
@@ -158,8 +175,15 @@ def get_db() -> Iterator[Session]:
         db.close()
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """Resolve the current user from a bearer token."""
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Yield an asyncio session (``vibrae_core.db.AsyncSessionLocal``) and close it after use."""
+    if AsyncSessionLocal is None:  # pragma: no cover
+        raise RuntimeError("async database layer unavailable: install sqlalchemy[asyncio] and aiosqlite")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _token_subject(token: str) -> str:
     try:
         payload = decode_token(token)
     except ExpiredSignatureError:
@@ -173,8 +197,10 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     if not username:
         logging.getLogger("vibrae_api.auth").warning("auth.token missing_sub")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token: no subject")
+    return username
 
-    user = db.query(User).filter(User.username == username).first()
+
+def _checked_user(user: Optional[User], username: str) -> User:
     if not user:
         logging.getLogger("vibrae_api.auth").warning("auth.user not_found sub=%s", username)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token: user not found")
@@ -182,6 +208,19 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     return user
 
 
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    """Resolve the current user from a bearer token."""
+    username = _token_subject(token)
+    return _checked_user(db.query(User).filter(User.username == username).first(), username)
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
+    """``get_current_user`` on the event loop: no threadpool worker per request."""
+    username = _token_subject(token)
+    user = (await db.execute(select(User).where(User.username == username))).scalars().first()
+    return _checked_user(user, username)
+
+
 __all__ = [
     "verify_password",
     "hash_password",
@@ -191,5 +230,8 @@ __all__ = [
     "decode_token",
     "oauth2_scheme",
     "get_db",
+    "get_async_db",
     "get_current_user",
+    "get_current_user_async",
+    "authenticate_user_async",
 ]
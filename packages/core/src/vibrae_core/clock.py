@@ -0,0 +1,178 @@
+"""Pluggable time source for the player, ramp engine and scheduler.
+
+Production code reads time, sleeps and waits on events through a ``Clock``;
+the default ``SYSTEM_CLOCK`` maps straight onto ``time``/``threading``.
+``SimulatedClock`` runs on virtual time: whenever every thread that uses it
+is blocked in ``wait``/``sleep``, time jumps to the earliest pending deadline,
+so a day of scheduling and hundreds of crossfades take seconds. Time only
+moves inside ``run_until``, which lets a test step the simulation.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+
+class Clock:
+    """Real time (monotonic for intervals, local wall clock for schedules)."""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        return time.time()
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(max(0.0, seconds))
+
+    def event(self) -> threading.Event:
+        return threading.Event()
+
+    def wait(self, event: Optional[threading.Event], timeout: Optional[float]) -> bool:
+        """Block until ``event`` is set (True) or ``timeout`` seconds pass (False)."""
+        if event is None:
+            self.sleep(timeout or 0.0)
+            return False
+        return event.wait(None if timeout is None else max(0.0, timeout))
+
+    def spawn(self, target: Callable[[], None], name: Optional[str] = None) -> threading.Thread:
+        """Start a daemon thread that takes part in this clock's timekeeping."""
+        t = threading.Thread(target=target, name=name, daemon=True)
+        t.start()
+        return t
+
+
+SYSTEM_CLOCK = Clock()
+
+
+class _SimEvent(threading.Event):
+    def __init__(self, clock: "SimulatedClock"):
+        super().__init__()
+        self._clock = clock
+
+    def set(self) -> None:
+        super().set()
+        self._clock._poke()
+
+
+class SimulatedClock(Clock):
+    """Virtual time shared by all participating threads.
+
+    Threads become participants when spawned through ``spawn`` or on their
+    first ``wait``/``sleep``. A participant blocked outside the clock (a lock,
+    a join) holds time still for ``grace`` real seconds at most.
+    """
+
+    def __init__(self, start: datetime = datetime(2025, 1, 6), grace: float = 0.05):
+        self._wall0 = start
+        self._base = 1_000_000.0  # monotonic origin; keeps "0.0 means never" fields meaningful
+        self._t = self._base
+        self._limit = self._base
+        self.grace = grace
+        self._cond = threading.Condition()
+        self._threads: Dict[int, threading.Thread] = {}
+        self._waiting: Dict[int, Tuple[float, Optional[threading.Event]]] = {}
+        self._activity = 0
+        self.advances = 0
+
+    # Reads
+    def monotonic(self) -> float:
+        return self._t
+
+    def elapsed(self) -> float:
+        return self._t - self._base
+
+    def time(self) -> float:
+        return self._wall0.timestamp() + self.elapsed()
+
+    def now(self) -> datetime:
+        return self._wall0 + timedelta(seconds=self.elapsed())
+
+    # Blocking
+    def event(self) -> threading.Event:
+        return _SimEvent(self)
+
+    def sleep(self, seconds: float) -> None:
+        self.wait(None, seconds)
+
+    def wait(self, event: Optional[threading.Event], timeout: Optional[float]) -> bool:
+        me = threading.current_thread()
+        with self._cond:
+            deadline = float("inf") if timeout is None else self._t + max(0.0, timeout)
+            self._threads[me.ident] = me
+            self._waiting[me.ident] = (deadline, event)
+            self._activity += 1
+            try:
+                while True:
+                    if event is not None and event.is_set():
+                        return True
+                    if self._t >= deadline:
+                        return False
+                    self._block()
+            finally:
+                del self._waiting[me.ident]
+                self._activity += 1
+                self._cond.notify_all()
+
+    def spawn(self, target: Callable[[], None], name: Optional[str] = None) -> threading.Thread:
+        t = threading.Thread(target=target, name=name, daemon=True)
+        t.start()
+        with self._cond:
+            if t.is_alive():
+                self._threads.setdefault(t.ident, t)
+        return t
+
+    # Control
+    def run_until(self, monotonic_t: float) -> None:
+        """Let virtual time run up to ``monotonic_t`` and return once it gets there."""
+        with self._cond:
+            self._threads.pop(threading.get_ident(), None)
+            self._limit = max(self._limit, monotonic_t)
+            self._cond.notify_all()
+            while self._t < monotonic_t:
+                self._block()
+
+    def run_for(self, seconds: float) -> None:
+        self.run_until(self._t + seconds)
+
+    def run_to(self, when: datetime) -> None:
+        self.run_until(self._base + (when - self._wall0).total_seconds())
+
+    # Internals (called with self._cond held)
+    def _poke(self) -> None:
+        with self._cond:
+            self._activity += 1
+            self._cond.notify_all()
+
+    def _block(self) -> None:
+        if self._advance(force=False):
+            return
+        seen = self._activity
+        self._cond.wait(self.grace)
+        if seen == self._activity:
+            self._advance(force=True)
+
+    def _advance(self, force: bool) -> bool:
+        for ident in [i for i, t in self._threads.items() if not t.is_alive()]:
+            del self._threads[ident]
+        if not force and any(i not in self._waiting for i in self._threads):
+            return False
+        deadline = float("inf")
+        for d, ev in self._waiting.values():
+            if d <= self._t or (ev is not None and ev.is_set()):
+                return False  # someone is runnable already
+            deadline = min(deadline, d)
+        target = min(deadline, self._limit)
+        if target <= self._t:
+            return False
+        self._t = target
+        self.advances += 1
+        self._cond.notify_all()
+        return True
+
+
+__all__ = ["Clock", "SimulatedClock", "SYSTEM_CLOCK"]
@@ -0,0 +1,115 @@
+"""Player control commands: one queue, drained by the playback thread.
+
+API workers and the scheduler only enqueue; each call gets a ``Future`` back at
+once that resolves to True when the command was applied and False when a later
+command superseded it before it ran (e.g. a switch replaced by another switch).
+Enqueue-to-apply latency is kept per command kind for the metrics endpoint.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+from vibrae_core.clock import SYSTEM_CLOCK, Clock
+from vibrae_core.telemetry import percentiles
+
+PLAY = "play"
+SWITCH = "switch"
+STOP = "stop"
+STOP_AFTER = "stop_after"
+VOLUME = "volume"
+RESUME = "resume"
+
+# Pending commands of these kinds are dropped when the key kind is enqueued.
+SUPERSEDES: Dict[str, Tuple[str, ...]] = {
+    PLAY: (PLAY, RESUME, SWITCH, STOP, STOP_AFTER),
+    RESUME: (PLAY, RESUME, SWITCH, STOP, STOP_AFTER),
+    STOP: (PLAY, RESUME, SWITCH, STOP, STOP_AFTER),
+    SWITCH: (SWITCH,),
+    STOP_AFTER: (STOP_AFTER,),
+    VOLUME: (VOLUME,),
+}
+
+
+@dataclass
+class Command:
+    kind: str
+    args: tuple = ()
+    future: Future = field(default_factory=Future)
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class CommandQueue:
+    """FIFO of control commands with coalescing and latency accounting."""
+
+    def __init__(self, history: int = 512, clock: Clock = SYSTEM_CLOCK):
+        self.clock = clock
+        self._items: Deque[Command] = deque()
+        self._lock = threading.Lock()
+        self.ready = clock.event()  # set on every put
+        self._latency: Dict[str, Deque[float]] = {}
+        self._history = history
+        self.applied = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    def put(self, kind: str, *args) -> Future:
+        cmd = Command(kind, args, queued_at=self.clock.monotonic())
+        drop = SUPERSEDES.get(kind, ())
+        with self._lock:
+            dropped = [c for c in self._items if c.kind in drop]
+            if dropped:
+                self._items = deque(c for c in self._items if c.kind not in drop)
+                self.coalesced += len(dropped)
+            self._items.append(cmd)
+        for c in dropped:
+            c.future.set_result(False)
+        self.ready.set()
+        return cmd.future
+
+    def take(self) -> List[Command]:
+        """Remove and return everything pending, oldest first."""
+        with self._lock:
+            items = list(self._items)
+            self._items.clear()
+        return items
+
+    def done(self, cmd: Command, error: Optional[BaseException] = None) -> None:
+        ms = (self.clock.monotonic() - cmd.queued_at) * 1000.0
+        with self._lock:
+            self._latency.setdefault(cmd.kind, deque(maxlen=self._history)).append(ms)
+            if error is None:
+                self.applied += 1
+            else:
+                self.failed += 1
+        if error is None:
+            cmd.future.set_result(True)
+        else:
+            cmd.future.set_exception(error)
+
+    def cancel_all(self) -> None:
+        for c in self.take():
+            c.future.set_result(False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict:
+        """Counters plus enqueue-to-apply latency percentiles (ms), overall and per kind."""
+        with self._lock:
+            samples = {k: list(v) for k, v in self._latency.items()}
+            out = {
+                "pending": len(self._items),
+                "applied": self.applied,
+                "coalesced": self.coalesced,
+                "failed": self.failed,
+            }
+        out["latency_ms"] = percentiles(v for vs in samples.values() for v in vs)
+        out["by_kind"] = {k: percentiles(vs) for k, vs in samples.items()}
+        return out
+
+
+__all__ = ["Command", "CommandQueue", "SUPERSEDES", "PLAY", "RESUME", "SWITCH", "STOP", "STOP_AFTER", "VOLUME"]
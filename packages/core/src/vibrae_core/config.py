@@ -72,6 +72,16 @@ class Settings:
     music_dir: str = _env("MUSIC_DIR", "music")
     usb_subdir: Optional[str] = _env("USB_SUBDIR", None)
     usb_name: Optional[str] = _env("VIBRAE_MUSIC", None)
+    # Scene folder scanning: subfolder depth (empty = unlimited) and symlink policy (follow|files|skip).
+    scan_max_depth: Optional[str] = _env("SCAN_MAX_DEPTH", None)
+    scan_symlinks: str = _env("SCAN_SYMLINKS", "follow")
+    # Where players keep resume snapshots (default <repo>/data; "off" disables them).
+    playback_snapshot_dir: Optional[str] = _env("PLAYBACK_SNAPSHOT_DIR", None)
+    # SQLite tuning: a profile from db.SQLITE_PROFILES, optional "name=value,..." pragma
+    # overrides on top of it, and the number of pooled connections kept open.
+    db_profile: str = _env("DB_PROFILE", "performance")
+    db_pragmas: Optional[str] = _env("DB_PRAGMAS", None)
+    db_pool_size: Optional[str] = _env("DB_POOL_SIZE", None)
     # Static web (Expo export) distribution directory. Historically referenced as
     # 'front/dist' before the frontend was relocated under apps/web. Default now
     # points to the new path. WEB_DIST retained for backwards compatibility; prefer
@@ -135,6 +145,23 @@ class Settings:
                 return base
         return self.resolve_path(self.music_dir) or os.path.join(self.repo_root(), "music")
 
+    def effective_scan_depth(self) -> Optional[int]:
+        try:
+            return max(0, int(self.scan_max_depth)) if self.scan_max_depth is not None else None
+        except ValueError:
+            return None
+
+    def effective_snapshot_dir(self) -> Optional[str]:
+        if self.playback_snapshot_dir and self.playback_snapshot_dir.lower() in ("off", "none", "0", "false"):
+            return None
+        return self.resolve_path(self.playback_snapshot_dir) or os.path.join(self.repo_root(), "data")
+
+    def effective_db_pool_size(self) -> Optional[int]:
+        try:
+            return max(1, int(self.db_pool_size)) if self.db_pool_size else None
+        except ValueError:
+            return None
+
     def effective_web_dist(self) -> Optional[str]:
         path = self.resolve_path(self.web_dist)
         if path and os.path.isdir(path):
@@ -5,13 +5,31 @@ Provides SQLAlchemy engine, session factory, and declarative base.
 Defaults to an on-disk SQLite database under ``data/garden.db`` at the
 repository root, but respects an explicit environment override via
 ``VIBRAE_DB_URL`` (or ``VIBRAE_DATABASE_URL``) for testing or custom setups.
+
+SQLite connections get the pragmas of a tuning profile (``DB_PROFILE``, see
+``SQLITE_PROFILES``) when they are opened; ``python -m vibrae_core.db_bench``
+compares profiles under concurrent API and scheduler load.
+
+``AsyncSessionLocal`` is the asyncio counterpart used by the API routes
+(SQLAlchemy asyncio over aiosqlite, same database, pragmas and pool size);
+it is None when those packages are not installed.
 """
+import logging
 import os
-from sqlalchemy import create_engine
+import re
+from typing import Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 from vibrae_core.config import Settings
 from urllib.parse import urlparse
 
+try:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+except ImportError:  # pragma: no cover - needs greenlet (sqlalchemy[asyncio])
+    create_async_engine = None
+
 _settings = Settings()
 _repo_root = _settings.repo_root()
 _data_dir = os.path.join(_repo_root, "data")
@@ -36,16 +54,147 @@ else:
     _db_path = os.path.join(_data_dir, "garden.db")
     DATABASE_URL = f"sqlite:///{_db_path}"
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-)
+logger = logging.getLogger("vibrae_core.db")
+
+# Pragmas applied to every new SQLite connection, per profile.
+#  performance: WAL lets the scheduler and API threads read while one writes, and
+#               synchronous=NORMAL only fsyncs at checkpoints (a power cut can lose the
+#               last commits, never corrupt the file); reads are served from mmap and a
+#               larger page cache, temp tables stay in RAM.
+#  safe:        rollback journal with fsync on every commit.
+#  default:     SQLite's built-in settings. journal_mode is stored in the database
+#               file, so a database once opened in WAL stays in WAL.
+SQLITE_PROFILES: Dict[str, Dict[str, str]] = {
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": str(64 * 1024 * 1024),
+        "cache_size": "-8000",  # KiB
+        "busy_timeout": "5000",  # ms
+        "temp_store": "MEMORY",
+    },
+    "safe": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": "5000",
+    },
+    "default": {},
+}
+_PRAGMA_NAMES = {"journal_mode", "synchronous", "mmap_size", "cache_size", "busy_timeout", "temp_store",
+                 "wal_autocheckpoint", "journal_size_limit", "foreign_keys"}
+_PRAGMA_VALUE = re.compile(r"^-?[A-Za-z0-9_]+$")
+
+# Connections kept open per engine; bursts beyond it get short-lived overflow connections.
+# SQLite runs one writer at a time anyway, so more idle connections only cost page cache.
+DEFAULT_POOL_SIZE = 4
+
+
+def sqlite_pragmas(profile: Optional[str] = None, overrides: Optional[str] = None) -> Dict[str, str]:
+    """Pragmas for ``profile`` with ``"name=value,..."`` ``overrides`` applied; unknown names are ignored."""
+    name = (profile or "performance").lower()
+    if name not in SQLITE_PROFILES:
+        logger.warning(f"Unknown DB_PROFILE {profile!r}; using 'performance'")
+        name = "performance"
+    pragmas = dict(SQLITE_PROFILES[name])
+    for item in (overrides or "").split(","):
+        if not item.strip():
+            continue
+        key, sep, value = (part.strip() for part in item.partition("="))
+        if not sep or key.lower() not in _PRAGMA_NAMES or not _PRAGMA_VALUE.match(value):
+            logger.warning(f"Ignoring SQLite pragma override {item.strip()!r}")
+            continue
+        pragmas[key.lower()] = value
+    return pragmas
+
+
+def _sqlite_engine_args(url: str, pool_size: Optional[int], queue_pool) -> dict:
+    kwargs = {"connect_args": {"check_same_thread": False}}
+    if url.split("://", 1)[-1] in ("", "/:memory:"):
+        kwargs["poolclass"] = StaticPool  # one shared connection, or each would see its own database
+    else:
+        size = pool_size or DEFAULT_POOL_SIZE
+        kwargs.update(poolclass=queue_pool, pool_size=size, max_overflow=2 * size, pool_timeout=30)
+    return kwargs
+
+
+def _install_pragmas(engine: Engine, pragmas: Optional[Dict[str, str]]) -> None:
+    if not pragmas:
+        return
+    items = list(pragmas.items())
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        try:
+            for key, value in items:
+                cur.execute(f"PRAGMA {key}={value}")
+        finally:
+            cur.close()
+
+
+def make_engine(
+    url: str,
+    pragmas: Optional[Dict[str, str]] = None,
+    pool_size: Optional[int] = None,
+) -> Engine:
+    """Engine for ``url``; SQLite connections run ``pragmas`` as they are opened."""
+    if not url.startswith("sqlite"):
+        return create_engine(url)
+    engine = create_engine(url, **_sqlite_engine_args(url, pool_size, QueuePool))
+    _install_pragmas(engine, pragmas)
+    return engine
+
+
+def async_url(url: str) -> str:
+    """``url`` with the aiosqlite driver for plain SQLite URLs; others must name an async driver."""
+    if url.startswith("sqlite://") or url.startswith("sqlite+pysqlite://"):
+        return "sqlite+aiosqlite://" + url.split("://", 1)[1]
+    return url
+
+
+def make_async_engine(
+    url: str,
+    pragmas: Optional[Dict[str, str]] = None,
+    pool_size: Optional[int] = None,
+) -> "AsyncEngine":
+    """Asyncio engine for ``url``, configured like ``make_engine``."""
+    url = async_url(url)
+    if not url.startswith("sqlite"):
+        return create_async_engine(url)
+    engine = create_async_engine(url, **_sqlite_engine_args(url, pool_size, AsyncAdaptedQueuePool))
+    _install_pragmas(engine.sync_engine, pragmas)
+    return engine
+
+
+_pragmas = sqlite_pragmas(_settings.db_profile, _settings.db_pragmas)
+engine = make_engine(DATABASE_URL, pragmas=_pragmas, pool_size=_settings.effective_db_pool_size())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+async_engine = None
+AsyncSessionLocal = None
+if create_async_engine is not None:
+    try:
+        async_engine = make_async_engine(DATABASE_URL, pragmas=_pragmas, pool_size=_settings.effective_db_pool_size())
+    except ImportError as e:  # pragma: no cover - aiosqlite missing
+        logger.warning(f"Async database layer unavailable: {e}")
+    else:
+        # Objects stay loaded after commit: expiring them would make the response
+        # serialization lazy-load from the database outside an await.
+        AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
 __all__ = [
     "DATABASE_URL",
+    "DEFAULT_POOL_SIZE",
+    "SQLITE_PROFILES",
     "engine",
+    "async_engine",
+    "AsyncSessionLocal",
+    "async_url",
+    "make_engine",
+    "make_async_engine",
+    "sqlite_pragmas",
     "SessionLocal",
     "Base",
 ]
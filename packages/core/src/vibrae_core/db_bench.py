@@ -0,0 +1,138 @@
+"""SQLite profile benchmark: read/write latency under concurrent API and scheduler load.
+
+Each profile gets a fresh database seeded with scenes and routines. API
+threads list routines or update one (``--write-ratio``), and a scheduler
+thread reloads the routine index, all at once for ``--seconds``. Run it on
+the device and card that will hold ``garden.db``::
+
+    python -m vibrae_core.db_bench --dir /path/on/the/sd/card
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from vibrae_core.db import SQLITE_PROFILES, make_engine, sqlite_pragmas
+from vibrae_core.migrations import migrate
+from vibrae_core.models import Routine, Scene
+from vibrae_core.routine_index import WEEKDAYS, RoutineIndex
+from vibrae_core.telemetry import percentiles
+
+
+def _seed(session_factory, scenes: int, routines: int) -> None:
+    rnd = random.Random(0)
+    db = session_factory()
+    try:
+        db.add_all(Scene(id=i, name=f"scene{i}", path=f"scene{i}") for i in range(1, scenes + 1))
+        for i in range(1, routines + 1):
+            start = rnd.randrange(0, 23 * 60)
+            db.add(Routine(
+                id=i, scene_id=rnd.randint(1, scenes), start_time=f"{start // 60:02d}:{start % 60:02d}",
+                end_time=f"{start // 60 + 1:02d}:{start % 60:02d}", weekdays=",".join(rnd.sample(WEEKDAYS, 3)),
+                months="", volume=50,
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def run(
+    profile: str,
+    seconds: float = 5.0,
+    api_threads: int = 8,
+    write_ratio: float = 0.1,
+    directory: Optional[str] = None,
+    pool_size: Optional[int] = None,
+) -> Dict[str, object]:
+    """Benchmark one profile; latencies are in milliseconds."""
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", sqlite_pragmas(profile), pool_size)
+        try:
+            migrate(engine)
+            session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            _seed(session_factory, scenes=20, routines=200)
+            samples: Dict[str, List[float]] = {"read": [], "write": [], "scheduler": []}
+            errors: List[str] = []
+            deadline = time.perf_counter() + seconds
+
+            def timed(kind: str, fn) -> None:
+                t0 = time.perf_counter()
+                try:
+                    fn()
+                except OperationalError as e:  # "database is locked" and friends
+                    errors.append(str(e.orig))
+                    return
+                samples[kind].append((time.perf_counter() - t0) * 1000.0)
+
+            def api(seed: int) -> None:
+                rnd = random.Random(seed)
+                while time.perf_counter() < deadline:
+                    db = session_factory()
+                    try:
+                        if rnd.random() < write_ratio:
+                            def write(db=db):
+                                db.query(Routine).filter(Routine.id == rnd.randint(1, 200)).update({"volume": rnd.randint(0, 100)})
+                                db.commit()
+                            timed("write", write)
+                        else:
+                            timed("read", lambda db=db: db.query(Routine).order_by(Routine.id).all())
+                    finally:
+                        db.rollback()
+                        db.close()
+
+            def scheduler() -> None:
+                while time.perf_counter() < deadline:
+                    timed("scheduler", lambda: RoutineIndex.load(session_factory))
+                    time.sleep(0.01)
+
+            threads = [threading.Thread(target=api, args=(n,), daemon=True) for n in range(api_threads)]
+            threads.append(threading.Thread(target=scheduler, daemon=True))
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            with engine.connect() as conn:
+                journal = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+        finally:
+            engine.dispose()
+    ops = sum(len(v) for v in samples.values())
+    return {
+        "profile": profile,
+        "journal_mode": journal,
+        "ops_per_sec": round(ops / seconds, 1),
+        "errors": len(errors),
+        **{kind: percentiles(values) for kind, values in samples.items()},
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profile", action="append", choices=sorted(SQLITE_PROFILES),
+                        help="profile to run (repeatable; default: all)")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--api-threads", type=int, default=8)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--pool-size", type=int, default=None)
+    parser.add_argument("--dir", default=None, help="directory for the benchmark databases (default: system temp)")
+    args = parser.parse_args(argv)
+
+    print(f"{'profile':<12} {'journal':<8} {'ops/s':>8} {'err':>5}  {'read p50/p95':>14}  {'write p50/p95':>14}  {'sched p50/p95':>14}")
+    for profile in args.profile or sorted(SQLITE_PROFILES):
+        r = run(profile, args.seconds, args.api_threads, args.write_ratio, args.dir, args.pool_size)
+        cols = [
+            f"{r[k].get('p50', 0):6.2f}/{r[k].get('p95', 0):6.2f}"
+            for k in ("read", "write", "scheduler")
+        ]
+        print(f"{profile:<12} {r['journal_mode']:<8} {r['ops_per_sec']:>8} {r['errors']:>5}  {cols[0]:>14}  {cols[1]:>14}  {cols[2]:>14}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
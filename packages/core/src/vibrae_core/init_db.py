@@ -5,8 +5,9 @@ Intended replacement for legacy backend.init_db module.
 """
 import os
 from sqlalchemy.orm import Session
-from .db import Base, engine
-from .models import User, Scene, Routine  # adjust exports as needed
+from .db import engine
+from .migrations import migrate
+from .models import User
 from .auth import get_password_hash
 
 DEFAULT_ADMIN_USER = os.environ.get("VIBRAE_ADMIN_USER", "admin")
@@ -14,7 +15,7 @@ DEFAULT_ADMIN_PASS = os.environ.get("VIBRAE_ADMIN_PASS", "admin")
 
 
 def init_db(create_admin: bool = False) -> None:
-    """Create tables and optional seed records.
+    """Apply pending schema migrations and create optional seed records.
 
     Parameters
     ----------
@@ -22,7 +23,7 @@ def init_db(create_admin: bool = False) -> None:
         If True and no users exist, create an initial admin user with
         environment-provided credentials (VIBRAE_ADMIN_USER/VIBRAE_ADMIN_PASS).
     """
-    Base.metadata.create_all(bind=engine)
+    migrate(engine)
     if not create_admin:
         return
     with Session(engine) as session:
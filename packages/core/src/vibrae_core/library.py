@@ -0,0 +1,670 @@
+"""Music library caches: persistent track metadata and scanned scene folders.
+
+``TrackIndex``: durations and basic tags are probed once per file and stored
+in the ``tracks`` table (same database as scenes/routines), keyed by real path
+and validated against file size + mtime. The player reads them from an
+in-memory map, so starting a song is a dict lookup instead of a blocking VLC
+parse. Probing and persistence happen on a single background worker thread.
+
+``SceneLibrary``: the deduplicated file list of each scene folder (walked
+recursively with ``os.scandir`` and streamed in batches), kept in memory and
+updated from inotify events on Linux (directory mtime checks elsewhere), so a
+scene switch does not rescan the folder.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import stat
+import struct
+import sys
+import threading
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from vibrae_core.db import SessionLocal
+from vibrae_core.models import Track
+
+logger = logging.getLogger("vibrae_core.library")
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".ogg")
+
+
+@dataclass(frozen=True)
+class TrackMeta:
+    duration: float
+    title: Optional[str] = None
+    artist: Optional[str] = None
+    album: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class TrackInfo:
+    path: str
+    size: int
+    mtime_ns: int
+    duration: float
+    title: Optional[str] = None
+    artist: Optional[str] = None
+    album: Optional[str] = None
+    loudness: Optional[float] = None
+    peak: Optional[float] = None
+    cue_in: Optional[float] = None
+    cue_out: Optional[float] = None
+
+
+ProbeFn = Callable[[str], Optional[TrackMeta]]
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class TrackIndex:
+    """In-memory view of the ``tracks`` table with a background refresher.
+
+    ``get``/``duration`` never touch the filesystem or the database (after the
+    first lazy load); ``refresh`` stats files and only probes new or changed
+    ones. ``refresh_async`` queues the same work on the worker thread.
+    """
+
+    def __init__(self, probe: Optional[ProbeFn] = None, session_factory=SessionLocal):
+        self.probe = probe
+        self._session_factory = session_factory
+        self._entries: Dict[str, TrackInfo] = {}
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._queue: Deque[str] = deque()
+        self._queued: set = set()
+        self._queue_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    # Lookup
+    def get(self, path: Optional[str]) -> Optional[TrackInfo]:
+        if not path:
+            return None
+        self._ensure_loaded()
+        return self._entries.get(path)
+
+    def duration(self, path: Optional[str]) -> Optional[float]:
+        info = self.get(path)
+        if info is None or not info.duration or info.duration <= 0:
+            return None
+        return info.duration
+
+    def needs_loudness(self, path: str) -> bool:
+        info = self.get(path)
+        return info is None or info.loudness is None
+
+    def needs_analysis(self, path: str) -> bool:
+        info = self.get(path)
+        return info is None or info.loudness is None or info.cue_out is None
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._entries)
+
+    # Updates
+    def put(self, path: str, meta: TrackMeta) -> Optional[TrackInfo]:
+        """Record a probe result obtained elsewhere (e.g. a player fallback)."""
+        real = os.path.realpath(path)
+        key = _stat_key(real)
+        if key is None:
+            return None
+        self._ensure_loaded()
+        info = self._with_meta(real, key, meta)
+        self._entries[real] = info
+        self._persist([info])
+        return info
+
+    def annotate(self, path: str, key: Tuple[int, int], **fields) -> Optional[TrackInfo]:
+        """Attach analysis results measured on file version ``key`` (size, mtime_ns).
+
+        Ignored if the file changed since it was analyzed.
+        """
+        real = os.path.realpath(path)
+        if _stat_key(real) != key:
+            return None
+        self._ensure_loaded()
+        cur = self._entries.get(real)
+        if cur is None or (cur.size, cur.mtime_ns) != key:
+            cur = TrackInfo(real, key[0], key[1], 0.0)
+        info = replace(cur, **fields)
+        self._entries[real] = info
+        self._persist([info])
+        return info
+
+    def refresh(self, paths: Iterable[str]) -> int:
+        """Probe files that are new or changed since last seen. Returns count updated."""
+        self._ensure_loaded()
+        updated: List[TrackInfo] = []
+        for path in paths:
+            info = self._refresh_one(path)
+            if info is not None:
+                updated.append(info)
+        if updated:
+            self._persist(updated)
+            logger.info(f"Track index updated {len(updated)} entries")
+        return len(updated)
+
+    def refresh_async(self, paths: Iterable[str]) -> None:
+        """Queue ``paths`` for background refresh, preserving order (play order first)."""
+        with self._queue_lock:
+            for p in paths:
+                if p not in self._queued:
+                    self._queued.add(p)
+                    self._queue.append(p)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._worker_loop, name="track-index", daemon=True)
+                self._worker.start()
+        self._wake.set()
+
+    def pending(self) -> int:
+        with self._queue_lock:
+            return len(self._queue)
+
+    # Internals
+    def _refresh_one(self, path: str) -> Optional[TrackInfo]:
+        real = os.path.realpath(path)
+        key = _stat_key(real)
+        if key is None:
+            return None
+        cur = self._entries.get(real)
+        if cur is not None and (cur.size, cur.mtime_ns) == key and cur.duration > 0:
+            return None
+        if self.probe is None:
+            return None
+        try:
+            meta = self.probe(real)
+        except Exception as e:
+            logger.warning(f"Track probe failed for '{real}': {e}")
+            return None
+        if meta is None or not meta.duration or meta.duration <= 0:
+            return None
+        info = self._with_meta(real, key, meta)
+        self._entries[real] = info
+        return info
+
+    def _with_meta(self, real: str, key: Tuple[int, int], meta: TrackMeta) -> TrackInfo:
+        # Analysis results of the same file version survive a re-probe.
+        cur = self._entries.get(real)
+        if cur is None or (cur.size, cur.mtime_ns) != key:
+            cur = TrackInfo(real, key[0], key[1], 0.0)
+        return replace(cur, duration=meta.duration, title=meta.title, artist=meta.artist, album=meta.album)
+
+    def _worker_loop(self) -> None:
+        batch: List[TrackInfo] = []
+        while True:
+            with self._queue_lock:
+                path = self._queue.popleft() if self._queue else None
+                if path is not None:
+                    self._queued.discard(path)
+            if path is None:
+                if batch:
+                    self._persist(batch)
+                    batch = []
+                if not self._wake.wait(timeout=30):
+                    with self._queue_lock:
+                        if not self._queue:
+                            self._worker = None
+                            return
+                self._wake.clear()
+                continue
+            info = self._refresh_one(path)
+            if info is not None:
+                batch.append(info)
+                if len(batch) >= 50:
+                    self._persist(batch)
+                    batch = []
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                db = self._session_factory()
+                try:
+                    for row in db.query(Track).all():
+                        self._entries[row.path] = TrackInfo(
+                            row.path, row.size or 0, row.mtime_ns or 0, row.duration or 0.0,
+                            row.title, row.artist, row.album, row.loudness, row.peak, row.cue_in, row.cue_out,
+                        )
+                finally:
+                    db.close()
+                logger.info(f"Track index loaded {len(self._entries)} entries")
+            except Exception as e:
+                logger.warning(f"Track index unavailable, using memory only: {e}")
+            self._loaded = True
+
+    def _persist(self, infos: List[TrackInfo]) -> None:
+        try:
+            db = self._session_factory()
+            try:
+                for info in infos:
+                    db.merge(Track(
+                        path=info.path, size=info.size, mtime_ns=info.mtime_ns, duration=info.duration,
+                        title=info.title, artist=info.artist, album=info.album,
+                        loudness=info.loudness, peak=info.peak, cue_in=info.cue_in, cue_out=info.cue_out,
+                    ))
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"Track index persist failed: {e}")
+
+
+class _Inotify:
+    """Minimal ctypes inotify binding: one fd, a reader thread, a self-pipe to stop it."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    # Files count once closed after writing or moved in; IN_CREATE is kept for new
+    # directories and symlinks, which never see a close-write.
+    WATCH_MASK = (IN_CREATE | IN_CLOSE_WRITE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+                  | IN_DELETE_SELF | IN_MOVE_SELF)
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, on_event: Callable[[int, int, str], None]):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify requires Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm = libc.inotify_rm_watch
+        self._rm.argtypes = (ctypes.c_int, ctypes.c_int)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._fd = fd
+        self._on_event = on_event
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread = threading.Thread(target=self._read_loop, name="scene-inotify", daemon=True)
+        self._thread.start()
+
+    def add(self, path: str) -> int:
+        wd = self._add(self._fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        return wd
+
+    def remove(self, wd: int) -> None:
+        self._rm(self._fd, wd)
+
+    def close(self) -> None:
+        try:
+            os.write(self._stop_w, b"x")
+        except OSError:
+            pass
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)  # the reader closes the fds on its way out
+
+    def _read_loop(self) -> None:
+        try:
+            while True:
+                ready, _, _ = select.select([self._fd, self._stop_r], [], [])
+                if self._stop_r in ready:
+                    return
+                buf = os.read(self._fd, 64 * 1024)
+                off = 0
+                while off + self._EVENT.size <= len(buf):
+                    wd, mask, _cookie, length = self._EVENT.unpack_from(buf, off)
+                    off += self._EVENT.size
+                    name = buf[off:off + length].rstrip(b"\0").decode(errors="surrogateescape")
+                    off += length
+                    try:
+                        self._on_event(wd, mask, name)
+                    except Exception as e:
+                        logger.debug(f"inotify handler error: {e}")
+        except OSError as e:
+            logger.warning(f"inotify reader stopped: {e}")
+        finally:
+            for fd in (self._fd, self._stop_r, self._stop_w):
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+
+
+SYMLINKS_FOLLOW = "follow"  # follow linked files and directories (loops are skipped)
+SYMLINKS_FILES = "files"  # follow linked files, do not descend into linked directories
+SYMLINKS_SKIP = "skip"  # ignore symlinks entirely
+SYMLINK_POLICIES = (SYMLINKS_FOLLOW, SYMLINKS_FILES, SYMLINKS_SKIP)
+
+
+class ScannedFile(NamedTuple):
+    """A playable file found by the scanner: real path plus (st_dev, st_ino) identity."""
+
+    path: str
+    dev: int
+    ino: int
+
+
+def scan_audio_files(
+    root: str,
+    max_depth: Optional[int] = None,
+    extensions: Tuple[str, ...] = AUDIO_EXTENSIONS,
+    symlinks: str = SYMLINKS_FOLLOW,
+    batch_size: int = 256,
+    on_dir: Optional[Callable[[str, int], None]] = None,
+) -> Iterator[List[ScannedFile]]:
+    """Walk ``root`` with ``os.scandir`` and yield playable files in batches as they are found.
+
+    Depth 0 is ``root`` itself; ``max_depth=None`` walks the whole tree. A plain
+    file's identity is its readdir inode plus the device of the directory being
+    listed, so files cost no stat call; only directories and symlinks are
+    stat'ed. Each identity is yielded once. ``on_dir(path, mtime_ns)`` is
+    called before each directory is listed.
+    """
+    if symlinks not in SYMLINK_POLICIES:
+        raise ValueError(f"unknown symlink policy '{symlinks}'")
+    exts = tuple(e.lower() for e in extensions)
+    root = os.path.realpath(root)
+    try:
+        st = os.stat(root)
+    except OSError:
+        return
+    follow_dirs = symlinks == SYMLINKS_FOLLOW
+    visited = {(st.st_dev, st.st_ino)}
+    seen = set()
+    stack = [(root, 0, st.st_dev, st.st_mtime_ns)]
+    batch: List[ScannedFile] = []
+    while stack:
+        dirpath, depth, dev, mtime_ns = stack.pop()
+        if on_dir is not None:
+            on_dir(dirpath, mtime_ns)
+        subdirs = []
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    try:
+                        link = entry.is_symlink()
+                        if link and symlinks == SYMLINKS_SKIP:
+                            continue
+                        if entry.is_dir(follow_symlinks=follow_dirs):
+                            if max_depth is not None and depth >= max_depth:
+                                continue
+                            dst = entry.stat(follow_symlinks=follow_dirs)
+                            key = (dst.st_dev, dst.st_ino)
+                            if key not in visited:
+                                visited.add(key)
+                                sub = os.path.realpath(entry.path) if link else entry.path
+                                subdirs.append((sub, depth + 1, dst.st_dev, dst.st_mtime_ns))
+                            continue
+                        if not entry.name.lower().endswith(exts):
+                            continue
+                        if link:
+                            fst = entry.stat()
+                            if not stat.S_ISREG(fst.st_mode):
+                                continue
+                            ident = (fst.st_dev, fst.st_ino)
+                            path = os.path.realpath(entry.path)
+                        else:
+                            if not entry.is_file(follow_symlinks=False):
+                                continue
+                            ident = (dev, entry.inode())
+                            path = entry.path
+                    except OSError:
+                        continue
+                    if ident in seen:
+                        continue
+                    seen.add(ident)
+                    batch.append(ScannedFile(path, ident[0], ident[1]))
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+        except OSError as e:
+            logger.debug(f"Cannot list '{dirpath}': {e}")
+        stack.extend(reversed(subdirs))
+    if batch:
+        yield batch
+
+
+class _FolderEntry:
+    __slots__ = ("path", "by_path", "dirs", "wds", "files", "dirty", "generation")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.by_path: Dict[str, ScannedFile] = {}  # listed path -> scanned file
+        self.dirs: Dict[str, int] = {}  # walked directory -> mtime_ns
+        self.wds: Dict[str, int] = {}  # watched directory -> inotify wd
+        self.files: Optional[List[ScannedFile]] = None  # deduplicated, rebuilt lazily
+        self.dirty = True
+        self.generation = 0  # bumped by every change event; a walk that raced one stays dirty
+
+
+class SceneLibrary:
+    """Per-folder cache of playable files, kept current from filesystem change events.
+
+    Scene folders are walked recursively (artist/album subfolders) down to
+    ``max_depth``. Every walked directory gets an inotify watch; if watches are
+    unavailable or run out, directory mtimes are compared on lookup instead.
+    """
+
+    def __init__(
+        self,
+        extensions: Tuple[str, ...] = AUDIO_EXTENSIONS,
+        watch: bool = True,
+        max_depth: Optional[int] = None,
+        symlinks: str = SYMLINKS_FOLLOW,
+        batch_size: int = 256,
+    ):
+        if symlinks not in SYMLINK_POLICIES:
+            raise ValueError(f"unknown symlink policy '{symlinks}'")
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.max_depth = max_depth
+        self.symlinks = symlinks
+        self.batch_size = batch_size
+        self._folders: Dict[str, _FolderEntry] = {}
+        self._by_wd: Dict[int, Tuple[_FolderEntry, str]] = {}
+        self._lock = threading.Lock()
+        self._inotify: Optional[_Inotify] = None
+        if watch:
+            try:
+                self._inotify = _Inotify(self._on_inotify)
+            except Exception as e:
+                logger.info(f"inotify unavailable, using mtime checks: {e}")
+
+    @property
+    def watching(self) -> bool:
+        return self._inotify is not None
+
+    def iter_entries(self, folder_path: str) -> Iterator[List[ScannedFile]]:
+        """Yield the folder's playable files in batches.
+
+        A current cache comes back as a single batch; otherwise the folder is
+        walked and batches are yielded as they are found, so callers can start
+        on the first one. Abandoning the iterator leaves the folder marked stale.
+        """
+        key = os.path.abspath(folder_path)
+        with self._lock:
+            entry = self._folders.get(key)
+            if entry is None:
+                entry = _FolderEntry(key)
+                self._folders[key] = entry
+            if not entry.dirty and not self._fully_watched(entry):
+                entry.dirty = self._dirs_changed(entry)
+            cached = None if entry.dirty else self._snapshot(entry)
+        if cached is not None:
+            if cached:
+                yield cached
+            return
+        yield from self._walk(entry)
+
+    def entries(self, folder_path: str) -> List[ScannedFile]:
+        """All playable files of ``folder_path`` (a fresh list), walking it if needed."""
+        out: List[ScannedFile] = []
+        for batch in self.iter_entries(folder_path):
+            out.extend(batch)
+        return out
+
+    def files(self, folder_path: str) -> List[str]:
+        """Deduplicated real paths of playable files under ``folder_path`` (a fresh list)."""
+        return [f.path for f in self.entries(folder_path)]
+
+    def invalidate(self, folder_path: Optional[str] = None) -> None:
+        with self._lock:
+            targets = self._folders.values() if folder_path is None else [
+                e for k, e in self._folders.items() if k == os.path.abspath(folder_path)
+            ]
+            for entry in targets:
+                entry.dirty = True
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        with self._lock:
+            for entry in self._folders.values():
+                entry.wds = {}
+            self._by_wd.clear()
+
+    # Internals
+    def _walk(self, entry: _FolderEntry) -> Iterator[List[ScannedFile]]:
+        with self._lock:
+            generation = entry.generation
+        by_path: Dict[str, ScannedFile] = {}
+        dirs: Dict[str, int] = {}
+
+        def on_dir(path: str, mtime_ns: int) -> None:
+            # Watch before listing so changes made during the walk are not missed.
+            dirs[path] = mtime_ns
+            with self._lock:
+                self._watch(entry, path)
+
+        for batch in scan_audio_files(
+            entry.path, self.max_depth, self.extensions, self.symlinks, self.batch_size, on_dir
+        ):
+            for f in batch:
+                by_path[f.path] = f
+            yield batch
+        with self._lock:
+            for path in [d for d in entry.wds if d not in dirs]:
+                self._unwatch(entry, path)
+            entry.by_path = by_path
+            entry.dirs = dirs
+            entry.files = None
+            entry.dirty = entry.generation != generation
+        logger.debug(f"Scanned {len(by_path)} files in {len(dirs)} folders under '{entry.path}'")
+
+    # Callers hold self._lock
+    def _snapshot(self, entry: _FolderEntry) -> List[ScannedFile]:
+        if entry.files is None:
+            entry.files = list({(f.dev, f.ino): f for f in entry.by_path.values()}.values())
+        return list(entry.files)
+
+    def _fully_watched(self, entry: _FolderEntry) -> bool:
+        return self._inotify is not None and len(entry.wds) >= len(entry.dirs)
+
+    @staticmethod
+    def _dirs_changed(entry: _FolderEntry) -> bool:
+        # Without watches: any changed directory mtime means entries were added/removed below it.
+        for path, mtime_ns in entry.dirs.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime_ns:
+                    return True
+            except OSError:
+                return True
+        return not entry.dirs
+
+    def _watch(self, entry: _FolderEntry, path: str) -> None:
+        if self._inotify is None or path in entry.wds:
+            return
+        try:
+            wd = self._inotify.add(path)
+        except OSError as e:
+            logger.debug(f"Not watching '{path}': {e}")
+            return
+        entry.wds[path] = wd
+        self._by_wd[wd] = (entry, path)
+
+    def _unwatch(self, entry: _FolderEntry, path: str) -> None:
+        wd = entry.wds.pop(path, None)
+        if wd is None:
+            return
+        self._by_wd.pop(wd, None)
+        if self._inotify is not None:
+            self._inotify.remove(wd)
+
+    def _playable(self, name: str) -> bool:
+        return name.lower().endswith(self.extensions)
+
+    def _on_inotify(self, wd: int, mask: int, name: str) -> None:
+        ino = _Inotify
+        with self._lock:
+            if mask & ino.IN_Q_OVERFLOW:
+                for entry in self._folders.values():
+                    entry.dirty = True
+                    entry.generation += 1
+                return
+            hit = self._by_wd.get(wd)
+            if hit is None:
+                return
+            entry, dirpath = hit
+            entry.generation += 1
+            if mask & (ino.IN_DELETE_SELF | ino.IN_MOVE_SELF | ino.IN_IGNORED):
+                self._by_wd.pop(wd, None)
+                entry.wds.pop(dirpath, None)
+                entry.dirty = True
+                return
+            if mask & ino.IN_ISDIR:
+                # A subtree appeared or went away: walk again on next lookup.
+                entry.dirty = True
+                return
+            if not name or not self._playable(name):
+                return
+            path = os.path.join(dirpath, name)
+            if mask & ino.IN_CREATE and not os.path.islink(path):
+                return  # still being written; IN_CLOSE_WRITE adds it
+            if mask & (ino.IN_CREATE | ino.IN_CLOSE_WRITE | ino.IN_MOVED_TO):
+                scanned = self._scan_one(path)
+                if scanned is not None:
+                    entry.by_path[path] = scanned
+            elif mask & (ino.IN_DELETE | ino.IN_MOVED_FROM):
+                if entry.by_path.pop(path, None) is None:
+                    # A symlink alias or hard link we only knew by another name.
+                    entry.dirty = True
+            entry.files = None
+
+    def _scan_one(self, path: str) -> Optional[ScannedFile]:
+        try:
+            link = os.path.islink(path)
+            if link and self.symlinks == SYMLINKS_SKIP:
+                return None
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return ScannedFile(os.path.realpath(path) if link else path, st.st_dev, st.st_ino)
+
+
+__all__ = [
+    "TrackIndex",
+    "TrackInfo",
+    "TrackMeta",
+    "SceneLibrary",
+    "ScannedFile",
+    "scan_audio_files",
+    "AUDIO_EXTENSIONS",
+    "SYMLINKS_FOLLOW",
+    "SYMLINKS_FILES",
+    "SYMLINKS_SKIP",
+]
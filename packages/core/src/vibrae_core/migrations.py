@@ -0,0 +1,128 @@
+"""Versioned schema migrations.
+
+Each migration runs once, in its own transaction, and is recorded in the
+``schema_version`` table. On an up-to-date database ``migrate`` is a table
+check and one query, so startup no longer reflects the schema. Add a migration by
+appending to ``MIGRATIONS`` with the next version number; never edit or
+renumber one that has shipped.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from vibrae_core.db import Base, engine
+from vibrae_core.models import Routine, Track
+from vibrae_core.timespec import MONTHS, WEEKDAYS, parse_hhmm, parse_mask
+
+logger = logging.getLogger("vibrae_core.migrations")
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", String, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+def _create_tables(conn: Connection) -> None:
+    # Fresh databases get the current schema; existing tables are left to later migrations.
+    Base.metadata.create_all(conn)
+
+
+def _mask(value, names) -> Optional[int]:
+    if value is None or not str(value).strip():
+        return None
+    mask = parse_mask(value, names)
+    if not mask:
+        logger.warning(f"No valid names in {value!r}; the routine keeps never matching")
+    return mask
+
+
+def _typed_routines(conn: Connection) -> None:
+    """Rebuild a legacy ``routines`` table ("HH:MM" and comma strings) with typed, indexed columns."""
+    columns = {c["name"] for c in inspect(conn).get_columns("routines")}
+    if "start_time" not in columns:
+        return  # created by _create_tables with the typed schema
+    conn.exec_driver_sql("ALTER TABLE routines RENAME TO routines_legacy")
+    for ix in inspect(conn).get_indexes("routines_legacy"):
+        conn.exec_driver_sql(f'DROP INDEX "{ix["name"]}"')  # renamed with the table; frees the names
+    Routine.__table__.create(conn)
+    rows = [dict(r) for r in conn.execute(text("SELECT * FROM routines_legacy")).mappings()]
+    if rows:
+        conn.execute(Routine.__table__.insert(), [
+            {
+                "id": r["id"],
+                "scene_id": r.get("scene_id"),
+                "zone_id": r.get("zone_id"),
+                "start_minute": parse_hhmm(r.get("start_time")),
+                "end_minute": parse_hhmm(r.get("end_time")),
+                "weekday_mask": _mask(r.get("weekdays"), WEEKDAYS),
+                "month_mask": _mask(r.get("months"), MONTHS),
+                "volume": r.get("volume"),
+                "priority": r.get("priority") or 0,
+            }
+            for r in rows
+        ])
+    conn.exec_driver_sql("DROP TABLE routines_legacy")
+    logger.info(f"Converted {len(rows)} routines to typed columns")
+
+
+def _track_analysis_columns(conn: Connection) -> None:
+    """Give a ``tracks`` table from before loudness analysis its loudness, peak and cue columns."""
+    if not inspect(conn).has_table("tracks"):
+        Track.__table__.create(conn)  # databases that predate the track index
+        return
+    existing = {c["name"] for c in inspect(conn).get_columns("tracks")}
+    missing = [c for c in Track.__table__.columns if c.name not in existing]
+    for col in missing:
+        conn.exec_driver_sql(f"ALTER TABLE tracks ADD COLUMN {col.name} {col.type.compile(conn.dialect)}")
+    if missing:
+        logger.info(f"Added columns to tracks: {', '.join(c.name for c in missing)}")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "create tables", _create_tables),
+    Migration(2, "typed routine times and day/month masks", _typed_routines),
+    Migration(3, "track index with loudness and cue columns", _track_analysis_columns),
+]
+
+
+def current_version(bind: Engine = engine) -> int:
+    with bind.connect() as conn:
+        schema_version.create(conn, checkfirst=True)
+        conn.commit()
+        return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+
+def migrate(bind: Engine = engine) -> int:
+    """Apply pending migrations in order; returns the schema version."""
+    version = current_version(bind)
+    for m in MIGRATIONS:
+        if m.version <= version:
+            continue
+        with bind.begin() as conn:
+            # Record first: pysqlite only opens a transaction before DML, so the
+            # INSERT is what makes the DDL below roll back with it on failure.
+            conn.execute(schema_version.insert().values(
+                version=m.version, name=m.name, applied_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            ))
+            m.apply(conn)
+        logger.info(f"Applied migration {m.version}: {m.name}")
+        version = m.version
+    return version
+
+
+__all__ = ["MIGRATIONS", "Migration", "current_version", "migrate", "schema_version"]
@@ -1,6 +1,9 @@
 """ORM models (migrated from legacy `backend.models`)."""
-from sqlalchemy import Column, Integer, String, ForeignKey
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index, and_, or_
 from vibrae_core.db import Base
+from vibrae_core.timespec import MONTHS, WEEKDAYS, format_hhmm, format_mask, parse_hhmm, parse_mask
 
 
 class User(Base):
@@ -17,14 +20,97 @@ class Scene(Base):
     path = Column(String)
 
 
+class Zone(Base):
+    __tablename__ = "zones"
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True)
+    audio_device = Column(String, nullable=True)  # VLC output device id; None = system default
+
+
+def _minutes(value: Optional[str]) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    minute = parse_hhmm(value)
+    if minute is None:
+        raise ValueError(f"invalid time {value!r}; expected HH:MM")
+    return minute
+
+
 class Routine(Base):
     __tablename__ = "routines"
     id = Column(Integer, primary_key=True)
-    scene_id = Column(Integer, ForeignKey("scenes.id"))
-    start_time = Column(String)  # e.g. "08:00"
-    end_time = Column(String)
-    weekdays = Column(String)    # e.g. "mon,tue,wed"
-    months = Column(String)      # e.g "jan,feb,mar,apr"
+    scene_id = Column(Integer, ForeignKey("scenes.id"), index=True)
+    zone_id = Column(Integer, ForeignKey("zones.id"), nullable=True, index=True)  # None: the default zone
+    start_minute = Column(Integer)  # minutes since midnight, e.g. 480 = "08:00"
+    end_minute = Column(Integer)    # exclusive; below start_minute wraps past midnight
+    weekday_mask = Column(Integer, nullable=True)  # bit 0 = Monday; None: every day
+    month_mask = Column(Integer, nullable=True)    # bit 0 = January; None: every month
     volume = Column(Integer)
+    priority = Column(Integer, default=0)  # where routines overlap the highest plays; None counts as 0
+
+    __table_args__ = (Index("ix_routines_time", "start_minute", "end_minute"),)
+
+    # The API speaks "08:00" and "mon,tue"; these views convert on assignment
+    # (ValueError on malformed input) and format on read.
+    @property
+    def start_time(self) -> Optional[str]:
+        return format_hhmm(self.start_minute)
+
+    @start_time.setter
+    def start_time(self, value: Optional[str]) -> None:
+        self.start_minute = _minutes(value)
+
+    @property
+    def end_time(self) -> Optional[str]:
+        return format_hhmm(self.end_minute)
+
+    @end_time.setter
+    def end_time(self, value: Optional[str]) -> None:
+        self.end_minute = _minutes(value)
+
+    @property
+    def weekdays(self) -> Optional[str]:
+        return format_mask(self.weekday_mask, WEEKDAYS)
+
+    @weekdays.setter
+    def weekdays(self, value: Optional[str]) -> None:
+        self.weekday_mask = parse_mask(value, WEEKDAYS, strict=True) if value and value.strip() else None
+
+    @property
+    def months(self) -> Optional[str]:
+        return format_mask(self.month_mask, MONTHS)
+
+    @months.setter
+    def months(self, value: Optional[str]) -> None:
+        self.month_mask = parse_mask(value, MONTHS, strict=True) if value and value.strip() else None
+
+    @classmethod
+    def active_at(cls, when: datetime):
+        """SQL condition: the routine's window contains ``when`` (priority is not considered)."""
+        minute = when.hour * 60 + when.minute
+        in_time = or_(
+            and_(cls.start_minute < cls.end_minute, cls.start_minute <= minute, cls.end_minute > minute),
+            and_(cls.start_minute > cls.end_minute, or_(cls.start_minute <= minute, cls.end_minute > minute)),
+        )
+        return and_(
+            in_time,
+            or_(cls.weekday_mask.is_(None), cls.weekday_mask.op("&")(1 << when.weekday()) != 0),
+            or_(cls.month_mask.is_(None), cls.month_mask.op("&")(1 << (when.month - 1)) != 0),
+        )
+
+
+class Track(Base):
+    __tablename__ = "tracks"
+    path = Column(String, primary_key=True)  # realpath of the audio file
+    size = Column(Integer)
+    mtime_ns = Column(Integer)
+    duration = Column(Float)     # seconds
+    title = Column(String, nullable=True)
+    artist = Column(String, nullable=True)
+    album = Column(String, nullable=True)
+    loudness = Column(Float, nullable=True)  # integrated LUFS (BS.1770)
+    peak = Column(Float, nullable=True)      # sample peak, linear full scale
+    cue_in = Column(Float, nullable=True)    # seconds of leading silence
+    cue_out = Column(Float, nullable=True)   # seconds where audible content ends
 
-__all__ = ["User", "Scene", "Routine"]
+__all__ = ["User", "Scene", "Zone", "Routine", "Track"]
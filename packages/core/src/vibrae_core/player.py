@@ -8,12 +8,23 @@ decoupled through a callback registry so API layer can register listeners.
 import os
 import random
 import threading
-import time
 import logging
 import vlc  # type: ignore
+from collections import deque
+from concurrent.futures import Future
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import Callable, List, Optional, Tuple, Set
+from typing import Callable, Deque, Dict, Hashable, List, Optional, Tuple, Set
+
+from vibrae_core.analysis import DEFAULT_TARGET_LUFS, TrackAnalyzer, gain_db
+from vibrae_core.clock import SYSTEM_CLOCK, Clock
+from vibrae_core.commands import PLAY, RESUME, STOP, STOP_AFTER, SWITCH, VOLUME, CommandQueue
+from vibrae_core.library import SceneLibrary, TrackIndex, TrackMeta
+from vibrae_core.playqueue import PathTable, PlayQueue
+from vibrae_core.snapshot import PlaybackState, SnapshotStore
+from vibrae_core.telemetry import CROSSFADE, PROMOTION, HandoffEvent, HandoffRecorder, percentiles
+from vibrae_core.ramp import EQUAL_POWER, LINEAR, RampEngine
+from vibrae_core.vlc_pool import MediaPlayerPool
 
 logger = logging.getLogger("vibrae_core.player")
 
@@ -29,12 +40,32 @@ def unregister_player_listener(cb: NotifyCallback) -> None:
 	_notify_listeners.discard(cb)
 
 
-def _emit_now_playing(song: Optional[str], volume: Optional[int] = None) -> None:
-	for cb in list(_notify_listeners):
+# Zone-aware listeners get (zone_id, song, volume) from every player; plain
+# listeners above only hear the default zone (zone_id None).
+ZoneNotifyCallback = Callable[[Optional[int], Optional[str], Optional[int]], None]
+_zone_listeners: Set[ZoneNotifyCallback] = set()
+
+
+def register_zone_listener(cb: ZoneNotifyCallback) -> None:
+	_zone_listeners.add(cb)
+
+
+def unregister_zone_listener(cb: ZoneNotifyCallback) -> None:
+	_zone_listeners.discard(cb)
+
+
+def _emit_now_playing(song: Optional[str], volume: Optional[int] = None, zone: Optional[int] = None) -> None:
+	if zone is None:
+		for cb in list(_notify_listeners):
+			try:
+				cb(song, volume)
+			except Exception:
+				_notify_listeners.discard(cb)
+	for zcb in list(_zone_listeners):
 		try:
-			cb(song, volume)
+			zcb(zone, song, volume)
 		except Exception:
-			_notify_listeners.discard(cb)
+			_zone_listeners.discard(zcb)
 
 
 # Backwards compatibility hook for old tests expecting notify_from_player symbol
@@ -43,16 +74,24 @@ def notify_from_player(song: Optional[str], volume: Optional[int] = None) -> Non
 	_emit_now_playing(song, volume)
 
 
-def _now() -> float:
-	return time.monotonic()
-
-
 @dataclass
 class PlaybackStatus:
 	crossfade_active: bool = False
 	handoff_in_progress: bool = False
 	last_handoff_main_id: Optional[int] = None
 	promotion_guard_until: float = 0.0
+	preroll_active: bool = False
+	last_preroll_margin: Optional[float] = None
+	loop_wakeups: int = 0
+
+
+@dataclass
+class _PreparedScene:
+	"""A scene scanned and shuffled ahead of its start, first track opened (paused, muted)."""
+	folder: str
+	queue: PlayQueue
+	player: object  # None if the first track could not be opened
+	ready_at: float
 
 
 class PlayerPhase(Enum):
@@ -61,54 +100,121 @@ class PlayerPhase(Enum):
 	CROSSFADE = auto()
 
 
-def wait_until(predicate: Callable[[], bool], timeout: float, poll: float = 0.05) -> bool:
-	end = _now() + max(0.0, timeout)
-	while _now() < end:
+def wait_until(
+	predicate: Callable[[], bool],
+	timeout: float,
+	poll: float = 0.05,
+	event: Optional[threading.Event] = None,
+	clock: Clock = SYSTEM_CLOCK,
+) -> bool:
+	"""Wait for ``predicate``; with ``event`` it is re-checked when the event fires (``poll`` is the fallback)."""
+	end = clock.monotonic() + max(0.0, timeout)
+	while clock.monotonic() < end:
 		try:
 			if predicate():
 				return True
 		except Exception:
 			pass
-		time.sleep(poll)
+		clock.wait(event, min(poll, max(0.0, end - clock.monotonic())))
+		if event is not None:
+			event.clear()
 	return False
 
 
-def _safe_unmute(player) -> None:  # pragma: no cover - defensive
-	try:
-		player.audio_set_mute(False)
-	except Exception:
-		pass
-
-
-def _safe_set_volume(player, volume: int) -> None:  # pragma: no cover - defensive
-	try:
-		player.audio_set_volume(int(max(0, min(100, volume))))
-	except Exception:
-		pass
-
-
-def _safe_unmute_and_volume(player, volume: int) -> None:
-	_safe_unmute(player)
-	_safe_set_volume(player, volume)
-
-
 class Player:
-	def __init__(self, music_base_dir: str):
+	def __init__(
+		self,
+		music_base_dir: str,
+		library: Optional[TrackIndex] = None,
+		scenes: Optional[SceneLibrary] = None,
+		vlc_instance=None,
+		audio_device: Optional[str] = None,
+		zone_id: Optional[int] = None,
+		analyzer: Optional[TrackAnalyzer] = None,
+		clock: Clock = SYSTEM_CLOCK,
+		snapshots: Optional[SnapshotStore] = None,
+	):
 		self.music_base_dir = music_base_dir
+		# Every sleep, wait and timestamp goes through the clock (simulated in tests).
+		self.clock = clock
+		self._now = clock.monotonic
+		# Zones share one VLC instance, track index, scene cache and analyzer; each
+		# player renders to its own output device (None = system default).
+		self.zone_id = zone_id
+		self.audio_device = audio_device
 		self.current_folder: Optional[str] = None
 		self.current_volume = 100
-		self.queue: List[str] = []
+		# Paths are interned once (with their scan-time identity); the queue holds ids.
+		self._paths = PathTable()
+		self._queue = PlayQueue(self._paths)
 		self.queue_pos = 0
 		self.crossfade_sec = 5
+		# Seconds before the fade start at which the next track is opened, buffered and paused.
+		self.preroll_sec = 3.0
+		self.fade_in_sec = 1.0
+		# Scene switches crossfade into the new scene right away over this many seconds;
+		# None waits for the current track to end instead.
+		self.switch_fade_sec: Optional[float] = 3.0
+		self.fade_curve = LINEAR
+		self.crossfade_curve = EQUAL_POWER
+		# Per-track gain from cached loudness analysis, applied on top of the user volume.
+		self.normalize_loudness = True
+		self.loudness_target_lufs = DEFAULT_TARGET_LUFS
+		# Skip cached leading/trailing silence: start tracks at cue in, fade out ending at cue out.
+		self.use_cue_points = True
 		self.promotion_guard_window = 0.35
 
-		self._stop_event = threading.Event()
-		self._switch_scene_request: Optional[Tuple[str, Optional[int]]] = None
+		self._stop_event = clock.event()
+		# Set by control calls and libvlc event callbacks; the playback loop sleeps on it
+		# until the next deadline instead of polling every 50 ms.
+		self._wake = clock.event()
+		self._main_time: Optional[Tuple[int, int, float]] = None  # (player id, media ms, at)
+		self.idle_wakeup_sec = 2.0
+		self.poll_sec = 0.05
+		# (folder, volume, fade seconds or None to switch at the end of the current track)
+		self._switch_scene_request: Optional[Tuple[str, Optional[int], Optional[float]]] = None
+		self._switch_requested_at: Optional[float] = None
+		self._switch_latencies: Deque[float] = deque(maxlen=200)  # request to audible, ms
 		self._lock = threading.Lock()
-		self._thread: Optional[threading.Thread] = None
+		# Control calls are queued as commands and applied by the playback thread.
+		self.commands = CommandQueue(clock=clock)
+		self._actor: Optional[threading.Thread] = None
+		self._actor_lock = threading.Lock()
+		self._drain_lock = threading.Lock()
+		self._start_request: Optional[Tuple[str, Optional[int], Optional[PlaybackState]]] = None
+		self._loop_active = False
+		self._closed = False
+		# Resume state, saved every snapshot_interval seconds and at each handoff.
+		self.snapshots = snapshots
+		self.snapshot_interval = 5.0
+		self._snapshot_due = 0.0
+		self._shutting_down = False  # a shutdown keeps the last "playing" snapshot
+		self._resume_offset: Optional[Tuple[str, float]] = None
+		self.resumed_folder: Optional[str] = None
+		# Scene prepared ahead of a scheduled start; see prewarm_scene.
+		self._prepared: Optional[_PreparedScene] = None
+		self._prepared_lock = threading.Lock()  # _load_and_shuffle may run under self._lock
+		self._warm_player: Optional[Tuple[str, object]] = None  # (path, handle) for the next _acquire
+		self.prewarm_ttl = 600.0
+		self._prewarm_stats = {"prepared": 0, "used": 0, "discarded": 0}
+		self._scene_load_t: Optional[float] = None
+		self._last_scene_start_ms: Optional[float] = None
 		self._play_epoch = 0
-
-		self._vlc_instance = vlc.Instance()
+		self._scan_token = 0  # bumped per scene load; stale background scans stop extending the queue
+
+		self._owns_vlc = vlc_instance is None
+		self._vlc_instance = vlc_instance if vlc_instance is not None else vlc.Instance()
+		# Every MediaPlayer comes from the shared instance and is recycled via set_media.
+		self._events_supported = False
+		self._pool = MediaPlayerPool(self._vlc_instance, on_create=self._attach_events)
+		# All volume automation (fade-in, crossfade, fade-out) runs on the ramp engine's timer.
+		self._ramps = RampEngine(clock=clock)
+		self.library = library if library is not None else TrackIndex()
+		if self.library.probe is None:
+			self.library.probe = self._probe_track
+		self.scenes = scenes if scenes is not None else SceneLibrary()
+		self.analyzer = analyzer if analyzer is not None else TrackAnalyzer(self.library)
+		self._player_paths: Dict[int, str] = {}  # id(MediaPlayer) -> path it is playing
 		self._player_main = None
 		self._player_next = None
 		self._next_index_pending: Optional[int] = None
@@ -122,8 +228,10 @@ class Player:
 		self._last_started_path: Optional[str] = None
 		self._last_started_t: float = 0.0
 		self._same_start_guard_sec = 1.5
-		self._started_next_paths: Set[str] = set()
+		self._started_next_ids: Set[Hashable] = set()
 		self._status = PlaybackStatus()
+		self.handoffs = HandoffRecorder()
+		self._main_ended: Optional[Tuple[int, float]] = None  # (player id, EndReached time)
 
 	def is_initialized(self) -> bool:
 		try:
@@ -131,84 +239,87 @@ class Player:
 		except Exception:
 			return False
 
-	def set_volume(self, volume: int) -> None:
-		new_volume = max(0, min(volume, 100))
-		old_volume = self.current_volume
-		self.current_volume = new_volume
-		if old_volume != new_volume:
-			logger.debug(f"Volume change {old_volume} -> {new_volume}")
-		for p in (self._player_main, self._player_next):
-			if p is None:
-				continue
-			try:
-				st = p.get_state()
-				from vlc import State  # local import for mock friendliness
-				if st not in (State.Ended, State.Stopped, State.Error):
-					_safe_set_volume(p, new_volume)
-			except Exception:
-				pass
+	# Control API: every call only enqueues and returns a Future (True once applied,
+	# False if superseded); the playback thread applies commands in order.
+	def set_volume(self, volume: int) -> Future:
+		return self._submit(VOLUME, volume)
 
 	def get_volume(self) -> int:
 		return self.current_volume
 
-	def play_scene(self, folder: str, volume: Optional[int] = None) -> None:
-		with self._lock:
-			if self._thread and self._thread.is_alive():
-				self.stop(force=True)
-			self.current_folder = folder
-			if volume is not None:
-				self.set_volume(volume)
-			self._load_and_shuffle(folder)
-			self._stop_event.clear()
-			self._pending_stop = False
-			self._pending_stop_deadline = None
-			self._stop_after_song = False
-			self._thread = threading.Thread(target=self._play_loop, daemon=True)
-			self._thread.start()
-			logger.info(f"Started playback thread for scene '{folder}'")
-
-	def switch_scene(self, folder: str, volume: Optional[int] = None) -> None:
-		with self._lock:
-			self._switch_scene_request = (folder, volume)
-			self._next_index_pending = None
-			if self._player_next:
-				try:
-					self._player_next.stop()
-				except Exception:
-					pass
-				self._player_next = None
-			self._status.crossfade_active = False
-			self._started_next_paths.clear()
-			self._status.handoff_in_progress = False
-			self._status.last_handoff_main_id = None
-			self._status.promotion_guard_until = 0.0
-			logger.info(f"Scene switch requested to '{folder}'")
+	def play_scene(self, folder: str, volume: Optional[int] = None) -> Future:
+		return self._submit(PLAY, folder, volume)
 
-	def stop(self, force: bool = True) -> None:
-		self._stop_event.set()
-		self._pending_stop = False
-		self._pending_stop_deadline = None
-		self._stop_after_song = False
-		self._status.handoff_in_progress = False
-		self._status.last_handoff_main_id = None
-		self._status.promotion_guard_until = 0.0
-		if force and self._thread and self._thread.is_alive():
-			try:
-				self._thread.join(timeout=2)
-			except Exception:
-				pass
-		logger.info("Stop requested")
+	def switch_scene(self, folder: str, volume: Optional[int] = None, fade_sec: Optional[float] = None) -> Future:
+		"""Crossfade into ``folder`` now (over ``fade_sec``, default ``switch_fade_sec``).
+
+		With ``switch_fade_sec`` None and no ``fade_sec`` the switch waits for the current track to end.
+		"""
+		fade = fade_sec if fade_sec is not None else self.switch_fade_sec
+		return self._submit(SWITCH, folder, volume, None if fade is None else max(0.1, float(fade)), self._now())
+
+	def stop(self) -> Future:
+		return self._submit(STOP)
+
+	def stop_after_current_or_timeout(self, timeout_sec: int = 300) -> Future:
+		return self._submit(STOP_AFTER, timeout_sec)
 
-	def stop_after_current_or_timeout(self, timeout_sec: int = 300) -> None:
-		self._pending_stop = True
-		self._stop_after_song = True
-		self._pending_stop_deadline = _now() + max(0, timeout_sec)
+	def resume_from_snapshot(self) -> Optional[Future]:
+		"""Continue the saved scene, queue order and track offset (no folder scan); None if nothing to resume."""
+		state = self.snapshots.load() if self.snapshots is not None else None
+		if state is None or not state.playing or not state.queue:
+			return None
+		self.resumed_folder = state.folder
+		logger.info(f"Resuming scene '{state.folder}' at {state.track} +{state.offset:.1f}s")
+		return self._submit(RESUME, state)
+
+	def prewarm_scene(self, folder: str) -> Future:
+		"""Scan and shuffle ``folder`` and open its first track in the background.
+
+		The next play or switch to ``folder`` then starts from the prepared queue and
+		handle. Resolves True once ready, False if the folder is missing or empty.
+		"""
+		fut: Future = Future()
+		if self._closed:
+			fut.set_result(False)
+			return fut
+		self.clock.spawn(lambda: self._prepare_scene(folder, fut), name="scene-prewarm")
+		return fut
 
 	def get_now_playing(self) -> Optional[str]:
 		return self.now_playing
 
 	def is_playing(self) -> bool:
-		return bool(self._thread and self._thread.is_alive() and self.now_playing)
+		return bool(self._loop_active and self.now_playing)
+
+	def get_pool_stats(self) -> dict:
+		"""Native MediaPlayer handle counters (created/released/live/in_use/idle/reused)."""
+		return self._pool.stats()
+
+	def get_ramp_stats(self) -> dict:
+		"""Volume ramp timer jitter (tick lateness percentiles in ms)."""
+		return self._ramps.stats()
+
+	def get_playback_metrics(self) -> dict:
+		"""Handoff percentiles, the latest events and engine counters for the metrics endpoint."""
+		return {
+			"handoffs": self.handoffs.summary(),
+			"recent": [e.to_dict() for e in self.handoffs.events(20)],
+			"ramps": self.get_ramp_stats(),
+			"pool": self.get_pool_stats(),
+			"loop_wakeups": self._status.loop_wakeups,
+			"commands": self.commands.stats(),
+			"switch": dict(percentiles(self._switch_latencies), last_ms=self._switch_latencies[-1] if self._switch_latencies else None),
+			"prewarm": dict(
+				self._prewarm_stats,
+				pending=self._prepared.folder if self._prepared is not None else None,
+				last_scene_start_ms=self._last_scene_start_ms,
+			),
+		}
+
+	def get_preroll_margin(self) -> Optional[float]:
+		"""Seconds the next track sat buffered before its last fade start (0.0 if it was late)."""
+		return self._status.last_preroll_margin
 
 	def get_phase(self) -> PlayerPhase:
 		if self._status.crossfade_active:
@@ -218,114 +329,684 @@ class Player:
 		return PlayerPhase.IDLE
 
 	def shutdown(self) -> None:
-		self.stop(force=True)
-		for p in (self._player_main, self._player_next):
-			if not p:
-				continue
-			try:
-				p.stop()
-			except Exception:
-				pass
+		if not self._closed:
+			self._shutting_down = True
 			try:
-				p.release()
+				self.stop().result(timeout=2)
 			except Exception:
 				pass
+			self._closed = True
+			self.commands.ready.set()
+			if self._actor is not None and self._actor is not threading.current_thread():
+				self._actor.join(timeout=2)
+			self.commands.cancel_all()
+		self._set_prepared(None)
+		self._ramps.close()
 		self._player_main = None
 		self._player_next = None
+		self._pool.close()
 		if self._vlc_instance is not None:
-			try:
-				self._vlc_instance.release()
-			except Exception:
-				pass
+			if self._owns_vlc:
+				try:
+					self._vlc_instance.release()
+				except Exception:
+					pass
 			self._vlc_instance = None
 		logger.info("Player shutdown complete")
 
+	# Command queue
+	def _submit(self, kind: str, *args) -> Future:
+		if self._closed:
+			fut: Future = Future()
+			fut.set_result(False)
+			return fut
+		fut = self.commands.put(kind, *args)
+		self._wake.set()
+		self._ensure_actor()
+		return fut
+
+	def _ensure_actor(self) -> None:
+		with self._actor_lock:
+			if self._actor is None or not self._actor.is_alive():
+				self._actor = self.clock.spawn(self._run, name="player")
+
+	def _run(self) -> None:
+		"""Playback thread: applies commands while idle and runs the play loop when a scene starts."""
+		while not self._closed:
+			self.clock.wait(self.commands.ready, None)  # every put and shutdown set it
+			self.commands.ready.clear()
+			self._drain_commands()
+			while self._start_request is not None and not self._closed and not self._loop_active:
+				folder, volume, state = self._start_request
+				self._start_request = None
+				self._start_scene(folder, volume, state)
+				self._play_loop()
+				self._drain_commands()
+
+	def _drain_commands(self) -> None:
+		"""Apply pending commands in order; a no-op if another thread is already draining."""
+		if not self.commands or not self._drain_lock.acquire(blocking=False):
+			return
+		try:
+			for cmd in self.commands.take():
+				try:
+					self._apply(cmd.kind, *cmd.args)
+				except Exception as e:
+					logger.warning(f"Command {cmd.kind} failed: {e}")
+					self.commands.done(cmd, e)
+				else:
+					self.commands.done(cmd)
+		finally:
+			self._drain_lock.release()
+
+	def _apply(self, kind: str, *args) -> None:
+		if kind == VOLUME:
+			self._apply_volume(*args)
+		elif kind in (PLAY, RESUME):
+			if kind == PLAY:
+				folder, volume = args
+				state = None
+			else:
+				(state,) = args
+				folder, volume = state.folder, state.volume
+			self._start_request = (folder, volume, state)
+			self._drop_switch_request()  # an explicit start supersedes a pending switch
+			if self._loop_active:
+				# Restart: the running loop unwinds, then the playback thread loads the new scene.
+				self._stop_event.set()
+				self._wake.set()
+			logger.info(f"Play requested for scene '{folder}'")
+		elif kind == SWITCH:
+			self._apply_switch(*args)
+		elif kind == STOP:
+			self._apply_stop()
+		elif kind == STOP_AFTER:
+			(timeout_sec,) = args
+			self._pending_stop = True
+			self._stop_after_song = True
+			self._pending_stop_deadline = self._now() + max(0, timeout_sec)
+			self._wake.set()
+		else:
+			raise ValueError(f"unknown command {kind!r}")
+
+	def _apply_volume(self, volume: int) -> None:
+		new_volume = max(0, min(volume, 100))
+		old_volume = self.current_volume
+		self.current_volume = new_volume
+		if old_volume != new_volume:
+			logger.debug(f"Volume change {old_volume} -> {new_volume}")
+		main, nxt = self._player_main, self._player_next
+		# Players under automation get their ramp re-aimed; a prerolled (silent) next track is left alone.
+		if main is not None:
+			target = self._volume_for(main, new_volume)
+			if not self._ramps.retarget(main, target) and self._player_is_active(main):
+				self._ramps.set(main, target)
+		if nxt is not None:
+			self._ramps.retarget(nxt, self._volume_for(nxt, new_volume))
+
+	def _start_scene(self, folder: str, volume: Optional[int], state: Optional[PlaybackState] = None) -> None:
+		self.current_folder = folder
+		if volume is not None:
+			self._apply_volume(volume)
+		if state is not None:
+			self._restore_queue(state)
+		else:
+			self._load_and_shuffle(folder)
+		self._stop_event.clear()
+		self._pending_stop = False
+		self._pending_stop_deadline = None
+		self._stop_after_song = False
+		logger.info(f"Starting playback for scene '{folder}'")
+
+	def _restore_queue(self, state: PlaybackState) -> None:
+		"""Queue the snapshot's order as-is and arm the resume offset for its current track."""
+		self._scan_token += 1
+		self.queue = state.queue
+		pos = state.queue_pos if 0 <= state.queue_pos < len(self.queue) else 0
+		if state.track and self.queue[pos] != state.track:
+			try:
+				pos = self.queue.index(state.track)
+			except ValueError:
+				state.offset = 0.0
+		self.queue_pos = pos
+		self._next_index_pending = None
+		self._started_next_ids.clear()
+		self._resume_offset = (self.queue[pos], max(0.0, state.offset))
+		logger.info(f"Restored {len(self.queue)} queued tracks at position {pos}")
+
+	def _take_resume_offset(self, song: str) -> Optional[float]:
+		armed, self._resume_offset = self._resume_offset, None
+		return armed[1] if armed is not None and armed[0] == song else None
+
+	def _save_snapshot(self, offset: float, playing: bool = True) -> None:
+		store = self.snapshots
+		if store is None or not self.current_folder:
+			return
+		self._snapshot_due = self._now() + self.snapshot_interval
+		q = self._queue
+		state = PlaybackState(
+			folder=self.current_folder, queue_pos=self.queue_pos, track=self.now_playing, offset=round(offset, 3),
+			volume=self.current_volume, playing=playing, saved_at=self.clock.time(),
+		)
+		# The path list is only built (on the writer thread) when the order changed.
+		store.save(state, (id(q), q.version), lambda: list(q))
+
+	def _apply_switch(self, folder: str, volume: Optional[int], fade: Optional[float], requested_at: float) -> None:
+		self._switch_scene_request = (folder, volume, fade)
+		self._switch_requested_at = requested_at
+		self._wake.set()
+		if self._status.crossfade_active:
+			# Let the running crossfade finish; the loop picks the switch up right after it.
+			logger.info(f"Scene switch requested to '{folder}' (after the current crossfade)")
+			return
+		self._next_index_pending = None
+		if self._player_next:
+			self._recycle(self._player_next)
+			self._player_next = None
+		self._status.crossfade_active = False
+		self._status.preroll_active = False
+		self._started_next_ids.clear()
+		self._status.handoff_in_progress = False
+		self._status.last_handoff_main_id = None
+		self._status.promotion_guard_until = 0.0
+		logger.info(f"Scene switch requested to '{folder}'")
+
+	def _drop_switch_request(self) -> None:
+		if self._switch_scene_request is not None:
+			logger.info(f"Dropping pending scene switch to '{self._switch_scene_request[0]}'")
+		self._switch_scene_request = None
+		self._switch_requested_at = None
+
+	def _apply_stop(self) -> None:
+		self._start_request = None
+		self._drop_switch_request()
+		self._stop_event.set()
+		self._wake.set()
+		self._pending_stop = False
+		self._pending_stop_deadline = None
+		self._stop_after_song = False
+		self._status.handoff_in_progress = False
+		self._status.last_handoff_main_id = None
+		self._status.promotion_guard_until = 0.0
+		logger.info("Stop requested")
+
 	# Internal helpers
-	@staticmethod
-	def _same_track(a: Optional[str], b: Optional[str]) -> bool:
+	@property
+	def queue(self) -> PlayQueue:
+		return self._queue
+
+	@queue.setter
+	def queue(self, paths) -> None:
+		self._queue = paths if isinstance(paths, PlayQueue) else PlayQueue(self._paths, paths)
+
+	def _track_key(self, path: str) -> Hashable:
+		"""Identity captured at scan time ((st_dev, st_ino)); unscanned paths compare by path."""
+		return self._paths.key_of(path)
+
+	def _same_track(self, a: Optional[str], b: Optional[str]) -> bool:
 		if not a or not b:
 			return False
-		try:
-			return os.path.samefile(a, b)
-		except Exception:
-			return os.path.realpath(a) == os.path.realpath(b)
+		return self._track_key(a) == self._track_key(b)
+
+	def _volume_for(self, player, volume: Optional[int] = None) -> int:
+		"""Output volume for ``player``: the user volume plus its track's loudness gain."""
+		base = self.current_volume if volume is None else volume
+		path = self._player_paths.get(id(player))
+		if not self.normalize_loudness or not path:
+			return max(0, min(100, int(base)))
+		info = self.library.get(path)
+		gain = gain_db(info.loudness if info else None, self.loudness_target_lufs)
+		return max(0, min(100, int(round(base * 10 ** (gain / 20.0)))))
+
+	def _intern(self, batch) -> List[int]:
+		return [self._paths.intern(f.path, (f.dev, f.ino)) for f in batch]
 
 	def _load_and_shuffle(self, folder: str) -> None:
 		folder_path = os.path.join(self.music_base_dir, folder)
+		self._scan_token += 1
+		self._scene_load_t = self._now()
+		prepared = self._take_prepared(folder)
+		if prepared is not None:
+			self.queue = prepared.queue
+			self.queue_pos = 0
+			if prepared.player is not None:
+				self._warm_player = (prepared.queue[0], prepared.player)
+			logger.info(f"Using prewarmed scene '{folder}' ({len(prepared.queue)} files)")
+			return
 		if not os.path.exists(folder_path):
 			logger.warning(f"Folder '{folder_path}' does not exist.")
 			self.queue = []
 			return
-		files: List[str] = []
-		seen = set()
-		for f in os.listdir(folder_path):
-			if f.lower().endswith((".mp3", ".wav", ".ogg")):
-				p = os.path.realpath(os.path.join(folder_path, f))
-				if p not in seen:
-					seen.add(p)
-					files.append(p)
-		random.shuffle(files)
-		self.queue = files
+		# Cached, deduplicated realpaths; a cold folder is walked and streamed in batches,
+		# so playback starts on the first batch while the rest of the tree is still scanned.
+		batches = self.scenes.iter_entries(folder_path)
+		ids = self._intern(next(batches, []))
+		random.shuffle(ids)
+		self.queue = PlayQueue.from_ids(self._paths, ids)
 		self.queue_pos = 0
+		files = self.queue[:]
+		# Index in play order so the first songs are ready soonest; unchanged files are stat-only.
+		self.library.refresh_async(files)
+		self.analyzer.submit(files)
 		logger.info(f"Loaded and shuffled {len(files)} files from {folder_path}")
+		token = self._scan_token
+		self.clock.spawn(lambda: self._extend_queue(token, folder_path, batches), name="scene-scan")
 
-	def _get_song_length(self, song: str) -> float:
-		DEFAULT = 180.0
+	def _prepare_scene(self, folder: str, fut: Future) -> None:
+		ok = False
+		try:
+			folder_path = os.path.join(self.music_base_dir, folder)
+			ids: List[int] = []
+			if os.path.exists(folder_path):
+				batches = self.scenes.iter_entries(folder_path)
+				try:
+					for batch in batches:
+						ids.extend(self._intern(batch))
+				finally:
+					batches.close()
+			if ids:
+				random.shuffle(ids)
+				queue = PlayQueue.from_ids(self._paths, ids)
+				files = queue[:]
+				self.library.refresh_async(files)
+				self.analyzer.submit(files)
+				handle = self._open_paused(files[0])
+				self._set_prepared(_PreparedScene(folder, queue, handle, self._now()))
+				logger.info(f"Prewarmed scene '{folder}': {len(files)} files, first track {'open' if handle else 'not opened'}")
+				ok = True
+		except Exception as e:
+			logger.warning(f"Prewarming scene '{folder}' failed: {e}")
+		finally:
+			fut.set_result(ok)
+
+	def _open_paused(self, path: str):
+		"""A handle for ``path`` that has started (muted) and is paused, so resuming it is instant."""
+		try:
+			player = self._open(path)
+		except Exception as e:
+			logger.debug(f"Could not open {path} ahead of time: {e}")
+			return None
+		try:
+			self._ramps.set(player, 0)
+			player.play()
+			if wait_until(lambda: self._player_started(player), 2.0, poll=0.05, clock=self.clock):
+				player.set_pause(1)
+				return player
+		except Exception as e:
+			logger.debug(f"Could not preroll {path}: {e}")
+		self._recycle(player)
+		return None
+
+	def _set_prepared(self, prepared: Optional[_PreparedScene]) -> None:
+		with self._prepared_lock:
+			old, self._prepared = self._prepared, prepared
+		if old is not None:
+			self._discard_prepared(old)
+		if prepared is not None:
+			self._prewarm_stats["prepared"] += 1
+			if self._closed:
+				self._set_prepared(None)
+
+	def _take_prepared(self, folder: str) -> Optional[_PreparedScene]:
+		"""The prepared scene if it is for ``folder`` and fresh; another folder's stays pending."""
+		with self._prepared_lock:
+			prepared = self._prepared
+			if prepared is None or prepared.folder != folder:
+				return None
+			self._prepared = None
+		if self._now() - prepared.ready_at > self.prewarm_ttl:
+			self._discard_prepared(prepared)
+			return None
+		self._prewarm_stats["used"] += 1
+		return prepared
+
+	def _discard_prepared(self, prepared: _PreparedScene) -> None:
+		self._recycle(prepared.player)
+		self._prewarm_stats["discarded"] += 1
+
+	def _take_switch_request(self) -> Optional[float]:
+		"""Load the requested scene's queue (caller holds self._lock); returns the requested fade."""
+		folder, volume, fade = self._switch_scene_request
+		self._switch_scene_request = None
+		self.current_folder = folder
+		if volume is not None:
+			self._apply_volume(volume)
+		self._load_and_shuffle(folder)
+		self.queue_pos = 0
+		self._started_next_ids.clear()
+		return fade
+
+	def _record_switch_audible(self) -> None:
+		if self._switch_requested_at is not None:
+			self._switch_latencies.append(round((self._now() - self._switch_requested_at) * 1000.0, 1))
+			self._switch_requested_at = None
+
+	def _open_switch_target(self) -> Tuple[Optional[str], object, float]:
+		"""Load a requested immediate switch and open its first track (muted, playing)."""
+		with self._lock:
+			fade = self._take_switch_request()
+			self._next_index_pending = 0 if self.queue else None
+		if not self.queue:
+			return None, None, fade
+		song = self.queue[0]
+		player = self._open_preroll(song)
+		if player is not None:
+			wait_until(lambda: self._player_started(player), 1.5, poll=0.05, clock=self.clock)
+		logger.info(f"Switching scene to '{self.current_folder}' with a {fade:.1f}s crossfade: {song}")
+		return song, player, fade
+
+	def _extend_queue(self, token: int, folder_path: str, batches) -> None:
+		"""Merge the remaining scan batches into the unplayed part of the queue."""
+		added = 0
 		try:
-			media = self._vlc_instance.media_new(song)
+			for batch in batches:
+				with self._lock:
+					if token != self._scan_token:
+						return
+					# Shuffle the new files into the positions after the current and pending
+					# tracks, so those indices stay valid.
+					start = max(self.queue_pos, self._next_index_pending if self._next_index_pending is not None else -1) + 1
+					self.queue.insert_shuffled(self._intern(batch), start)
+				files = [f.path for f in batch]
+				added += len(files)
+				self.library.refresh_async(files)
+				self.analyzer.submit(files)
+		except Exception as e:
+			logger.warning(f"Background scan of '{folder_path}' failed: {e}")
+		finally:
+			batches.close()
+		if added:
+			logger.info(f"Scan of {folder_path} added {added} more files ({len(self.queue)} total)")
+
+	def _probe_track(self, path: str) -> Optional[TrackMeta]:
+		"""Blocking VLC parse; only ever runs on the index worker."""
+		media = self._vlc_instance.media_new(path)
+		try:
+			media.parse()
+		except Exception:
 			try:
-				media.parse()
+				media.parse_with_options(vlc.MediaParseFlag.local, timeout=5)  # type: ignore[attr-defined]
 			except Exception:
-				try:
-					media.parse_with_options(vlc.MediaParseFlag.local, timeout=5)  # type: ignore[attr-defined]
-				except Exception:
-					pass
-			for _ in range(10):
-				length_ms = media.get_duration()
+				pass
+		length_ms = 0
+		for _ in range(10):
+			length_ms = media.get_duration()
+			if length_ms and length_ms > 0:
+				break
+			self.clock.sleep(0.05)
+		meta = {}
+		for key in ("Title", "Artist", "Album"):
+			try:
+				meta[key.lower()] = media.get_meta(getattr(vlc.Meta, key)) or None
+			except Exception:
+				meta[key.lower()] = None
+		try:
+			media.release()
+		except Exception:
+			pass
+		if not length_ms or length_ms <= 0:
+			return None
+		return TrackMeta(duration=length_ms / 1000.0, **meta)
+
+	def _get_song_length(self, song: str, player=None) -> float:
+		"""Indexed or VLC-reported length; never parses on the play loop."""
+		DEFAULT = 180.0
+		cached = self.library.duration(song)
+		if cached:
+			return cached
+		# Not indexed yet: the index worker probes it, and a started MediaPlayer
+		# knows its length without a parse in the meantime.
+		self.library.refresh_async([song])
+		if player is not None:
+			try:
+				length_ms = player.get_length()
 				if length_ms and length_ms > 0:
 					return length_ms / 1000.0
-				time.sleep(0.05)
-			logger.warning(f"Could not get positive length for '{song}'. Using default {DEFAULT}s.")
-			return DEFAULT
-		except Exception as e:
-			logger.warning(f"Could not get length for '{song}': {e}. Using default {DEFAULT}s.")
-			return DEFAULT
+			except Exception as e:
+				logger.debug(f"get_length failed for '{song}': {e}")
+		logger.warning(f"Length of '{song}' not known yet. Using default {DEFAULT}s until it is indexed.")
+		return DEFAULT
 
 	def _pick_next_distinct_index(self, current_index: int) -> Optional[int]:
-		if not self.queue:
+		"""Next queue index holding a different track (O(1) amortised, no filesystem calls)."""
+		return self.queue.next_distinct(current_index)
+
+	def _attach_events(self, player) -> bool:
+		"""Subscribe to libvlc events for ``player``; False if events are unavailable."""
+		try:
+			em = player.event_manager()
+			et = vlc.EventType
+			for kind in (et.MediaPlayerEndReached, et.MediaPlayerEncounteredError, et.MediaPlayerPlaying):
+				em.event_attach(kind, self._on_vlc_event, player)
+			em.event_attach(et.MediaPlayerTimeChanged, self._on_vlc_time, player)
+			self._events_supported = True
+			return True
+		except Exception:
+			return False
+
+	def _on_vlc_event(self, event, player=None) -> None:
+		# Runs on a libvlc thread: only wake the playback loop, never call back into VLC here.
+		if player is not None and player is self._player_main and getattr(event, "type", None) == vlc.EventType.MediaPlayerEndReached:
+			self._main_ended = (id(player), self._now())
+		self._wake.set()
+
+	def _on_vlc_time(self, event, player=None) -> None:
+		# Fires several times per second; record the position without waking the loop.
+		if player is None or player is not self._player_main:
+			return
+		try:
+			self._main_time = (id(player), int(event.u.new_time), self._now())
+		except Exception:
+			pass
+
+	def _record_handoff(self, kind: str, to_path: Optional[str], hand: dict, next_started: bool = True) -> None:
+		"""Turn the milestones collected during one transition into a ``HandoffEvent``."""
+		now = self._now()
+		ended = self._main_ended
+		self._main_ended = None
+		end_t = now
+		if kind == PROMOTION and ended is not None and ended[0] == id(self._player_main):
+			end_t = ended[1]
+		fade_at = hand.get("fade_at")
+		ready = hand.get("preroll_ready")
+		ev = HandoffEvent(kind, self.now_playing, to_path, at=self.clock.time(), next_started=next_started)
+		ev.planned_fade_start = hand.get("planned")
+		ev.actual_fade_start = hand.get("actual")
+		if ev.planned_fade_start is not None and ev.actual_fade_start is not None:
+			ev.fade_start_late = ev.actual_fade_start - ev.planned_fade_start
+		ev.overlap = max(0.0, end_t - fade_at) if fade_at is not None else 0.0
+		if "resumed" in hand:
+			ev.gap = max(0.0, hand["resumed"] - end_t)
+		if ready is not None and "preroll_open" in hand:
+			ev.preroll = ready - hand["preroll_open"]
+			ev.preroll_margin = (fade_at if fade_at is not None else hand.get("resumed", now)) - ready
+		ramp = hand.get("ramp")
+		if ramp is not None and ramp.lateness:
+			late = sorted(ramp.lateness)
+			ev.step_late_p50_ms = round(late[len(late) // 2] * 1000.0, 3)
+			ev.step_late_max_ms = round(late[-1] * 1000.0, 3)
+		self.handoffs.record(ev)
+		logger.info(
+			f"Handoff {kind}: gap={ev.gap:.3f}s overlap={ev.overlap:.2f}s "
+			f"fade_late={ev.fade_start_late if ev.fade_start_late is not None else 'n/a'} -> {to_path}"
+		)
+
+	def _media_elapsed(self, fallback: float) -> float:
+		"""Seconds into the main track from the last TimeChanged event, else ``fallback``."""
+		mt = self._main_time
+		if mt is None or self._player_main is None or mt[0] != id(self._player_main):
+			return fallback
+		return mt[1] / 1000.0 + (self._now() - mt[2])
+
+	def _sleep(self, timeout: float) -> None:
+		"""Sleep up to ``timeout`` seconds or until an event / control call wakes the loop."""
+		self.clock.wait(self._wake, max(0.0, timeout))
+		self._wake.clear()
+		self._status.loop_wakeups += 1
+		self._drain_commands()
+
+	def _immediate_switch_pending(self) -> bool:
+		req = self._switch_scene_request
+		return req is not None and req[2] is not None
+
+	def _select_crossfade_candidate(self) -> Optional[str]:
+		if self._pending_stop and self._stop_after_song:
+			with self._lock:
+				self._next_index_pending = None
+			logger.info("Pending stop active — will not start next track; finishing current song")
 			return None
-		n = len(self.queue)
-		if n <= 1:
+		with self._lock:
+			if self._switch_scene_request is not None:
+				self._next_index_pending = None
+				return None
+			idx = self._pick_next_distinct_index(self.queue_pos)
+			if idx is not None:
+				cand = self.queue[idx]
+				recent_same = (
+					self._last_started_path is not None and
+					self._same_track(self._last_started_path, cand) and
+					(self._now() - self._last_started_t) < self._same_start_guard_sec
+				)
+				if not recent_same and self._track_key(cand) in self._started_next_ids:
+					recent_same = True
+				if recent_same or self._same_track(self.now_playing, cand):
+					idx = None
+			next_song = self.queue[idx] if idx is not None else None
+			self._next_index_pending = idx
+		if next_song is not None:
+			logger.info(f"Crossfade candidate idx={idx} path={next_song}")
+		else:
+			logger.info("No suitable next track (will end without crossfade)")
+		return next_song
+
+	def _open_preroll(self, path: str):
+		"""Create the next player muted and start buffering it; it is paused once it plays."""
+		try:
+			candidate = self._acquire(path)
+			self._ramps.set(candidate, 0)
+		except Exception as e:
+			logger.warning(f"Failed creating candidate player for {path}: {e}")
 			return None
-		current = self.queue[current_index]
-		for step in range(1, n):
-			idx = (current_index + step) % n
-			cand = self.queue[idx]
-			if not self._same_track(current, cand):
-				return idx
-		return None
+		with self._lock:
+			claimed = self._player_next is None and not self._status.crossfade_active
+			if claimed:
+				self._player_next = candidate
+				self._status.preroll_active = True
+		if not claimed:
+			self._recycle(candidate)
+			return None
+		try:
+			candidate.play()
+		except Exception as e:
+			logger.warning(f"Failed prerolling {path}: {e}")
+			self._discard_next(candidate)
+			return None
+		return candidate
+
+	@staticmethod
+	def _player_is_active(player) -> bool:
+		if player is None:
+			return False
+		try:
+			st = player.get_state()
+			from vlc import State
+			return st not in (State.Ended, State.Stopped, State.Error, None)
+		except Exception:
+			return False
+
+	@staticmethod
+	def _player_started(player) -> bool:
+		try:
+			st = player.get_state()
+		except Exception:
+			st = None
+		try:
+			from vlc import State
+			if st in (State.Playing, State.Paused):
+				return True
+		except Exception:
+			pass
+		try:
+			tms = player.get_time()
+		except Exception:
+			tms = -1
+		return isinstance(tms, int) and tms > 0
+
+	@staticmethod
+	def _resume_preroll(player) -> None:
+		try:
+			player.set_pause(0)
+		except Exception:
+			try:
+				player.play()
+			except Exception:
+				pass
+
+	def _cue_points(self, song: Optional[str], length: float) -> Tuple[float, float]:
+		"""(start, end) of audible content in media seconds; the whole track when unknown."""
+		info = self.library.get(song) if self.use_cue_points and song else None
+		if info is None or info.cue_out is None:
+			return 0.0, length
+		cue_in = max(0.0, info.cue_in or 0.0)
+		cue_out = min(length, info.cue_out) if length > 0 else info.cue_out
+		if cue_out - cue_in < 2 * max(0.1, float(self.crossfade_sec)):
+			return 0.0, length
+		return cue_in, cue_out
+
+	def _fade_plan(self, song: Optional[str], length: float, crossfade_dur: float, has_next: bool) -> Tuple[float, float]:
+		"""(media offset the track starts at, media time the crossfade starts)."""
+		cue_in, cue_out = self._cue_points(song, length)
+		if not has_next:
+			return cue_in, length
+		return cue_in, max(cue_out - crossfade_dur, cue_in + 1.0)
+
+	def _acquire(self, path: str, start: Optional[float] = None):
+		warm, self._warm_player = self._warm_player, None
+		if warm is not None:
+			if warm[0] == path and start is None:
+				return warm[1]  # prewarmed: media open and paused at its cue-in
+			self._recycle(warm[1])
+		return self._open(path, start)
+
+	def _open(self, path: str, start: Optional[float] = None):
+		if start is None:
+			start = self._cue_points(path, self.library.duration(path) or 0.0)[0]
+		player = self._pool.acquire(path, start)
+		if self.audio_device:
+			try:
+				player.audio_output_device_set(None, self.audio_device)
+			except Exception as e:
+				logger.debug(f"Output device {self.audio_device!r} not applied: {e}")
+		self._player_paths[id(player)] = path
+		return player
+
+	def _recycle(self, player) -> None:
+		if player is None:
+			return
+		self._ramps.forget(player)  # drops its level too; ids get reused
+		self._player_paths.pop(id(player), None)
+		self._pool.release(player)
+
+	def _discard_next(self, player) -> None:
+		if player is None:
+			return
+		with self._lock:
+			if self._player_next is player:
+				self._player_next = None
+				self._next_index_pending = None
+				self._status.crossfade_active = False
+				self._status.preroll_active = False
+		self._recycle(player)
 
 	def _fade_out_and_stop_sync(self, player, fade_sec: float = 0.5) -> None:  # pragma: no cover - timing
+		"""Fade ``player`` to silence on the ramp engine (replacing any active ramp), then stop it."""
 		if not player:
 			return
 		try:
 			fade_time = max(0.0, float(fade_sec))
-			steps = max(1, int(fade_time / 0.05))
-			try:
-				current_vol = max(player.audio_get_volume(), 0)
-			except Exception:
-				current_vol = 0
-			for i in range(steps):
-				try:
-					state = player.get_state()
-					from vlc import State
-					if state in (State.Ended, State.Stopped, State.Error):
-						break
-				except Exception:
-					break
-				new_vol = int(round(max(0, min(100, current_vol * (1 - (i + 1) / steps)))))
-				_safe_set_volume(player, new_vol)
-				time.sleep(0.05)
+			if self._player_is_active(player):
+				ramp = self._ramps.start(player, 0, fade_time, curve=self.fade_curve)
+				ramp.wait(fade_time + 0.5)
 			try:
 				player.stop()
 			except Exception:
@@ -336,32 +1017,29 @@ class Player:
 	# Playback loop
 	def _play_loop(self) -> None:
 		idle_since: Optional[float] = None
+		self._loop_active = True
 		try:
 			while not self._stop_event.is_set():
-				if self._pending_stop and self._pending_stop_deadline and _now() >= self._pending_stop_deadline:
+				self._drain_commands()
+				if self._stop_event.is_set():
+					break
+				if self._pending_stop and self._pending_stop_deadline and self._now() >= self._pending_stop_deadline:
 					logger.info("Pending stop deadline reached — exiting loop.")
 					break
 
 				with self._lock:
 					if self._switch_scene_request:
-						folder, volume = self._switch_scene_request
-						self._switch_scene_request = None
-						self.current_folder = folder
-						if volume is not None:
-							self.set_volume(volume)
-						self._load_and_shuffle(folder)
-						self.queue_pos = 0
+						self._take_switch_request()
 						self._next_index_pending = None
-						self._started_next_paths.clear()
-						logger.info(f"Switched scene to '{folder}' in loop")
+						logger.info(f"Switched scene to '{self.current_folder}' in loop")
 
 				if not self.queue:
 					if idle_since is None:
-						idle_since = _now()
-					elif _now() - idle_since > 10:
+						idle_since = self._now()
+					elif self._now() - idle_since > 10:
 						logger.info("Queue empty >10s — exiting loop.")
 						break
-					time.sleep(0.2)
+					self._sleep(1.0)
 					continue
 				else:
 					idle_since = None
@@ -373,6 +1051,8 @@ class Player:
 				song = self.queue[self.queue_pos]
 				next_index = self._pick_next_distinct_index(self.queue_pos)
 				next_song = self.queue[next_index] if next_index is not None else None
+				if next_song:
+					self.library.refresh_async([next_song])
 
 				# Defensive skip / guard
 				try:
@@ -387,19 +1067,19 @@ class Player:
 						active = st not in (State.Ended, State.Stopped, State.Error, None)
 					if (
 						main_id is not None and self._status.last_handoff_main_id is not None and
-						main_id == self._status.last_handoff_main_id and _now() < self._status.promotion_guard_until
+						main_id == self._status.last_handoff_main_id and self._now() < self._status.promotion_guard_until
 					):
-						time.sleep(0.05)
+						self._sleep(0.05)
 						continue
 					if active and self._same_track(self.now_playing, song):
 						self._status.last_handoff_main_id = main_id
-						time.sleep(0.1)
+						self._sleep(0.1)
 						continue
 				except Exception:
 					pass
 
 				self.now_playing = song
-				_emit_now_playing(song, self.current_volume)
+				_emit_now_playing(song, self.current_volume, self.zone_id)
 				logger.info(f"Now starting queue_pos={self.queue_pos}: {song}")
 				self._status.handoff_in_progress = False
 
@@ -407,11 +1087,13 @@ class Player:
 
 				if self._status.handoff_in_progress:
 					self._status.handoff_in_progress = False
-					continue
+					if self._player_is_active(self._player_main):
+						continue
 
 				if self._pending_stop or self._stop_event.is_set():
 					break
 
+				reshuffle = False
 				with self._lock:
 					if self.queue:
 						if self._next_index_pending is not None:
@@ -419,54 +1101,62 @@ class Player:
 							self._next_index_pending = None
 						else:
 							self.queue_pos = (self.queue_pos + 1) % len(self.queue)
-						if self.queue_pos == 0 and len(self.queue) > 1:
-							random.shuffle(self.queue)
+						reshuffle = self.queue_pos == 0 and len(self.queue) > 1
+				if reshuffle:
+					# Permutes the id array under the queue's own lock; control calls are not blocked.
+					self.queue.shuffle()
 		finally:
 			try:
-				_emit_now_playing(None)
+				_emit_now_playing(None, None, self.zone_id)
 			except Exception:
 				pass
 			for p in (self._player_main, self._player_next):
-				if not p:
-					continue
-				try:
-					p.stop()
-				except Exception:
-					pass
-				try:
-					p.release()
-				except Exception:
-					pass
+				self._recycle(p)
+			if self._warm_player is not None:
+				self._recycle(self._warm_player[1])
+				self._warm_player = None
 			self._player_main = None
 			self._player_next = None
 			self._next_index_pending = None
 			self.now_playing = None
 			self._status.crossfade_active = False
-			self._started_next_paths.clear()
+			self._status.preroll_active = False
+			self._started_next_ids.clear()
 			self._status.handoff_in_progress = False
 			self._status.last_handoff_main_id = None
 			self._status.promotion_guard_until = 0.0
+			if not self._shutting_down:
+				self._save_snapshot(0.0, playing=False)
+			self._loop_active = False
 			logger.info("Playback loop exiting and cleaned up")
 
 	def _play_song_non_blocking(self, song: str, next_song: Optional[str], next_volume: Optional[int] = None) -> None:
 		self._play_epoch += 1
 		epoch = self._play_epoch
-		self._started_next_paths.clear()
+		self._started_next_ids.clear()
 
+		# The previous call leaves its (ended or faded) main player behind; recycle it first.
+		self._recycle(self._player_main)
+		self._main_time = None
+		self._main_ended = None
+		resume_at = self._take_resume_offset(song)
 		try:
-			self._player_main = vlc.MediaPlayer(song)
+			self._player_main = self._acquire(song, resume_at)
 		except Exception as e:
 			logger.warning(f"Failed to create main player for {song}: {e}")
+			self._player_main = None
 			self.now_playing = None
 			return
+		events_ok = self._events_supported
 
-		_safe_unmute_and_volume(self._player_main, 0)
+		self._ramps.set(self._player_main, 0)
 		try:
 			self._player_main.play()
 		except Exception:
 			pass
 
 		def _main_ready() -> bool:
+			self._drain_commands()
 			if self._stop_event.is_set() or epoch != self._play_epoch:
 				return True
 			try:
@@ -480,56 +1170,54 @@ class Player:
 			from vlc import State
 			return st == State.Playing or (isinstance(tms, int) and tms > 0)
 
-		wait_until(_main_ready, 1.5, poll=0.05)
-		_safe_unmute_and_volume(self._player_main, 0)
-
-		for i in range(20):
-			if self._stop_event.is_set() or epoch != self._play_epoch:
-				self._fade_out_and_stop_sync(self._player_main, fade_sec=0.2)
-				self.now_playing = None
-				return
-			vol = int(round(self.current_volume * (i + 1) / 20))
-			_safe_unmute_and_volume(self._player_main, vol)
-			time.sleep(0.05)
-
-		_safe_unmute_and_volume(self._player_main, self.current_volume)
-
-		song_length = self._get_song_length(song)
+		wait_until(_main_ready, 1.5, poll=0.05, event=self._wake if events_ok else None, clock=self.clock)
+		if self._stop_event.is_set() or epoch != self._play_epoch:
+			self._fade_out_and_stop_sync(self._player_main, fade_sec=0.2)
+			self.now_playing = None
+			return
+		if self._scene_load_t is not None:
+			# Scene (re)load to first track audible: the delay a routine change is heard with.
+			self._last_scene_start_ms = (self._now() - self._scene_load_t) * 1000.0
+			self._scene_load_t = None
+			self._record_switch_audible()
+		self._ramps.start(self._player_main, self._volume_for(self._player_main), self.fade_in_sec, curve=self.fade_curve, start_volume=0)
+
+		song_length = self._get_song_length(song, self._player_main)
 		crossfade_dur = max(0.1, float(self.crossfade_sec))
-		fade_start = max(song_length - crossfade_dur, 1.0) if next_song else song_length
-		start_time = _now()
+		fade_dur = crossfade_dur  # length of the transition in progress; a scene switch sets its own
+		cue_in, fade_start = self._fade_plan(song, song_length, crossfade_dur, bool(next_song))
+		start_time = self._now() - (resume_at if resume_at is not None else cue_in)
 		next_started = False
 		next_player = None
+		preroll_done = False
+		preroll_ready_t: Optional[float] = None
 		fade_start_time: Optional[float] = None
+		hand: dict = {}  # telemetry milestones of the transition being prepared
 		from vlc import State
 		terminal_states = (State.Ended, State.Stopped, State.Error)
 
-		def crossfade_step(main_player, next_player_local, ratio_local, target_vol_local) -> bool:
-			_safe_set_volume(main_player, int(round(self.current_volume * (1 - ratio_local))))
+		def finish_crossfade(main_player, next_player_local) -> None:
+			self._record_handoff(CROSSFADE, next_song, hand, next_started=self._player_started(next_player_local))
+			target_vol_local = next_volume if next_volume is not None else self.current_volume
 			target_vol_local = max(0, min(100, int(target_vol_local)))
-			_safe_set_volume(next_player_local, int(round(target_vol_local * ratio_local)))
-			if ratio_local >= 1.0:
-				try:
-					main_player.stop()
-				except Exception:
-					pass
-				self._player_main = next_player_local
-				with self._lock:
-					if self._player_next is next_player_local:
-						self._player_next = None
-					self._status.crossfade_active = False
-				if self._next_index_pending is not None:
-					self.queue_pos = self._next_index_pending
-				self._next_index_pending = None
-				self.now_playing = next_song
-				self._status.handoff_in_progress = True
-				new_main_id = id(self._player_main)
-				self._status.last_handoff_main_id = new_main_id
-				self._status.promotion_guard_until = _now() + self.promotion_guard_window
-				_safe_unmute_and_volume(self._player_main, target_vol_local)
-				_emit_now_playing(self.now_playing, target_vol_local)
-				return True
-			return False
+			self._main_time = None
+			self._player_main = next_player_local
+			self._recycle(main_player)
+			with self._lock:
+				if self._player_next is next_player_local:
+					self._player_next = None
+				self._status.crossfade_active = False
+			if self._next_index_pending is not None:
+				self.queue_pos = self._next_index_pending
+			self._next_index_pending = None
+			self.now_playing = next_song
+			self._status.handoff_in_progress = True
+			new_main_id = id(self._player_main)
+			self._status.last_handoff_main_id = new_main_id
+			self._status.promotion_guard_until = self._now() + self.promotion_guard_window
+			self._ramps.set(self._player_main, self._volume_for(self._player_main, target_vol_local))
+			self._snapshot_due = 0.0
+			_emit_now_playing(self.now_playing, target_vol_local, self.zone_id)
 
 		while True:
 			try:
@@ -540,49 +1228,63 @@ class Player:
 					except Exception:
 						st_main = None
 				if st_main in terminal_states:
+					if next_player is not None and not next_started:
+						# Main ended before the planned fade: hand over to the prerolled track directly.
+						hand["resumed"] = self._now()
+						self._resume_preroll(next_player)
+						next_started = True
 					if next_started and next_player is not None:
 						try:
 							st_next = next_player.get_state()
 						except Exception:
 							st_next = None
 						if st_next not in terminal_states:
+							self._record_handoff(PROMOTION, next_song, hand, next_started=self._player_started(next_player))
+							self._main_time = None
+							self._recycle(self._player_main)
 							self._player_main = next_player
 							with self._lock:
 								if self._player_next is next_player:
 									self._player_next = None
 								self._status.crossfade_active = False
+								self._status.preroll_active = False
 							if self._next_index_pending is not None:
 								self.queue_pos = self._next_index_pending
 							self._next_index_pending = None
 							self.now_playing = next_song
 							self._status.handoff_in_progress = True
 							self._status.last_handoff_main_id = id(self._player_main)
-							self._status.promotion_guard_until = _now() + self.promotion_guard_window
-							_safe_unmute_and_volume(self._player_main, self.current_volume)
+							self._status.promotion_guard_until = self._now() + self.promotion_guard_window
+							if not self._ramps.is_active(self._player_main):
+								self._ramps.start(self._player_main, self._volume_for(self._player_main), self.fade_in_sec, curve=self.fade_curve)
 							try:
-								start_time = _now()
-								song_length = self._get_song_length(self.now_playing)
-								fade_start = max(song_length - crossfade_dur, 1.0) if next_song else song_length
+								song_length = self._get_song_length(self.now_playing, self._player_main)
+								cue_in, fade_start = self._fade_plan(self.now_playing, song_length, crossfade_dur, bool(next_song))
+								start_time = self._now() - cue_in
 							except Exception:
-								start_time = _now()
-								fade_start = _now() + 1.0
+								start_time = self._now()
+								fade_start = self._now() + 1.0
 							next_player = None
 							next_started = False
+							preroll_done = False
+							preroll_ready_t = None
 							fade_start_time = None
-							_emit_now_playing(self.now_playing, self.current_volume)
+							hand = {}
+							self._snapshot_due = 0.0
+							_emit_now_playing(self.now_playing, self.current_volume, self.zone_id)
 							continue
 					break
 			except Exception:
 				break
 
-			elapsed = _now() - start_time
+			elapsed = self._media_elapsed(self._now() - start_time)
 			if self._stop_event.is_set() or epoch != self._play_epoch:
 				self._fade_out_and_stop_sync(self._player_main, fade_sec=0.2)
 				if next_started and next_player:
 					self._fade_out_and_stop_sync(next_player, fade_sec=0.2)
 				self.now_playing = None
 				return
-			if self._pending_stop and self._pending_stop_deadline and _now() >= self._pending_stop_deadline:
+			if self._pending_stop and self._pending_stop_deadline and self._now() >= self._pending_stop_deadline:
 				self._fade_out_and_stop_sync(self._player_main, fade_sec=0.2)
 				if next_started and next_player:
 					self._fade_out_and_stop_sync(next_player, fade_sec=0.2)
@@ -593,142 +1295,153 @@ class Player:
 				self.now_playing = None
 				return
 
-			if not next_started and next_song and elapsed >= fade_start:
-				# If a soft stop is pending, do NOT start a next track; finish current and exit.
+			# Immediate scene switch: crossfade from the current track into the new scene's first.
+			# A crossfade already running finishes first (it ends within crossfade_sec).
+			if not next_started and self._immediate_switch_pending():
+				self._discard_next(next_player)
+				next_song, next_player, fade_dur = self._open_switch_target()
+				if next_player is None:
+					self._fade_out_and_stop_sync(self._player_main, fade_sec=0.2)
+					self.now_playing = None
+					return
+				fade_at = self._now()
+				hand = {"preroll_open": fade_at, "preroll_ready": fade_at, "fade_at": fade_at, "planned": elapsed, "actual": elapsed}
+				self._resume_preroll(next_player)
+				self._ramps.start(self._player_main, 0, fade_dur, curve=self.crossfade_curve)
+				hand["ramp"] = self._ramps.start(
+					next_player, self._volume_for(next_player, self.current_volume), fade_dur, curve=self.crossfade_curve,
+					start_volume=0, on_done=lambda _ramp: self._wake.set(),
+				)
+				with self._lock:
+					self._status.preroll_active = False
+					self._status.crossfade_active = True
+				self._started_next_ids.add(self._track_key(next_song))
+				next_started = True
+				preroll_done = True
+				fade_start_time = fade_at
+				self._last_started_path = next_song
+				self._last_started_t = fade_at
+				if self._scene_load_t is not None:
+					self._last_scene_start_ms = (fade_at - self._scene_load_t) * 1000.0
+					self._scene_load_t = None
+				self._record_switch_audible()
+				continue
+
+			# Preroll: open and buffer the next track ahead of the fade so it starts on time.
+			if not preroll_done and not next_started and next_song and elapsed >= fade_start - max(0.0, self.preroll_sec):
+				preroll_done = True
+				next_song = self._select_crossfade_candidate()
+				if next_song and not self._stop_event.is_set() and epoch == self._play_epoch:
+					hand["preroll_open"] = self._now()
+					next_player = self._open_preroll(next_song)
+
+			if next_player is not None and not next_started and preroll_ready_t is None:
+				if self._player_started(next_player):
+					try:
+						next_player.set_pause(1)
+					except Exception:
+						pass
+					preroll_ready_t = self._now()
+					hand["preroll_ready"] = preroll_ready_t
+
+			if not next_started and preroll_done and elapsed >= fade_start:
+				# A soft stop or scene switch may have arrived after the preroll was opened.
 				if self._pending_stop and self._stop_after_song:
-					with self._lock:
-						self._next_index_pending = None
 					logger.info("Pending stop active — will not start next track; finishing current song")
 					next_song = None
-					# The branches below will detect lack of next_song and fade out near end.
 				with self._lock:
 					if self._switch_scene_request is not None:
 						next_song = None
-						self._next_index_pending = None
-						idx = None
-					else:
-						idx = self._pick_next_distinct_index(self.queue_pos)
-						if idx is not None:
-							cand = self.queue[idx]
-							recent_same = (
-								self._last_started_path is not None and
-								self._same_track(self._last_started_path, cand) and
-								(_now() - self._last_started_t) < self._same_start_guard_sec
-							)
-							try:
-								if not recent_same and os.path.realpath(cand) in self._started_next_paths:
-									recent_same = True
-							except Exception:
-								pass
-							if recent_same or self._same_track(self.now_playing, cand):
-								idx = None
-						next_song = self.queue[idx] if idx is not None else None
-						self._next_index_pending = idx
-						if next_song is not None:
-							logger.info(f"Crossfade candidate idx={idx} path={next_song}")
-						else:
-							logger.info("No suitable next track (will end without crossfade)")
-
+					if next_player is not None and self._player_next is not next_player:
+						next_player = None
 				if not next_song or self._stop_event.is_set() or epoch != self._play_epoch or self._pending_stop:
+					self._discard_next(next_player)
 					self._fade_out_and_stop_sync(self._player_main, fade_sec=0.2)
 					self.now_playing = None
 					return
 
 				try:
-					if os.path.realpath(next_song) in self._started_next_paths:
+					if self._track_key(next_song) in self._started_next_ids:
+						self._discard_next(next_player)
 						self._fade_out_and_stop_sync(self._player_main, fade_sec=0.2)
 						self.now_playing = None
 						return
 				except Exception:
 					pass
 
-				candidate_player = None
-				try:
-					candidate_player = vlc.MediaPlayer(next_song)
-					_safe_unmute_and_volume(candidate_player, 0)
-				except Exception as e:
-					logger.warning(f"Failed creating candidate player for {next_song}: {e}")
-					candidate_player = None
-
-				if candidate_player is not None:
-					with self._lock:
-						if self._player_next is None and not self._status.crossfade_active and self._next_index_pending == self._next_index_pending:
-							self._player_next = candidate_player
-							next_player = candidate_player
-							self._status.crossfade_active = True
-						else:
-							next_player = None
-					if next_player is None:
-						try:
-							candidate_player.stop()
-						except Exception:
-							pass
-						try:
-							candidate_player.release()
-						except Exception:
-							pass
+				if next_player is None:
+					# Preroll failed or was dropped; retry opening without a head start.
+					hand.setdefault("preroll_open", self._now())
+					next_player = self._open_preroll(next_song)
+				if next_player is not None:
+					fade_at = self._now()
+					hand.update(fade_at=fade_at, planned=fade_start, actual=self._media_elapsed(fade_at - start_time))
+					margin = (fade_at - preroll_ready_t) if preroll_ready_t is not None else 0.0
+					self._status.last_preroll_margin = margin
+					if preroll_ready_t is None:
+						logger.warning(f"Next track not buffered at fade start: {next_song}")
 					else:
-						if self._stop_event.is_set() or epoch != self._play_epoch:
-							try:
-								next_player.stop()
-							except Exception:
-								pass
-							with self._lock:
-								if self._player_next is next_player:
-									self._player_next = None
-									self._next_index_pending = None
-									self._status.crossfade_active = False
-							try:
-								next_player.release()
-							except Exception:
-								pass
-							next_player = None
-						else:
-							try:
-								next_player.play()
-								t1 = _now()
-								while _now() - t1 < 2.0:
-									if self._stop_event.is_set() or epoch != self._play_epoch:
-										break
-									try:
-										st_next = next_player.get_state()
-									except Exception:
-										st_next = None
-									if st_next not in terminal_states:
-										break
-									time.sleep(0.05)
-								_safe_unmute_and_volume(next_player, 0)
-								try:
-									self._started_next_paths.add(os.path.realpath(next_song))
-								except Exception:
-									pass
-								next_started = True
-								fade_start_time = _now()
-								self._last_started_path = next_song
-								self._last_started_t = _now()
-							except Exception:
-								with self._lock:
-									if self._player_next is next_player:
-										self._player_next = None
-										self._next_index_pending = None
-										self._status.crossfade_active = False
-								try:
-									next_player.stop()
-								except Exception:
-									pass
-								try:
-									next_player.release()
-								except Exception:
-									pass
-								next_player = None
+						logger.debug(f"Preroll margin {margin:.2f}s for {next_song}")
+					self._resume_preroll(next_player)
+					target_vol = next_volume if next_volume is not None else self.current_volume
+					self._ramps.start(self._player_main, 0, crossfade_dur, curve=self.crossfade_curve)
+					hand["ramp"] = self._ramps.start(
+						next_player, self._volume_for(next_player, target_vol), crossfade_dur, curve=self.crossfade_curve, start_volume=0,
+						on_done=lambda _ramp: self._wake.set(),
+					)
+					with self._lock:
+						self._status.preroll_active = False
+						self._status.crossfade_active = True
+					try:
+						self._started_next_ids.add(self._track_key(next_song))
+					except Exception:
+						pass
+					next_started = True
+					fade_start_time = fade_at
+					self._last_started_path = next_song
+					self._last_started_t = fade_at
 
 			if next_started and next_player and fade_start_time is not None:
-				fade_elapsed = _now() - fade_start_time
-				ratio = min(max(fade_elapsed / crossfade_dur, 0.0), 1.0)
-				target_vol = next_volume if next_volume is not None else self.current_volume
-				if crossfade_step(self._player_main, next_player, ratio, target_vol):
+				if self._now() >= fade_start_time + fade_dur or not self._ramps.is_active(next_player):
+					finish_crossfade(self._player_main, next_player)
+					# Keep chaining in this call: the promoted track already played for the fade length.
+					self._started_next_ids.intersection_update({self._track_key(self.now_playing or "")})
+					song_length = self._get_song_length(self.now_playing, self._player_main)
+					cue_in, fade_start = self._fade_plan(self.now_playing, song_length, crossfade_dur, True)
+					start_time = self._now() - cue_in - fade_dur
+					fade_dur = crossfade_dur
 					next_player = None
-			time.sleep(0.05)
+					next_started = False
+					preroll_done = False
+					preroll_ready_t = None
+					fade_start_time = None
+					hand = {}
+					continue
+
+			# Sleep until the next deadline; libvlc events (end, error, playing) and control
+			# calls wake us earlier. Without events, fall back to short polling.
+			if next_started and fade_start_time is not None:
+				# The ramp engine runs the fade; its completion callback wakes us for the handoff.
+				timeout = fade_start_time + fade_dur - self._now()
+			else:
+				deadlines = [self.idle_wakeup_sec if events_ok else self.poll_sec]
+				if next_song and not preroll_done:
+					deadlines.append(fade_start - max(0.0, self.preroll_sec) - elapsed)
+				if preroll_done:
+					deadlines.append(fade_start - elapsed)
+					if next_player is not None and preroll_ready_t is None:
+						deadlines.append(self.idle_wakeup_sec if events_ok else self.poll_sec)
+				if self._pending_stop:
+					if not next_song:
+						deadlines.append(song_length - 0.25 - elapsed)
+					if self._pending_stop_deadline:
+						deadlines.append(self._pending_stop_deadline - self._now())
+				if self.snapshots is not None:
+					if self._now() >= self._snapshot_due:
+						self._save_snapshot(elapsed)
+					deadlines.append(self._snapshot_due - self._now())
+				timeout = min(deadlines)
+			self._sleep(timeout)
 
 		try:
 			if self._player_main:
@@ -737,16 +1450,10 @@ class Player:
 			pass
 		with self._lock:
 			if self._player_next is not None:
-				try:
-					self._player_next.stop()
-				except Exception:
-					pass
-				try:
-					self._player_next.release()
-				except Exception:
-					pass
+				self._recycle(self._player_next)
 				self._player_next = None
 			self._status.crossfade_active = False
+			self._status.preroll_active = False
 			self._next_index_pending = None
 		return
 
@@ -757,6 +1464,8 @@ __all__ = [
 	"PlayerPhase",
 	"register_player_listener",
 	"unregister_player_listener",
+	"register_zone_listener",
+	"unregister_zone_listener",
 	"notify_from_player",
 ]
 
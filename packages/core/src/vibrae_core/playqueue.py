@@ -0,0 +1,177 @@
+"""Compact play queue: paths interned once in a shared table, order kept as ``array('I')``.
+
+A 100k-track scene costs 4 bytes per queue slot instead of a fresh list of
+path references per load, and a reshuffle permutes integers (vectorized with
+NumPy when installed) under the queue's own lock rather than the player's.
+The queue still reads like a list of paths: ``len``, indexing, iteration.
+"""
+
+import random
+import threading
+from array import array
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+_RUN_TO_END = (1 << 8 * array(_TYPECODE).itemsize) - 1  # run_end of a run that reaches the end
+
+
+class PathTable:
+    """Interned paths (id -> path) with the scan-time identity used to compare tracks."""
+
+    def __init__(self):
+        self._paths: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._keys: List[Hashable] = []
+        self._lock = threading.Lock()
+
+    def intern(self, path: str, key: Optional[Hashable] = None) -> int:
+        """Id of ``path``, adding it if new; ``key`` (e.g. (st_dev, st_ino)) replaces a stale identity."""
+        i = self._ids.get(path)
+        if i is None:
+            with self._lock:
+                i = self._ids.get(path)
+                if i is None:
+                    i = len(self._paths)
+                    self._paths.append(path)
+                    self._keys.append(key if key is not None else path)
+                    self._ids[path] = i
+                    return i
+        if key is not None and self._keys[i] != key:
+            self._keys[i] = key
+        return i
+
+    def path(self, i: int) -> str:
+        return self._paths[i]
+
+    def key(self, i: int) -> Hashable:
+        return self._keys[i]
+
+    def key_of(self, path: str) -> Hashable:
+        """Identity of ``path``; paths never interned compare by themselves."""
+        i = self._ids.get(path)
+        return path if i is None else self._keys[i]
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+
+class PlayQueue:
+    """Sequence of paths backed by an index array into a ``PathTable``."""
+
+    def __init__(self, table: Optional[PathTable] = None, paths: Iterable[str] = ()):
+        self.table = table if table is not None else PathTable()
+        self._order = array(_TYPECODE, (self.table.intern(p) for p in paths))
+        self._lock = threading.Lock()
+        self.version = 0  # bumped on every reorder/append
+        self._runs: Optional[Tuple[int, array]] = None
+
+    @classmethod
+    def from_ids(cls, table: PathTable, ids: Iterable[int]) -> "PlayQueue":
+        q = cls(table)
+        q._order = array(_TYPECODE, ids)
+        return q
+
+    # Sequence protocol
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            return [self.table.path(j) for j in self._order[i]]
+        return self.table.path(self._order[i])
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.table.path(j) for j in self._order[:])
+
+    def __repr__(self) -> str:
+        return f"PlayQueue({len(self)} tracks)"
+
+    def index(self, path: str) -> int:
+        """First position of ``path``; ValueError if it is not queued."""
+        return self._order.index(self.table.intern(path))
+
+    @property
+    def nbytes(self) -> int:
+        return self._order.itemsize * len(self._order)
+
+    # Mutation
+    def append(self, path: str) -> None:
+        with self._lock:
+            i = self.table.intern(path)
+            order, runs = self._order, self._runs
+            fresh = runs is not None and runs[0] == self.version and len(runs[1]) == len(order)
+            order.append(i)
+            self.version += 1
+            if not fresh:
+                return
+            # Extend the run table in place: if the new track differs from the last one,
+            # the trailing run now ends at it. Each slot is resolved at most once.
+            run_end, n = runs[1], len(order) - 1
+            key = self.table.key
+            if n and key(order[n - 1]) != key(i):
+                j = n - 1
+                while j >= 0 and run_end[j] == _RUN_TO_END:
+                    run_end[j] = n
+                    j -= 1
+            run_end.append(_RUN_TO_END)
+            self._runs = (self.version, run_end)
+
+    def insert_shuffled(self, ids: Iterable[int], start: int) -> None:
+        """Merge ``ids`` at random positions at or after ``start`` (inside-out Fisher-Yates)."""
+        with self._lock:
+            order = self._order
+            for i in ids:
+                order.append(i)
+                j = random.randint(min(start, len(order) - 1), len(order) - 1)
+                order[-1], order[j] = order[j], order[-1]
+            self.version += 1
+
+    def shuffle(self) -> None:
+        with self._lock:
+            if np is not None and _TYPECODE == "I" and len(self._order) > 1:
+                perm = np.frombuffer(self._order, dtype=np.uint32).copy()
+                np.random.shuffle(perm)
+                self._order = array(_TYPECODE, perm.tobytes())
+            else:
+                random.shuffle(self._order)
+            self.version += 1
+
+    # Queries
+    def next_distinct(self, current: int) -> Optional[int]:
+        """Next index (wrapping) holding a different track than ``current``, or None.
+
+        O(1) from a table of where each run of identical neighbours ends; no
+        filesystem calls. ``append`` extends the table in amortised O(1), while a
+        shuffle or ``insert_shuffled`` rebuilds it in O(n) on the next call.
+        """
+        n = len(self._order)
+        if n <= 1 or not 0 <= current < n:
+            return None
+        runs = self._runs
+        if runs is None or runs[0] != self.version or len(runs[1]) != n:
+            with self._lock:
+                key = self.table.key
+                keys = [key(i) for i in self._order]
+                n = len(keys)
+                run_end = array(_TYPECODE, [_RUN_TO_END]) * n
+                for i in range(n - 2, -1, -1):
+                    run_end[i] = run_end[i + 1] if keys[i] == keys[i + 1] else i + 1
+                runs = self._runs = (self.version, run_end)
+            if current >= n:
+                return None
+        run_end = runs[1]
+        if run_end[current] < n:
+            return run_end[current]
+        # Current run reaches the end: wrap to the first index outside it.
+        key = self.table.key
+        if key(self._order[0]) != key(self._order[current]):
+            return 0
+        return run_end[0] if run_end[0] < n else None
+
+
+__all__ = ["PathTable", "PlayQueue"]
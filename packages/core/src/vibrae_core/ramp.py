@@ -0,0 +1,275 @@
+"""Volume ramp engine: all fades and crossfades run here, off the playback thread.
+
+A single worker thread ticks at a fixed rate while at least one ramp is
+active and sleeps on an event otherwise; all timing goes through a ``Clock``. Starting a ramp on a player that
+already has one replaces it immediately, so stop/switch can interrupt a fade
+mid-way. Each tick's wake-up lateness is recorded for jitter statistics.
+"""
+
+import logging
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+
+from vibrae_core.clock import SYSTEM_CLOCK, Clock
+
+logger = logging.getLogger("vibrae_core.player")
+
+LINEAR = "linear"
+EQUAL_POWER = "equal_power"
+LOG = "log"
+CURVES = (LINEAR, EQUAL_POWER, LOG)
+
+_LOG_FLOOR_DB = -60.0
+
+
+def _to_db(volume: float) -> float:
+    if volume <= 0:
+        return _LOG_FLOOR_DB
+    return max(_LOG_FLOOR_DB, 20.0 * math.log10(volume / 100.0))
+
+
+def curve_value(curve: str, start: float, end: float, x: float) -> float:
+    """Volume (0-100) at progress ``x`` in [0, 1] of a ramp from ``start`` to ``end``.
+
+    ``equal_power`` uses sin for rising and cos for falling ramps, so two
+    opposing ramps keep constant summed power through a crossfade. ``log``
+    interpolates linearly in dB (floor -60 dB) for a perceptually even fade.
+    """
+    x = min(1.0, max(0.0, x))
+    if curve == EQUAL_POWER:
+        if end >= start:
+            return start + (end - start) * math.sin(x * math.pi / 2)
+        return end + (start - end) * math.cos(x * math.pi / 2)
+    if curve == LOG:
+        if x <= 0.0:
+            return start
+        if x >= 1.0:
+            return end
+        db = _to_db(start) + (_to_db(end) - _to_db(start)) * x
+        return 100.0 * (10 ** (db / 20.0))
+    return start + (end - start) * x
+
+
+@dataclass
+class Ramp:
+    player: object
+    start_volume: float
+    end_volume: float
+    start_t: float
+    duration: float
+    curve: str = LINEAR
+    on_done: Optional[Callable[["Ramp"], None]] = None
+    clock: Clock = SYSTEM_CLOCK
+    done: Optional[threading.Event] = None  # created from ``clock`` unless given
+    cancelled: bool = False
+    last_applied: Optional[int] = None
+    lateness: List[float] = field(default_factory=list)  # per-tick wake-up lateness while active
+
+    def __post_init__(self):
+        if self.done is None:
+            self.done = self.clock.event()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.clock.wait(self.done, timeout)
+
+
+class RampEngine:
+    def __init__(self, rate_hz: float = 50.0, jitter_samples: int = 2048, clock: Clock = SYSTEM_CLOCK):
+        self.interval = 1.0 / max(1.0, rate_hz)
+        self.clock = clock
+        self._ramps: Dict[int, Ramp] = {}
+        self._levels: Dict[int, int] = {}
+        self._cond = threading.Lock()
+        self._kick = clock.event()  # set when a ramp starts; wakes the worker
+        self._thread: Optional[threading.Thread] = None
+        self._lateness: Deque[float] = deque(maxlen=jitter_samples)
+        self._closed = False
+        self.ticks = 0
+
+    # Commands
+    def start(
+        self,
+        player,
+        target: float,
+        duration: float,
+        curve: str = LINEAR,
+        start_volume: Optional[float] = None,
+        on_done: Optional[Callable[[Ramp], None]] = None,
+    ) -> Ramp:
+        """Ramp ``player`` to ``target`` over ``duration`` seconds, replacing any active ramp."""
+        if curve not in CURVES:
+            raise ValueError(f"unknown ramp curve '{curve}'")
+        if start_volume is None:
+            start_volume = self.level(player)
+        ramp = Ramp(player, float(start_volume), float(max(0, min(100, target))), self.clock.monotonic(),
+                    max(0.0, float(duration)), curve, on_done, self.clock)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ramp engine is closed")
+            old = self._ramps.get(id(player))
+            if old is not None:
+                old.cancelled = True
+            self._ramps[id(player)] = ramp
+            self._ensure_thread()
+        self._kick.set()
+        if old is not None:
+            old.done.set()
+        return ramp
+
+    def cancel(self, player, volume: Optional[int] = None) -> None:
+        """Stop automation for ``player`` now, optionally jumping to ``volume``."""
+        with self._cond:
+            ramp = self._ramps.pop(id(player), None)
+        if ramp is not None:
+            ramp.cancelled = True
+            ramp.done.set()
+        if volume is not None:
+            self._apply(player, volume)
+
+    def retarget(self, player, target: float) -> bool:
+        """Point an active rising ramp at a new end volume. True if ``player`` is under automation."""
+        with self._cond:
+            ramp = self._ramps.get(id(player))
+            if ramp is None:
+                return False
+            if ramp.end_volume > 0:
+                ramp.end_volume = float(max(0, min(100, target)))
+            return True
+
+    def set(self, player, volume: int) -> None:
+        """Set a volume directly (cancels any ramp)."""
+        self.cancel(player, volume)
+
+    def forget(self, player) -> None:
+        """Drop automation and the remembered level for a released player."""
+        self.cancel(player)
+        with self._cond:
+            self._levels.pop(id(player), None)
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Cancel every ramp and stop the worker thread."""
+        with self._cond:
+            self._closed = True
+            ramps = list(self._ramps.values())
+            self._ramps.clear()
+            self._levels.clear()
+            thread = self._thread
+        for ramp in ramps:
+            ramp.cancelled = True
+            ramp.done.set()
+        self._kick.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    # Queries
+    def is_active(self, player) -> bool:
+        with self._cond:
+            return id(player) in self._ramps
+
+    def level(self, player) -> int:
+        with self._cond:
+            lvl = self._levels.get(id(player))
+        if lvl is not None:
+            return lvl
+        try:
+            return max(0, int(player.audio_get_volume()))
+        except Exception:
+            return 0
+
+    def stats(self) -> Dict[str, float]:
+        """Tick lateness (ms) over the recent window: count, mean, p50, p95, max."""
+        with self._cond:
+            samples = sorted(self._lateness)
+            ticks = self.ticks
+        if not samples:
+            return {"ticks": ticks, "count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        n = len(samples)
+        return {
+            "ticks": ticks,
+            "count": n,
+            "mean_ms": round(sum(samples) / n * 1000.0, 3),
+            "p50_ms": round(samples[int(0.50 * (n - 1))] * 1000.0, 3),
+            "p95_ms": round(samples[int(0.95 * (n - 1))] * 1000.0, 3),
+            "max_ms": round(samples[-1] * 1000.0, 3),
+        }
+
+    # Internals
+    def _apply(self, player, volume: float) -> int:
+        vol = int(round(max(0, min(100, volume))))
+        try:
+            player.audio_set_mute(False)
+        except Exception as e:
+            logger.debug(f"Unmute failed: {e}")
+        try:
+            player.audio_set_volume(vol)
+        except Exception as e:
+            logger.debug(f"Setting volume {vol} failed: {e}")
+        with self._cond:
+            self._levels[id(player)] = vol
+        return vol
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = self.clock.spawn(self._run, name="volume-ramps")
+
+    def _run(self) -> None:
+        clock = self.clock
+        next_tick = clock.monotonic()
+        while True:
+            while True:
+                with self._cond:
+                    if self._closed:
+                        return
+                    ramps = list(self._ramps.values())
+                if ramps:
+                    break
+                clock.wait(self._kick, None)
+                self._kick.clear()
+                next_tick = clock.monotonic()
+            now = clock.monotonic()
+            finished = []
+            for ramp in ramps:
+                if ramp.cancelled:
+                    continue
+                x = 1.0 if ramp.duration <= 0 else (now - ramp.start_t) / ramp.duration
+                vol = int(round(curve_value(ramp.curve, ramp.start_volume, ramp.end_volume, x)))
+                if vol != ramp.last_applied:
+                    ramp.last_applied = self._apply(ramp.player, vol)
+                if x >= 1.0:
+                    finished.append(ramp)
+            if finished:
+                with self._cond:
+                    for ramp in finished:
+                        if self._ramps.get(id(ramp.player)) is ramp:
+                            del self._ramps[id(ramp.player)]
+                for ramp in finished:
+                    ramp.done.set()
+                    if ramp.on_done is not None:
+                        try:
+                            ramp.on_done(ramp)
+                        except Exception as e:
+                            logger.debug(f"Ramp completion callback failed: {e}")
+            # Fixed-rate schedule; if we fell more than a tick behind, resync instead of bursting.
+            next_tick += self.interval
+            delay = next_tick - clock.monotonic()
+            if delay < -self.interval:
+                next_tick = clock.monotonic()
+                delay = 0.0
+            with self._cond:
+                active = bool(self._ramps)
+            if active:
+                clock.wait(self._kick, max(0.0, delay))
+                self._kick.clear()
+            with self._cond:
+                woke = clock.monotonic()
+                self.ticks += 1
+                late = max(0.0, woke - next_tick)
+                self._lateness.append(late)
+                for ramp in self._ramps.values():
+                    ramp.lateness.append(late)
+
+
+__all__ = ["RampEngine", "Ramp", "curve_value", "LINEAR", "EQUAL_POWER", "LOG", "CURVES"]
@@ -0,0 +1,288 @@
+"""Compiled routine index: "what should play now" as an array lookup.
+
+Routines are parsed once into windows (minutes of day, weekday and month
+bitmasks). Per zone and month a 10080-slot week-minute table maps each minute
+to the matching routine with the highest ``priority``, ties going to the
+lower id. Month tables are built on first use, so an index only ever holds
+the months it was asked about. The index is immutable; the scheduler swaps in
+a new one when the schedule changes. ``find_conflicts`` lists the routine
+pairs whose windows overlap, with the routine that wins each overlap, and
+``RoutineIndex.forecast`` turns the tables into a timeline of segments.
+"""
+
+import heapq
+import logging
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from vibrae_core.db import SessionLocal
+from vibrae_core.models import Routine, Scene
+from vibrae_core.timespec import DAY_MINUTES, MONTHS, WEEKDAYS, parse_hhmm, parse_mask
+
+logger = logging.getLogger("vibrae_core.routine_index")
+
+WEEK_MINUTES = 7 * DAY_MINUTES
+_ALL_DAYS = (1 << len(WEEKDAYS)) - 1
+_ALL_MONTHS = (1 << len(MONTHS)) - 1
+
+
+@dataclass(frozen=True)
+class RoutineWindow:
+    start: int  # minute of day
+    end: int  # exclusive; < start wraps past midnight
+    weekdays: int  # bit 0 = Monday
+    months: int  # bit 0 = January
+
+    @classmethod
+    def compile(cls, routine: Routine) -> Optional["RoutineWindow"]:
+        if hasattr(routine, "start_minute"):  # typed model columns: nothing to parse
+            start, end = routine.start_minute, routine.end_minute
+            weekdays = _ALL_DAYS if routine.weekday_mask is None else routine.weekday_mask
+            months = _ALL_MONTHS if routine.month_mask is None else routine.month_mask
+        else:
+            start, end = parse_hhmm(routine.start_time), parse_hhmm(routine.end_time)
+            weekdays, months = parse_mask(routine.weekdays, WEEKDAYS), parse_mask(routine.months, MONTHS)
+        # Invalid times never match; equal start/end is a zero-length window, not "always on".
+        if start is None or end is None or start == end:
+            return None
+        return cls(start, end, weekdays, months)
+
+    def in_time(self, minute: int) -> bool:
+        if self.start < self.end:
+            return self.start <= minute < self.end
+        return minute >= self.start or minute < self.end
+
+    def week_spans(self) -> List[Tuple[int, int]]:
+        """Half-open week-minute intervals (Monday 00:00 = 0); a wrapping window's early part stays on its day."""
+        spans = [(self.start, self.end)] if self.start < self.end else [(0, self.end), (self.start, DAY_MINUTES)]
+        return [
+            (day * DAY_MINUTES + lo, day * DAY_MINUTES + hi)
+            for day in range(7) if self.weekdays >> day & 1
+            for lo, hi in spans
+        ]
+
+    def matches(self, now: datetime) -> bool:
+        # Day and month are those of ``now``, also past midnight in a wrapping window.
+        return (
+            self.in_time(now.hour * 60 + now.minute)
+            and bool(self.weekdays >> now.weekday() & 1)
+            and bool(self.months >> (now.month - 1) & 1)
+        )
+
+
+@dataclass
+class ForecastSegment:
+    start: datetime
+    end: datetime  # exclusive
+    zone_id: Optional[int]
+    routine_id: Optional[int]  # None: a gap, nothing plays
+    scene_id: Optional[int] = None
+    scene_name: Optional[str] = None
+    scene_path: Optional[str] = None
+    volume: Optional[int] = None
+
+
+def _change_points(grid: array) -> List[int]:
+    """Indexes where ``grid`` differs from the previous slot."""
+    if np is not None:
+        a = np.frombuffer(grid, dtype=f"u{grid.itemsize}")
+        return (np.flatnonzero(a[1:] != a[:-1]) + 1).tolist()
+    return [i for i in range(1, len(grid)) if grid[i] != grid[i - 1]]
+
+
+def priority(routine: Routine) -> int:
+    return getattr(routine, "priority", None) or 0
+
+
+def precedence(routine: Routine) -> Tuple[int, int]:
+    """Sort key putting the routine that plays where windows overlap first."""
+    return (-priority(routine), routine.id)
+
+
+@dataclass
+class RoutineConflict:
+    first: int  # routine ids, first < second
+    second: int
+    zone_id: Optional[int]
+    winner: int  # the routine that plays in the overlap
+    weekdays: List[str] = field(default_factory=list)
+    months: List[str] = field(default_factory=list)
+
+
+def find_conflicts(routines: Iterable[Routine]) -> List[RoutineConflict]:
+    """Every pair of routines in the same zone whose windows overlap on some minute of some month.
+
+    Sweeps each zone's week intervals in start order with a heap of active ones
+    by end: O(n log n) plus one step per overlapping pair.
+    """
+    by_zone: Dict[Optional[int], List[Tuple[int, int, int]]] = {}
+    compiled: List[Tuple[Routine, RoutineWindow]] = []
+    for r in routines:
+        window = RoutineWindow.compile(r)
+        if window is None:
+            continue
+        i = len(compiled)
+        compiled.append((r, window))
+        by_zone.setdefault(getattr(r, "zone_id", None), []).extend((lo, hi, i) for lo, hi in window.week_spans())
+
+    days: Dict[Tuple[int, int], int] = {}  # (i, j) -> weekday bitmask of the overlap
+    for intervals in by_zone.values():
+        intervals.sort()
+        active: List[Tuple[int, int]] = []  # (end, routine)
+        for lo, hi, i in intervals:
+            while active and active[0][0] <= lo:
+                heapq.heappop(active)
+            for _, j in active:
+                if j != i:
+                    key = (min(i, j), max(i, j))
+                    days[key] = days.get(key, 0) | 1 << (lo // DAY_MINUTES)
+            heapq.heappush(active, (hi, i))
+
+    conflicts = []
+    for (i, j), day_mask in days.items():
+        (a, wa), (b, wb) = compiled[i], compiled[j]
+        months = wa.months & wb.months
+        if not months:
+            continue
+        a, b = sorted((a, b), key=lambda r: r.id)
+        conflicts.append(RoutineConflict(
+            first=a.id, second=b.id, zone_id=getattr(a, "zone_id", None),
+            winner=min(a, b, key=precedence).id,
+            weekdays=[d for n, d in enumerate(WEEKDAYS) if day_mask >> n & 1],
+            months=[m for n, m in enumerate(MONTHS) if months >> n & 1],
+        ))
+    conflicts.sort(key=lambda c: (c.first, c.second))
+    return conflicts
+
+
+class RoutineIndex:
+    def __init__(self, routines: Iterable[Routine], scenes: Iterable[Scene]):
+        self._scenes: Dict[int, Scene] = {s.id: s for s in scenes}
+        # Per zone, routines in precedence order with their windows (uncompilable ones dropped).
+        self._zones: Dict[Optional[int], List[Tuple[Routine, RoutineWindow]]] = {}
+        self.routine_count = 0
+        for r in sorted(routines, key=precedence):
+            self.routine_count += 1
+            window = RoutineWindow.compile(r)
+            if window is None:
+                logger.debug(f"Routine {r.id} has an empty or invalid time window; skipped")
+                continue
+            self._zones.setdefault(getattr(r, "zone_id", None), []).append((r, window))
+        self._tables: Dict[Tuple[Optional[int], int], array] = {}
+
+    @classmethod
+    def load(cls, session_factory=SessionLocal) -> "RoutineIndex":
+        db = session_factory()
+        try:
+            return cls(db.query(Routine).order_by(Routine.id).all(), db.query(Scene).all())
+        finally:
+            db.close()
+
+    def _table(self, zone_id: Optional[int], month: int) -> Optional[array]:
+        """Week-minute table for ``zone_id`` in ``month`` (0-11): 1-based routine position, 0 = idle."""
+        key = (zone_id, month)
+        table = self._tables.get(key)
+        if table is None:
+            entries = self._zones.get(zone_id)
+            if not entries:
+                return None
+            table = array("I", bytes(4 * WEEK_MINUTES))
+            for pos, (_, w) in enumerate(entries, start=1):
+                if not w.months >> month & 1:
+                    continue
+                for lo, hi in w.week_spans():
+                    for i in range(lo, hi):
+                        if not table[i]:  # entries are in precedence order: the first one wins
+                            table[i] = pos
+            self._tables[key] = table  # benign race: two builders produce the same table
+        return table
+
+    def routine_at(self, now: datetime, zone_id: Optional[int] = None) -> Optional[Routine]:
+        table = self._table(zone_id, now.month - 1)
+        if table is None:
+            return None
+        pos = table[now.weekday() * DAY_MINUTES + now.hour * 60 + now.minute]
+        return self._zones[zone_id][pos - 1][0] if pos else None
+
+    def next_change(self, now: datetime, zone_id: Optional[int] = None) -> Optional[datetime]:
+        """Start of the next minute whose routine differs from now's; None if the zone has no routines.
+
+        Month boundaries are reported as changes too (tables are per month), which
+        at worst costs one idle tick at midnight on the 1st.
+        """
+        table = self._table(zone_id, now.month - 1)
+        if table is None:
+            return None
+        minute = now.replace(second=0, microsecond=0)
+        month_end = datetime(now.year + now.month // 12, now.month % 12 + 1, 1)
+        horizon = min(WEEK_MINUTES, int((month_end - minute).total_seconds()) // 60)
+        i0 = now.weekday() * DAY_MINUTES + now.hour * 60 + now.minute
+        current = table[i0]
+        for k in range(1, horizon):
+            if table[(i0 + k) % WEEK_MINUTES] != current:
+                return minute + timedelta(minutes=k)
+        return month_end
+
+    def forecast(self, start: datetime, days: int, zone_id: Optional[int] = None) -> List[ForecastSegment]:
+        """What plays from ``start`` (floored to the minute) for ``days`` days, gaps included.
+
+        The minute grid is cut from the week-minute tables day by day, then split
+        where the routine changes (vectorized when NumPy is installed).
+        """
+        start = start.replace(second=0, microsecond=0)
+        end = start + timedelta(days=days)
+        grid = array("I")
+        day = start
+        while day < end:
+            midnight = day.replace(hour=0, minute=0)
+            lo = day.hour * 60 + day.minute
+            hi = min(DAY_MINUTES, int((end - midnight).total_seconds()) // 60)
+            table = self._table(zone_id, day.month - 1)
+            if table is None:
+                grid.extend([0] * (hi - lo))
+            else:
+                base = day.weekday() * DAY_MINUTES
+                grid.extend(table[base + lo:base + hi])
+            day = midnight + timedelta(days=1)
+
+        entries = self._zones.get(zone_id, [])
+        segments = []
+        bounds = [0] + _change_points(grid) + [len(grid)]
+        for i in range(len(bounds) - 1):
+            lo, hi = bounds[i], bounds[i + 1]
+            seg = ForecastSegment(start + timedelta(minutes=lo), start + timedelta(minutes=hi), zone_id, None)
+            pos = grid[lo]
+            if pos:
+                routine = entries[pos - 1][0]
+                scene = self._scenes.get(routine.scene_id)
+                seg.routine_id, seg.scene_id, seg.volume = routine.id, routine.scene_id, routine.volume
+                if scene is not None:
+                    seg.scene_name, seg.scene_path = scene.name, scene.path
+            segments.append(seg)
+        return segments
+
+    def lookup(self, now: datetime, zone_id: Optional[int] = None) -> Tuple[Optional[Routine], Optional[Scene]]:
+        routine = self.routine_at(now, zone_id)
+        if routine is None:
+            return None, None
+        return routine, self._scenes.get(routine.scene_id)
+
+
+__all__ = [
+    "ForecastSegment",
+    "RoutineConflict",
+    "RoutineIndex",
+    "RoutineWindow",
+    "find_conflicts",
+    "parse_hhmm",
+    "parse_mask",
+    "precedence",
+    "priority",
+]
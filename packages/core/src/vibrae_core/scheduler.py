@@ -1,34 +1,86 @@
 """Scheduler service migrated from legacy backend.scheduler.
 
-Polls DB for matching routine and orchestrates player scene playback.
+Looks up the matching routine and orchestrates player scene playback. Routines
+are compiled into a ``RoutineIndex`` that is rebuilt only after
+``notify_schedule_changed``, so a tick does no DB access. Between ticks the
+thread sleeps until the next routine start or end (or a schedule change), not
+on a fixed poll, waking ``prewarm_sec`` early so players can prepare the
+scenes about to start. With a
+``ZoneManager`` one tick serves every zone, each zone's player following the
+routines scoped to it.
 """
 
 import threading
-import time
 import logging
-from datetime import datetime
-from typing import Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy.orm import Session
-
-from vibrae_core.db import SessionLocal
+from vibrae_core.clock import SYSTEM_CLOCK, Clock
 from vibrae_core.models import Routine, Scene
 from vibrae_core.player import Player
+from vibrae_core.routine_index import RoutineIndex
 
 logger = logging.getLogger("vibrae_core.scheduler")
 
 
+@dataclass
+class _ZoneState:
+    last_scene_id: Optional[int] = None
+    last_routine_id: Optional[int] = None
+    no_match_logged: bool = False
+    primed: bool = False
+    prewarmed: Optional[Tuple[datetime, str]] = None  # (boundary, scene path) last prepared
+
+
 class Scheduler:
-    def __init__(self, player: Player, poll_interval: int = 10):
+    # Sleep past a boundary by this much so the tick reads the new minute.
+    BOUNDARY_SLACK_SEC = 0.05
+
+    def __init__(self, player: Player, poll_interval: int = 300, zones=None, clock: Clock = SYSTEM_CLOCK):
         self.player = player
+        self.zones = zones  # Optional[ZoneManager]; None schedules ``player`` alone
+        # Longest sleep between ticks; only a backstop for wall clock jumps (DST, NTP).
         self.poll_interval = poll_interval
-        self._stop_event = threading.Event()
+        self.prewarm_sec = 120.0  # look-ahead for preparing the next scene; 0 disables
+        self.clock = clock
+        self._stop_event = clock.event()
+        self._wake = clock.event()
         self._thread: Optional[threading.Thread] = None
-
-        self._last_scene_id: Optional[int] = None
-        self._last_routine_id: Optional[int] = None
-        self._last_scene: Optional[Scene] = None
-        self._last_routine: Optional[Routine] = None
+        self._state: Dict[Optional[int], _ZoneState] = {}
+        self._index: Optional[RoutineIndex] = None
+        self._index_gen = 0
+        self._index_lock = threading.Lock()
+
+    def _targets(self) -> List[Tuple[Optional[int], Player]]:
+        if self.zones is None:
+            return [(None, self.player)]
+        return self.zones.items()
+
+    def notify_schedule_changed(self) -> None:
+        """Routines or scenes changed in the DB: recompile the index on the next lookup."""
+        with self._index_lock:
+            self._index_gen += 1
+            self._index = None
+        self._wake.set()
+
+    def routine_index(self) -> RoutineIndex:
+        """The compiled routines, loaded from the DB on first use after a change."""
+        index = self._index
+        if index is None:
+            gen = self._index_gen
+            index = RoutineIndex.load()
+            with self._index_lock:
+                if gen == self._index_gen:  # not invalidated while loading
+                    self._index = index
+            logger.debug(f"Routine index compiled ({index.routine_count} routines)")
+        return index
+
+    def _zone_state(self, zone_id: Optional[int]) -> _ZoneState:
+        st = self._state.get(zone_id)
+        if st is None:
+            st = self._state[zone_id] = _ZoneState()
+        return st
 
     def is_initialized(self) -> bool:
         return self._thread is not None or not self._stop_event.is_set()
@@ -40,23 +92,25 @@ class Scheduler:
         logger.info("Scheduler thread start requested")
         if self._thread is None or not self._thread.is_alive():
             self._stop_event.clear()
-            self._thread = threading.Thread(target=self._run, daemon=True)
-            self._thread.start()
-
-    def resume_if_should_play(self):
-        now = datetime.now()
-        routine, scene = self._get_current_routine_and_scene(now)
-        if routine and scene:
-            logger.info(f"Manual resume: playing scene '{scene.path}' vol={routine.volume}")
-            self.player.play_scene(scene.path, volume=routine.volume)
-            self._last_scene_id = scene.id
-            self._last_routine_id = routine.id
-            self._last_scene = scene
-            self._last_routine = routine
+            self._thread = self.clock.spawn(self._run, name="scheduler")
+
+    def resume_if_should_play(self, zone_id: Optional[int] = None, all_zones: bool = True):
+        """Start whatever should be playing now, in ``zone_id`` only or (default) every zone."""
+        now = self.clock.now()
+        targets = self._targets() if all_zones else [t for t in self._targets() if t[0] == zone_id]
+        for zid, player in targets:
+            routine, scene = self._get_current_routine_and_scene(now, zid)
+            if routine and scene:
+                logger.info(f"Manual resume: zone={zid} scene '{scene.path}' vol={routine.volume}")
+                player.play_scene(scene.path, volume=routine.volume)
+                st = self._zone_state(zid)
+                st.last_scene_id = scene.id
+                st.last_routine_id = routine.id
 
     def stop(self):
         logger.info("Scheduler thread stop requested")
         self._stop_event.set()
+        self._wake.set()
         if self._thread:
             self._thread.join(timeout=2)
 
@@ -69,108 +123,113 @@ class Scheduler:
         self.stop()
 
     def _run(self):  # pragma: no cover (timing + thread loop)
-        no_match_logged = False
         while not self._stop_event.is_set():
-            now = datetime.now()
-            routine, scene = self._get_current_routine_and_scene(now)
-
-            if routine and scene:
-                no_match_logged = False
-                db = SessionLocal()
-                try:
-                    latest_scene = db.query(Scene).filter(Scene.id == scene.id).first()
-                finally:
-                    db.close()
-
-                if routine.id == self._last_routine_id and not self.player.is_playing():
-                    pass
-                elif not self.player.is_playing():
-                    logger.info(f"Starting playback: scene '{latest_scene.path}' vol={routine.volume}")
-                    self.player.play_scene(latest_scene.path, volume=routine.volume)
-                    self._last_scene_id = latest_scene.id
-                    self._last_routine_id = routine.id
-                elif routine.id != self._last_routine_id:
-                    logger.info(f"New routine {routine.id}: scene '{latest_scene.path}' vol={routine.volume}")
-                    self.player.switch_scene(latest_scene.path, volume=routine.volume)
-                    self._last_scene_id = latest_scene.id
-                    self._last_routine_id = routine.id
-                elif scene.id != self._last_scene_id:
-                    logger.info(f"Scene change same routine {routine.id} -> '{latest_scene.path}'")
-                    self.player.switch_scene(latest_scene.path)
-                    self._last_scene_id = latest_scene.id
-            else:
-                if self._last_routine_id is not None:
-                    logger.info("Routine ended — soft stop after current or 5 min")
-                    self.player.stop_after_current_or_timeout(timeout_sec=300)
-                    self._last_routine_id = None
-                    self._last_scene_id = None
-                if not no_match_logged:
-                    logger.warning("No matching routine; idle.")
-                    no_match_logged = True
-
-            time.sleep(self.poll_interval)
-
-    def _get_current_routine_and_scene(self, now: datetime) -> Tuple[Optional[Routine], Optional[Scene]]:
-        db: Session = SessionLocal()
-        try:
-            routines = db.query(Routine).all()
-            for routine in routines:
-                if self._routine_matches(routine, now):
-                    scene = db.query(Scene).filter(Scene.id == routine.scene_id).first()
-                    db.refresh(scene)
-                    return routine, scene
-            return None, None
-        finally:
-            db.close()
-
-    def _routine_matches(self, routine: Routine, now: datetime) -> bool:
-        def _to_minutes(s: str) -> Optional[int]:
+            self._wake.clear()
             try:
-                parts = s.strip().split(":")
-                if len(parts) != 2:
-                    return None
-                h = int(parts[0])
-                m = int(parts[1])
-                if not (0 <= h <= 23 and 0 <= m <= 59):
-                    return None
-                return h * 60 + m
-            except Exception:
-                return None
-
-        start_s = routine.start_time or ""
-        end_s = routine.end_time or ""
-        start_min = _to_minutes(start_s)
-        end_min = _to_minutes(end_s)
-        now_min = now.hour * 60 + now.minute
-
-        # If times are invalid, consider no match to be safe
-        if start_min is None or end_min is None:
-            return False
-
-        # Equal start/end means zero-length window; treat as no match (avoid always-on)
-        if start_min == end_min:
-            return False
-
-        if start_min < end_min:
-            in_time = start_min <= now_min < end_min
+                self.tick(self.clock.now())
+                timeout = self._seconds_to_next_change()
+            except Exception as e:
+                logger.warning(f"Scheduler tick failed: {e}")
+                timeout = self.poll_interval
+            self.clock.wait(self._wake, timeout)
+
+    def next_change(self, now: datetime) -> Optional[datetime]:
+        """Earliest upcoming routine start or end across the scheduled zones."""
+        index = self.routine_index()
+        changes = [c for c in (index.next_change(now, zid) for zid, _ in self._targets()) if c is not None]
+        return min(changes) if changes else None
+
+    def _seconds_to_next_change(self) -> float:
+        now = self.clock.now()
+        nxt = self.next_change(now)
+        if nxt is None:
+            return self.poll_interval
+        until = (nxt - now) / timedelta(seconds=1)
+        if self.prewarm_sec > 0 and until > self.prewarm_sec:
+            wait = until - self.prewarm_sec  # wake early for the look-ahead
+        else:
+            if self.prewarm_sec > 0:
+                self._prewarm(nxt)
+            wait = until + self.BOUNDARY_SLACK_SEC
+        return max(0.0, min(wait, self.poll_interval))
+
+    def _prewarm(self, at: datetime) -> None:
+        """Ask each zone's player to prepare the scene of a routine starting at ``at``."""
+        index = self.routine_index()
+        for zone_id, player in self._targets():
+            routine, scene = index.lookup(at, zone_id)
+            st = self._zone_state(zone_id)
+            if not (routine and scene) or routine.id == st.last_routine_id or st.prewarmed == (at, scene.path):
+                continue
+            prewarm = getattr(player, "prewarm_scene", None)
+            if prewarm is None:
+                continue
+            st.prewarmed = (at, scene.path)
+            logger.info(f"Prewarming scene '{scene.path}' for routine {routine.id} at {at:%H:%M}: zone={zone_id}")
+            prewarm(scene.path)
+
+    def tick(self, now: datetime) -> None:
+        """One scheduling pass over every zone, answered from the compiled routine index."""
+        index = self.routine_index()
+        for zone_id, player in self._targets():
+            self._apply(zone_id, player, *index.lookup(now, zone_id))
+
+    def _apply(self, zone_id: Optional[int], player: Player, routine: Optional[Routine], scene: Optional[Scene]) -> None:
+        st = self._zone_state(zone_id)
+        if not st.primed:
+            st.primed = True
+            if self._adopt_resumed(zone_id, player, st, routine, scene):
+                return
+        if routine and scene:
+            st.no_match_logged = False
+            if routine.id == st.last_routine_id and not player.is_playing():
+                pass
+            elif not player.is_playing():
+                logger.info(f"Starting playback: zone={zone_id} scene '{scene.path}' vol={routine.volume}")
+                player.play_scene(scene.path, volume=routine.volume)
+                st.last_scene_id = scene.id
+                st.last_routine_id = routine.id
+            elif routine.id != st.last_routine_id:
+                logger.info(f"New routine {routine.id}: zone={zone_id} scene '{scene.path}' vol={routine.volume}")
+                player.switch_scene(scene.path, volume=routine.volume)
+                st.last_scene_id = scene.id
+                st.last_routine_id = routine.id
+            elif scene.id != st.last_scene_id:
+                logger.info(f"Scene change same routine {routine.id}: zone={zone_id} -> '{scene.path}'")
+                player.switch_scene(scene.path)
+                st.last_scene_id = scene.id
         else:
-            # Wrap-around across midnight (e.g., 22:00 -> 06:00)
-            in_time = now_min >= start_min or now_min < end_min
-        if not in_time:
+            if st.last_routine_id is not None:
+                logger.info(f"Routine ended in zone={zone_id} — soft stop after current or 5 min")
+                player.stop_after_current_or_timeout(timeout_sec=300)
+                st.last_routine_id = None
+                st.last_scene_id = None
+            if not st.no_match_logged:
+                logger.warning(f"No matching routine for zone={zone_id}; idle.")
+                st.no_match_logged = True
+
+    def _adopt_resumed(
+        self, zone_id: Optional[int], player: Player, st: _ZoneState, routine: Optional[Routine], scene: Optional[Scene]
+    ) -> bool:
+        """First tick after a restart: keep a snapshot resume that matches the schedule, end one that doesn't."""
+        folder = getattr(player, "resumed_folder", None)
+        if folder is None:
             return False
-
-        if routine.weekdays:
-            weekdays = [w.strip().lower()[:3] for w in routine.weekdays.split(',') if w.strip()]
-            weekday_now = now.strftime('%a').lower()[:3]
-            if weekday_now not in weekdays:
-                return False
-
-        if routine.months:
-            months = [m.strip().lower()[:3] for m in routine.months.split(',') if m.strip()]
-            month_now = now.strftime('%b').lower()[:3]
-            if month_now not in months:
-                return False
-        return True
+        if routine and scene and scene.path == folder:
+            logger.info(f"Adopting resumed playback: zone={zone_id} routine {routine.id} scene '{folder}'")
+            st.last_routine_id = routine.id
+            st.last_scene_id = scene.id
+            return True
+        if not (routine and scene):
+            logger.info(f"Resumed playback outside any routine in zone={zone_id} — soft stop")
+            player.stop_after_current_or_timeout(timeout_sec=300)
+            return True
+        return False  # another scene is due: the normal path replaces the resume
+
+    def _get_current_routine_and_scene(
+        self, now: datetime, zone_id: Optional[int] = None
+    ) -> Tuple[Optional[Routine], Optional[Scene]]:
+        return self.routine_index().lookup(now, zone_id)
 
 __all__ = ["Scheduler"]
 """Scheduler service wrapper referencing legacy implementation."""
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""Playback snapshots: enough state to resume mid-track after a restart.
+
+Two JSON files per player, each replaced atomically (write a temp file,
+fsync, ``os.replace``): a small state file (scene, queue position, track,
+offset, volume) written every few seconds and at each handoff, and the
+shuffled queue order, rewritten only when the order changed. The state names
+the queue file's token, so a crash between the two writes is detected and
+the snapshot ignored. Writes happen on a background thread, latest wins.
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger("vibrae_core.snapshot")
+
+VERSION = 1
+
+
+@dataclass
+class PlaybackState:
+    folder: str
+    queue_pos: int
+    track: Optional[str]
+    offset: float  # media seconds into ``track``
+    volume: int
+    playing: bool
+    saved_at: float  # wall clock
+    queue: List[str] = field(default_factory=list)  # filled in by ``load``
+
+
+def write_json_atomic(path: str, data: dict) -> None:
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, separators=(",", ":"))
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+class SnapshotStore:
+    """Snapshot files for one player at ``path`` (state) and ``<path stem>.queue.json``."""
+
+    def __init__(self, path: str):
+        self.path = path
+        root, _ = os.path.splitext(path)
+        self.queue_path = root + ".queue.json"
+        self._token: Optional[str] = None
+        self._queue_key: Optional[Tuple[int, int]] = None
+        self._pending: Optional[Tuple[PlaybackState, Optional[Callable[[], List[str]]]]] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread: Optional[threading.Thread] = None
+        self.writes = 0
+
+    def save(self, state: PlaybackState, queue_key: Tuple[int, int], queue: Callable[[], List[str]]) -> None:
+        """Queue a write; ``queue`` is only called (on the writer thread) when ``queue_key`` changed."""
+        with self._lock:
+            changed = queue_key != self._queue_key
+            if changed:
+                self._queue_key = queue_key
+            prev = self._pending
+            # Keep an unwritten queue change even if a newer state supersedes it.
+            order = queue if changed else (prev[1] if prev is not None else None)
+            self._pending = (state, order)
+            self._idle.clear()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="playback-snapshot", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued snapshot is on disk."""
+        return self._idle.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                item, self._pending = self._pending, None
+            if item is not None:
+                self._write(*item)
+            with self._lock:
+                if self._pending is None:
+                    self._idle.set()
+
+    def _write(self, state: PlaybackState, queue: Optional[Callable[[], List[str]]]) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            if queue is not None or self._token is None:
+                token = uuid.uuid4().hex
+                paths = queue() if queue is not None else []
+                write_json_atomic(self.queue_path, {"version": VERSION, "token": token, "paths": paths})
+                self._token = token
+            data = asdict(state)
+            data.pop("queue")
+            data.update(version=VERSION, queue_token=self._token)
+            write_json_atomic(self.path, data)
+            self.writes += 1
+        except Exception as e:
+            logger.warning(f"Snapshot write failed ({self.path}): {e}")
+
+    def load(self) -> Optional[PlaybackState]:
+        """The last snapshot, or None when missing, unreadable or torn between files."""
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+            with open(self.queue_path, encoding="utf-8") as fh:
+                q = json.load(fh)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Snapshot unreadable ({self.path}): {e}")
+            return None
+        if data.get("version") != VERSION or q.get("token") != data.get("queue_token"):
+            logger.warning(f"Snapshot ignored: version or queue token mismatch ({self.path})")
+            return None
+        try:
+            state = PlaybackState(
+                folder=data["folder"], queue_pos=int(data["queue_pos"]), track=data.get("track"),
+                offset=float(data.get("offset") or 0.0), volume=int(data["volume"]),
+                playing=bool(data.get("playing")), saved_at=float(data.get("saved_at") or 0.0),
+                queue=list(q.get("paths") or []),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Snapshot malformed ({self.path}): {e}")
+            return None
+        self._token = data.get("queue_token")
+        return state
+
+
+__all__ = ["PlaybackState", "SnapshotStore", "write_json_atomic"]
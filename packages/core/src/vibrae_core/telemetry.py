@@ -0,0 +1,87 @@
+"""Playback handoff telemetry: one structured event per track transition.
+
+The player records every crossfade and every promotion after the main track
+ended early. Events land in a fixed-size ring buffer; ``summary`` gives
+percentiles per metric for the metrics endpoint. Times are seconds unless a
+field says otherwise.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Deque, Dict, Iterable, List, Optional
+
+CROSSFADE = "crossfade"
+PROMOTION = "promotion"
+
+
+@dataclass
+class HandoffEvent:
+    kind: str  # CROSSFADE or PROMOTION (main ended before or during the fade)
+    from_path: Optional[str]
+    to_path: Optional[str]
+    at: float = field(default_factory=time.time)  # wall clock, for display
+    planned_fade_start: Optional[float] = None  # media seconds into the outgoing track
+    actual_fade_start: Optional[float] = None
+    fade_start_late: Optional[float] = None  # actual - planned
+    overlap: float = 0.0  # both tracks audible
+    gap: float = 0.0  # silence between outgoing end and incoming start
+    preroll: Optional[float] = None  # open -> buffered and paused
+    preroll_margin: Optional[float] = None  # buffered -> fade start
+    step_late_p50_ms: Optional[float] = None  # fade ramp tick wake-up lateness
+    step_late_max_ms: Optional[float] = None
+    next_started: bool = True  # incoming player was playing at handoff
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def percentiles(values: Iterable[float]) -> Dict[str, float]:
+    samples = sorted(v for v in values if v is not None)
+    if not samples:
+        return {"count": 0}
+    n = len(samples)
+    return {
+        "count": n,
+        "mean": round(sum(samples) / n, 4),
+        "p50": round(samples[int(0.50 * (n - 1))], 4),
+        "p95": round(samples[int(0.95 * (n - 1))], 4),
+        "max": round(samples[-1], 4),
+    }
+
+
+class HandoffRecorder:
+    """Ring buffer of the most recent ``capacity`` handoff events."""
+
+    METRICS = ("fade_start_late", "overlap", "gap", "preroll", "preroll_margin", "step_late_p50_ms", "step_late_max_ms")
+
+    def __init__(self, capacity: int = 512):
+        self._events: Deque[HandoffEvent] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def record(self, event: HandoffEvent) -> None:
+        with self._lock:
+            self._events.append(event)
+            self.total += 1
+
+    def events(self, limit: Optional[int] = None) -> List[HandoffEvent]:
+        with self._lock:
+            items = list(self._events)
+        return items[-limit:] if limit else items
+
+    def summary(self) -> dict:
+        items = self.events()
+        out = {
+            "total": self.total,
+            "window": len(items),
+            "by_kind": {k: sum(1 for e in items if e.kind == k) for k in (CROSSFADE, PROMOTION)},
+            "not_started": sum(1 for e in items if not e.next_started),
+        }
+        for name in self.METRICS:
+            out[name] = percentiles(getattr(e, name) for e in items)
+        return out
+
+
+__all__ = ["HandoffEvent", "HandoffRecorder", "percentiles", "CROSSFADE", "PROMOTION"]
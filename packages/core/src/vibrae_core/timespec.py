@@ -0,0 +1,60 @@
+"""Routine time fields: ``"HH:MM"`` <-> minutes of day, day/month names <-> bitmasks."""
+
+from typing import Optional, Tuple
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+MONTHS = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+DAY_MINUTES = 24 * 60
+
+
+def parse_hhmm(s: Optional[str]) -> Optional[int]:
+    """Minutes since midnight for ``"HH:MM"``; None when malformed."""
+    try:
+        parts = (s or "").strip().split(":")
+        if len(parts) != 2:
+            return None
+        h, m = int(parts[0]), int(parts[1])
+        if not (0 <= h <= 23 and 0 <= m <= 59):
+            return None
+        return h * 60 + m
+    except ValueError:
+        return None
+
+
+def format_hhmm(minute: Optional[int]) -> Optional[str]:
+    return None if minute is None else f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def parse_mask(s: Optional[str], names: Tuple[str, ...], strict: bool = False) -> int:
+    """Bitmask of ``names`` listed in a comma separated string; empty means all of them.
+
+    Unknown entries are skipped, or raise ``ValueError`` when ``strict``.
+    """
+    if not s or not s.strip():
+        return (1 << len(names)) - 1
+    mask = 0
+    for part in s.split(","):
+        key = part.strip().lower()[:3]
+        if key in names:
+            mask |= 1 << names.index(key)
+        elif strict and part.strip():
+            raise ValueError(f"unknown name {part.strip()!r}; expected one of {', '.join(names)}")
+    return mask
+
+
+def format_mask(mask: Optional[int], names: Tuple[str, ...]) -> Optional[str]:
+    """Comma separated names for ``mask``; None (every one) stays None."""
+    if mask is None:
+        return None
+    return ",".join(name for n, name in enumerate(names) if mask >> n & 1)
+
+
+__all__ = [
+    "DAY_MINUTES",
+    "MONTHS",
+    "WEEKDAYS",
+    "format_hhmm",
+    "format_mask",
+    "parse_hhmm",
+    "parse_mask",
+]
@@ -0,0 +1,113 @@
+"""Pool of libvlc MediaPlayer handles bound to one shared ``vlc.Instance``.
+
+``vlc.MediaPlayer(path)`` spins up an implicit libvlc instance per call
+(plugin scan included) and the old code never released players replaced by
+a crossfade. The pool creates players from the shared instance, swaps media
+with ``set_media`` on reuse and keeps counters of native handles so long runs
+can be checked for leaks.
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger("vibrae_core.player")
+
+
+class MediaPlayerPool:
+    def __init__(self, instance, max_idle: int = 2, on_create: Optional[Callable[[object], None]] = None):
+        self._instance = instance
+        self.max_idle = max_idle
+        self._on_create = on_create
+        self._idle: List[object] = []
+        self._in_use: Dict[int, object] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.released = 0
+        self.reused = 0
+
+    def acquire(self, path: str, start: float = 0.0):
+        """Return a stopped, muted player with ``path`` loaded, starting ``start`` seconds in."""
+        with self._lock:
+            player = self._idle.pop() if self._idle else None
+        if player is None:
+            player = self._instance.media_player_new()
+            with self._lock:
+                self.created += 1
+            if self._on_create is not None:
+                self._on_create(player)
+        else:
+            with self._lock:
+                self.reused += 1
+        try:
+            media = self._instance.media_new(path)
+            if start > 0:
+                media.add_option(f":start-time={start:.3f}")
+            player.set_media(media)
+            try:
+                media.release()  # player holds its own reference
+            except Exception as e:
+                logger.debug(f"Media release failed: {e}")
+        except Exception:
+            self._discard(player)
+            raise
+        with self._lock:
+            self._in_use[id(player)] = player
+        return player
+
+    def release(self, player) -> None:
+        """Stop ``player`` and return it to the pool (or free it if the pool is full).
+
+        Safe to call more than once or with players the pool does not own.
+        """
+        if player is None:
+            return
+        with self._lock:
+            owned = self._in_use.pop(id(player), None) is not None
+        if not owned:
+            return
+        try:
+            player.stop()
+        except Exception as e:
+            logger.debug(f"Stopping pooled player failed: {e}")
+        with self._lock:
+            keep = len(self._idle) < self.max_idle
+            if keep:
+                self._idle.append(player)
+        if not keep:
+            self._discard(player)
+
+    def close(self) -> None:
+        """Free idle and in-use handles; the pool stays usable afterwards."""
+        with self._lock:
+            players = self._idle + list(self._in_use.values())
+            self._idle = []
+            self._in_use = {}
+        for p in players:
+            try:
+                p.stop()
+            except Exception as e:
+                logger.debug(f"Stopping pooled player failed: {e}")
+            self._discard(p)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "created": self.created,
+                "released": self.released,
+                "reused": self.reused,
+                "live": self.created - self.released,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+            }
+
+    def _discard(self, player) -> None:
+        try:
+            player.release()
+        except Exception as e:
+            logger.debug(f"Releasing player handle failed: {e}")
+        with self._lock:
+            self.released += 1
+
+
+__all__ = ["MediaPlayerPool"]
@@ -0,0 +1,123 @@
+"""Playback zones: one ``Player`` per zone, all sharing the expensive parts.
+
+Every player in the process uses the same VLC instance, track index, scene
+folder cache and analysis worker, so adding a zone costs one playback thread
+and a few pooled MediaPlayer handles. The default zone (id ``None``) always
+exists and serves routines and control calls that name no zone.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import vlc  # type: ignore
+
+from vibrae_core.analysis import TrackAnalyzer
+from vibrae_core.clock import SYSTEM_CLOCK, Clock
+from vibrae_core.db import SessionLocal
+from vibrae_core.library import SceneLibrary, TrackIndex
+from vibrae_core.models import Zone
+from vibrae_core.player import Player
+from vibrae_core.snapshot import SnapshotStore
+
+logger = logging.getLogger("vibrae_core.zones")
+
+
+class ZoneManager:
+    def __init__(
+        self,
+        music_base_dir: str,
+        scenes: Optional[SceneLibrary] = None,
+        library: Optional[TrackIndex] = None,
+        vlc_instance=None,
+        clock: Clock = SYSTEM_CLOCK,
+        snapshot_dir: Optional[str] = None,
+    ):
+        self.music_base_dir = music_base_dir
+        self.clock = clock
+        self.snapshot_dir = snapshot_dir
+        self.scenes = scenes if scenes is not None else SceneLibrary()
+        self.library = library if library is not None else TrackIndex()
+        self.analyzer = TrackAnalyzer(self.library)
+        self._owns_vlc = vlc_instance is None
+        self.vlc_instance = vlc_instance if vlc_instance is not None else vlc.Instance()
+        self._players: Dict[Optional[int], Player] = {}
+        self._names: Dict[Optional[int], str] = {None: "default"}
+        self._lock = threading.Lock()
+        self.default = self._players[None] = self._create(None, None)
+
+    def _create(self, zone_id: Optional[int], device: Optional[str]) -> Player:
+        return Player(
+            self.music_base_dir,
+            library=self.library,
+            scenes=self.scenes,
+            vlc_instance=self.vlc_instance,
+            audio_device=device,
+            zone_id=zone_id,
+            analyzer=self.analyzer,
+            clock=self.clock,
+            snapshots=self._snapshot_store(zone_id),
+        )
+
+    def _snapshot_store(self, zone_id: Optional[int]) -> Optional[SnapshotStore]:
+        if not self.snapshot_dir:
+            return None
+        name = "playback.json" if zone_id is None else f"playback-zone{zone_id}.json"
+        return SnapshotStore(os.path.join(self.snapshot_dir, name))
+
+    def get(self, zone_id: Optional[int]) -> Optional[Player]:
+        return self._players.get(zone_id)
+
+    def items(self) -> List[Tuple[Optional[int], Player]]:
+        with self._lock:
+            return list(self._players.items())
+
+    def name(self, zone_id: Optional[int]) -> Optional[str]:
+        return self._names.get(zone_id)
+
+    def sync(self, zones: Iterable[Zone]) -> None:
+        """Match players to ``zones`` rows: create new ones, re-route devices, retire removed ones."""
+        retired: List[Player] = []
+        with self._lock:
+            seen = set()
+            for z in zones:
+                seen.add(z.id)
+                self._names[z.id] = z.name
+                player = self._players.get(z.id)
+                if player is None:
+                    self._players[z.id] = self._create(z.id, z.audio_device)
+                    logger.info(f"Zone {z.id} '{z.name}' added (device={z.audio_device or 'default'})")
+                elif player.audio_device != z.audio_device:
+                    player.audio_device = z.audio_device  # applies from the next track
+            for zone_id in [k for k in self._players if k is not None and k not in seen]:
+                retired.append(self._players.pop(zone_id))
+                self._names.pop(zone_id, None)
+                logger.info(f"Zone {zone_id} removed")
+        for player in retired:
+            player.shutdown()
+
+    def load(self, session_factory=SessionLocal) -> None:
+        db = session_factory()
+        try:
+            self.sync(db.query(Zone).all())
+        finally:
+            db.close()
+
+    def resume(self) -> int:
+        """Resume every zone that was playing when the process stopped; returns how many did."""
+        return sum(1 for _, player in self.items() if player.resume_from_snapshot() is not None)
+
+    def shutdown(self) -> None:
+        for _, player in self.items():
+            player.shutdown()
+        self.scenes.close()  # shared by every zone; stops the inotify thread and its fd
+        if self._owns_vlc and self.vlc_instance is not None:
+            try:
+                self.vlc_instance.release()
+            except Exception:
+                logger.debug("Releasing the shared VLC instance failed", exc_info=True)
+        self.vlc_instance = None
+
+
+__all__ = ["ZoneManager"]
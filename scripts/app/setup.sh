@@ -89,6 +89,8 @@ mods = [
 	("fastapi", "FastAPI"),
 	("uvicorn", "Uvicorn"),
 	("sqlalchemy", "SQLAlchemy"),
+	("greenlet", "SQLAlchemy asyncio (greenlet)"),
+	("aiosqlite", "aiosqlite"),
 	("pydantic", "Pydantic"),
 	("jose", None),
 	("dotenv", "python-dotenv"),
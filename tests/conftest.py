@@ -18,55 +18,136 @@ if CORE_SRC not in sys.path:
 # Reusable VLC shim for tests
 class MockState:
     Playing = 'Playing'
+    Paused = 'Paused'
     Ended = 'Ended'
     Stopped = 'Stopped'
     Error = 'Error'
 
+class MockEventType:
+    MediaPlayerEndReached = 'EndReached'
+    MediaPlayerEncounteredError = 'EncounteredError'
+    MediaPlayerPlaying = 'Playing'
+    MediaPlayerTimeChanged = 'TimeChanged'
+
+class MockEventManager:
+    def __init__(self):
+        self.callbacks = {}
+    def event_attach(self, kind, cb, *args):
+        self.callbacks.setdefault(kind, []).append((cb, args))
+    def fire(self, kind, **u):
+        event = types.SimpleNamespace(type=kind, u=types.SimpleNamespace(**u))
+        for cb, args in list(self.callbacks.get(kind, [])):
+            cb(event, *args)
+
 class MockMedia:
+    duration_ms = 1500  # 1.5s length to trigger quick crossfades
     def __init__(self, path: str):
         self._path = path
+        self.options = []
+    def add_option(self, option):
+        self.options.append(option)
     def parse(self):
         return None
     def get_duration(self):
-        return 1500  # 1.5s length to trigger quick crossfades
+        return self.duration_ms
+    def release(self):
+        pass
 
 class MockInstance:
     def media_new(self, path: str):
         return MockMedia(path)
+    def media_player_new(self):
+        return MockMediaPlayer(None)
     def release(self):
         pass
 
 class MockMediaPlayer:
-    def __init__(self, path: str):
+    clock = None  # set by the sim_clock fixture; media time then follows virtual time
+    def _mono(self):
+        return self.clock.monotonic() if self.clock is not None else time.monotonic()
+    def __init__(self, path=None):
         self.path = path
         self._volume = 0
         self._mute = False
         self._stopped = False
-        self._start = time.monotonic()
+        self._paused = False
+        self.paused_at = None
+        self._ended = False
+        self._events = MockEventManager()
+        self._start = self._mono()
+        self.media = None
+    def get_media(self):
+        return self.media
+    def set_media(self, media):
+        self.media = media
+        self.path = media._path
+        self._stopped = self._paused = self._ended = False
+        self.paused_at = None
+        self._start = self._mono()
+    def event_manager(self):
+        return self._events
+    def finish(self):
+        """Simulate reaching the end of the media (fires MediaPlayerEndReached)."""
+        self._ended = True
+        self._events.fire(MockEventType.MediaPlayerEndReached)
+    def play(self):
+        self._stopped = False
+        self._paused = False
+        self._events.fire(MockEventType.MediaPlayerPlaying)
+    def set_pause(self, do_pause: int):
+        self._paused = bool(do_pause)
+        if self._paused:
+            self.paused_at = self._mono()
     def audio_set_mute(self, mute: bool):
         self._mute = mute
     def audio_set_volume(self, v: int):
         self._volume = v
+    def audio_get_volume(self):
+        return self._volume
     def get_state(self):
-        return MockState.Stopped if self._stopped else MockState.Playing
+        if self._stopped:
+            return MockState.Stopped
+        if self._ended:
+            return MockState.Ended
+        return MockState.Paused if self._paused else MockState.Playing
     def get_time(self):
-        return int((time.monotonic() - self._start) * 1000)
+        return int((self._mono() - self._start) * 1000)
+    def get_length(self):
+        return self.media.get_duration() if self.media is not None else 0
     def stop(self):
         self._stopped = True
     def release(self):
         pass
 
+@pytest.fixture(scope='session', autouse=True)
+def migrated_test_db():
+    """Bring the shared test database to the current schema, as API startup does."""
+    from vibrae_core.migrations import migrate
+    migrate()
+
 @pytest.fixture(autouse=True)
 def mock_vlc(monkeypatch):
     mod = types.ModuleType('vlc')
     mod.Instance = lambda: MockInstance()
     mod.MediaPlayer = MockMediaPlayer
-    mod.State = types.SimpleNamespace(Ended=MockState.Ended, Stopped=MockState.Stopped, Error=MockState.Error)
+    mod.State = types.SimpleNamespace(
+        Playing=MockState.Playing, Paused=MockState.Paused,
+        Ended=MockState.Ended, Stopped=MockState.Stopped, Error=MockState.Error,
+    )
     mod.MediaParseFlag = types.SimpleNamespace(local=1)
+    mod.EventType = MockEventType
     sys.modules['vlc'] = mod
     yield
     # cleanup not strictly needed; test session ends
 
+@pytest.fixture
+def sim_clock(monkeypatch):
+    """Virtual clock shared by the player under test and the mock media players."""
+    from vibrae_core.clock import SimulatedClock
+    clock = SimulatedClock()
+    monkeypatch.setattr(MockMediaPlayer, 'clock', clock)
+    return clock
+
 @pytest.fixture
 def player_module(mock_vlc):
     # Import vibrae_core.player directly (legacy backend removed)
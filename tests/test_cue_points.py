@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+
+def test_silence_detector_finds_audible_span():
+    np = pytest.importorskip('numpy')
+    from vibrae_core.analysis import RATE, SilenceDetector
+
+    t = np.arange(3 * RATE) / RATE
+    tone = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    mono = np.concatenate([np.zeros(2 * RATE, np.float32), tone, np.full(2 * RATE, 1e-4, np.float32)])
+    frames = np.stack([mono, mono], axis=1)
+    det = SilenceDetector(offset=10.0)
+    for i in range(0, len(frames), 7000):
+        det.feed(frames[i:i + 7000])
+    assert det.first == pytest.approx(12.0, abs=0.06)
+    assert det.last_end == pytest.approx(15.0, abs=0.06)
+
+
+def test_player_schedules_from_cue_points(player_module, tmp_path):
+    f = tmp_path / 'a.mp3'
+    f.write_bytes(b'x')
+    st = os.stat(f)
+    path = os.path.realpath(f)
+    p = player_module.Player(music_base_dir=str(tmp_path))
+    p.crossfade_sec = 5
+    assert p._fade_plan(path, 200.0, 5.0, True) == (0.0, 195.0)
+
+    p.library.annotate(path, (st.st_size, st.st_mtime_ns), cue_in=1.5, cue_out=180.0)
+    assert p._fade_plan(path, 200.0, 5.0, True) == (1.5, 175.0)
+    assert p._fade_plan(path, 200.0, 5.0, False) == (1.5, 200.0)
+    mp = p._acquire(path)
+    assert mp.get_media().options == [':start-time=1.500']
+
+    p.use_cue_points = False
+    assert p._fade_plan(path, 200.0, 5.0, True) == (0.0, 195.0)
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from vibrae_core.auth import (
+    authenticate_user_async,
+    create_access_token,
+    get_async_db,
+    get_current_user_async,
+    hash_password,
+)
+from vibrae_core.db import AsyncSessionLocal, Base, SessionLocal, async_url, engine
+from vibrae_core.models import Scene, User
+
+
+def _run(coro_fn):
+    async def main():
+        gen = get_async_db()
+        db = await gen.__anext__()
+        try:
+            return await coro_fn(db)
+        finally:
+            await gen.aclose()
+    return asyncio.run(main())
+
+
+def test_async_url_swaps_sqlite_driver_only():
+    assert async_url('sqlite:////tmp/g.db') == 'sqlite+aiosqlite:////tmp/g.db'
+    assert async_url('sqlite://') == 'sqlite+aiosqlite://'
+    assert async_url('postgresql+asyncpg://h/db') == 'postgresql+asyncpg://h/db'
+
+
+def test_async_login_and_current_user():
+    assert AsyncSessionLocal is not None
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    session.query(User).filter(User.username == 'async-user').delete()
+    session.add(User(username='async-user', password_hash=hash_password('pw')))
+    session.commit()
+    session.close()
+
+    async def check(db):
+        assert (await db.execute(text('PRAGMA journal_mode'))).scalar() == 'wal'  # same pragmas as the sync engine
+        assert (await authenticate_user_async('async-user', 'pw', db)).username == 'async-user'
+        assert await authenticate_user_async('async-user', 'nope', db) is None
+        user = await get_current_user_async(create_access_token({'sub': 'async-user'}), db)
+        assert user.username == 'async-user'
+        with pytest.raises(HTTPException):
+            await get_current_user_async(create_access_token({'sub': 'ghost'}), db)
+    _run(check)
+
+
+def test_scene_routes_run_on_async_session(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # importing the app configures file logging under ./logs
+    from apps.api.src.vibrae_api.routes import scenes as routes
+    changed = []
+    monkeypatch.setattr(routes, '_schedule_changed', lambda: changed.append(1))
+    Base.metadata.create_all(bind=engine)
+
+    async def flow(db):
+        scene = await routes.create_scene(routes.SceneCreateRequest(name='async-scene', path='p'), user=None, db=db)
+        assert scene.id is not None
+        updated = await routes.update_scene(scene.id, routes.SceneUpdateRequest(path='q'), user=None, db=db)
+        assert updated.path == 'q'  # still loaded after commit: no lazy refresh outside an await
+        assert any(s.name == 'async-scene' for s in await routes.list_scenes(user=None, db=db))
+        assert await routes.delete_scene(scene.id, user=None, db=db) == {'status': 'deleted'}
+        with pytest.raises(HTTPException):
+            await routes.delete_scene(scene.id, user=None, db=db)
+    _run(flow)
+    assert len(changed) == 2
+    session = SessionLocal()
+    assert session.query(Scene).filter(Scene.name == 'async-scene').first() is None
+    session.close()
@@ -0,0 +1,33 @@
+from vibrae_core import db_bench
+from vibrae_core.db import make_engine, sqlite_pragmas
+
+
+def test_profile_overrides_and_unknown_names():
+    pragmas = sqlite_pragmas('performance', 'mmap_size=0, cache_size=-2000, journal_mode=DELETE;DROP, bogus=1')
+    assert pragmas['mmap_size'] == '0' and pragmas['cache_size'] == '-2000'
+    assert pragmas['journal_mode'] == 'WAL'  # malformed value ignored
+    assert 'bogus' not in pragmas
+    assert sqlite_pragmas('nope') == sqlite_pragmas('performance')
+    assert sqlite_pragmas('default') == {}
+
+
+def test_engine_applies_pragmas_to_every_connection(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'g.db'}", sqlite_pragmas('performance'), pool_size=2)
+    try:
+        conns = [engine.connect() for _ in range(3)]  # pooled and overflow connections alike
+        for conn in conns:
+            assert conn.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+            assert conn.exec_driver_sql('PRAGMA synchronous').scalar() == 1  # NORMAL
+            assert conn.exec_driver_sql('PRAGMA busy_timeout').scalar() == 5000
+            assert conn.exec_driver_sql('PRAGMA temp_store').scalar() == 2  # MEMORY
+        for conn in conns:
+            conn.close()
+        assert engine.pool.size() == 2
+    finally:
+        engine.dispose()
+
+
+def test_bench_reports_latencies_per_kind(tmp_path):
+    result = db_bench.run('performance', seconds=0.3, api_threads=2, write_ratio=0.5, directory=str(tmp_path))
+    assert result['journal_mode'] == 'wal' and result['errors'] == 0
+    assert result['read']['count'] and result['write']['count'] and result['scheduler']['count']
@@ -0,0 +1,37 @@
+import threading
+
+from vibrae_core.telemetry import CROSSFADE, HandoffEvent, HandoffRecorder
+
+
+def test_recorder_is_a_ring_buffer_with_percentiles():
+    rec = HandoffRecorder(capacity=3)
+    for gap in (0.0, 0.1, 0.2, 0.4):
+        rec.record(HandoffEvent(CROSSFADE, 'a', 'b', gap=gap))
+    summary = rec.summary()
+    assert summary['total'] == 4 and summary['window'] == 3
+    assert summary['gap']['max'] == 0.4 and summary['gap']['p50'] == 0.2
+    assert summary['preroll'] == {'count': 0}
+
+
+def test_crossfades_are_recorded(player_module):
+    p = player_module.Player(music_base_dir='.')
+    p.crossfade_sec = 0.2
+    p.preroll_sec = 0.2
+    p.queue = ['a.mp3', 'b.mp3', 'c.mp3']
+    t = threading.Thread(target=p._play_loop, daemon=True)
+    t.start()
+    try:
+        assert player_module.wait_until(lambda: p.handoffs.total >= 2, 6.0)
+    finally:
+        p.stop().result(timeout=1)
+        t.join(timeout=1)
+    ev = p.handoffs.events()[0]
+    assert ev.kind == CROSSFADE
+    assert ev.from_path != ev.to_path
+    assert ev.fade_start_late is not None and ev.fade_start_late >= -0.05
+    assert 0.0 < ev.overlap < 1.0
+    assert ev.preroll is not None and ev.preroll_margin is not None
+    assert ev.step_late_max_ms is not None
+    metrics = p.get_playback_metrics()
+    assert metrics['handoffs']['by_kind'][CROSSFADE] >= 2
+    assert metrics['recent'][0]['to_path'] == ev.to_path
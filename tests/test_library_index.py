@@ -0,0 +1,48 @@
+import os
+
+from vibrae_core.library import TrackIndex, TrackMeta
+
+
+class CountingProbe:
+    def __init__(self, duration=42.0):
+        self.calls = []
+        self.duration = duration
+    def __call__(self, path):
+        self.calls.append(path)
+        return TrackMeta(duration=self.duration, title=os.path.basename(path))
+
+
+def test_refresh_probes_only_new_or_changed(tmp_path):
+    a = tmp_path / 'a.mp3'
+    b = tmp_path / 'b.mp3'
+    a.write_bytes(b'a' * 10)
+    b.write_bytes(b'b' * 10)
+    probe = CountingProbe()
+    idx = TrackIndex(probe=probe)
+    assert idx.refresh([str(a), str(b)]) == 2
+    assert idx.refresh([str(a), str(b)]) == 0
+    assert len(probe.calls) == 2
+
+    b.write_bytes(b'b' * 20)
+    assert idx.refresh([str(a), str(b)]) == 1
+    assert probe.calls[-1] == os.path.realpath(b)
+    assert idx.duration(os.path.realpath(a)) == 42.0
+
+
+def test_index_persists_across_instances(tmp_path):
+    c = tmp_path / 'c.ogg'
+    c.write_bytes(b'c' * 5)
+    TrackIndex(probe=CountingProbe(duration=7.5)).refresh([str(c)])
+
+    probe = CountingProbe()
+    idx = TrackIndex(probe=probe)
+    info = idx.get(os.path.realpath(c))
+    assert info is not None and info.duration == 7.5 and info.title == 'c.ogg'
+    assert idx.refresh([str(c)]) == 0
+    assert probe.calls == []
+
+
+def test_missing_file_is_not_indexed(tmp_path):
+    idx = TrackIndex(probe=CountingProbe())
+    assert idx.refresh([str(tmp_path / 'missing.mp3')]) == 0
+    assert idx.duration(str(tmp_path / 'missing.mp3')) is None
@@ -0,0 +1,84 @@
+import math
+import os
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from vibrae_core.analysis import gain_db
+from vibrae_core.library import TrackIndex, TrackMeta
+from vibrae_core.migrations import migrate
+
+
+def _sine(amplitude, seconds=5.0, rate=48000):
+    np = pytest.importorskip('numpy')
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * 1000 * t)).astype(np.float32)
+
+
+def test_meter_matches_bs1770_calibration():
+    np = pytest.importorskip('numpy')
+    from vibrae_core.analysis import LoudnessMeter
+
+    x = _sine(0.5)
+    meter = LoudnessMeter()
+    stereo = np.stack([x, x], axis=1)
+    for i in range(0, len(stereo), 30000):  # uneven chunks exercise the carried filter state
+        meter.feed(stereo[i:i + 30000])
+    assert meter.integrated() == pytest.approx(-6.02, abs=0.05)
+    assert meter.peak == pytest.approx(0.5, abs=1e-6)
+
+    # Silence is gated out instead of dragging the average down.
+    meter.feed(np.zeros((48000 * 5, 2), dtype=np.float32))
+    assert meter.integrated() == pytest.approx(-6.02, abs=0.2)  # only the edge blocks count
+
+
+def test_gain_is_clamped():
+    assert gain_db(None) == 0.0
+    assert gain_db(-8.0, target_lufs=-18.0) == -10.0
+    assert gain_db(-40.0, target_lufs=-18.0) == 6.0
+
+
+def test_loudness_survives_reprobe_and_restart(tmp_path):
+    f = tmp_path / 'a.mp3'
+    f.write_bytes(b'a' * 10)
+    st = os.stat(f)
+    idx = TrackIndex(probe=lambda p: TrackMeta(duration=30.0))
+    idx.annotate(str(f), (st.st_size, st.st_mtime_ns), loudness=-9.5, peak=0.9)
+    assert not idx.needs_loudness(str(f))
+    assert idx.get(os.path.realpath(f)).loudness == -9.5
+    idx.refresh([str(f)])
+    info = TrackIndex().get(os.path.realpath(f))
+    assert (info.duration, info.loudness, info.peak) == (30.0, -9.5, 0.9)
+
+    # A stale measurement (file changed since analysis) is dropped.
+    assert idx.annotate(str(f), (1, 1), loudness=-1.0) is None
+
+
+def test_old_tracks_table_gains_analysis_columns(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE tracks (path VARCHAR PRIMARY KEY, size INTEGER, mtime_ns INTEGER, '
+                          'duration FLOAT, title VARCHAR, artist VARCHAR, album VARCHAR)'))
+        conn.execute(text("INSERT INTO tracks VALUES ('/x.mp3', 1, 2, 3.0, NULL, NULL, NULL)"))
+    migrate(engine)
+    columns = {c['name'] for c in inspect(engine).get_columns('tracks')}
+    assert {'loudness', 'peak', 'cue_in', 'cue_out'} <= columns
+    idx = TrackIndex(session_factory=sessionmaker(bind=engine))
+    assert idx.get('/x.mp3').duration == 3.0
+    assert idx.get('/x.mp3').loudness is None
+
+
+def test_player_applies_track_gain(player_module, tmp_path):
+    f = tmp_path / 'loud.mp3'
+    f.write_bytes(b'x')
+    st = os.stat(f)
+    p = player_module.Player(music_base_dir=str(tmp_path))
+    p.library.annotate(str(f), (st.st_size, st.st_mtime_ns), loudness=-12.0, peak=1.0)
+    mp = p._acquire(os.path.realpath(f))
+    p.current_volume = 80
+    assert p._volume_for(mp) == round(80 * math.pow(10, -6 / 20))
+    p.normalize_loudness = False
+    assert p._volume_for(mp) == 80
+    p._recycle(mp)
+    assert p._volume_for(mp) == 80
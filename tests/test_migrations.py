@@ -0,0 +1,101 @@
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import inspect, select, text
+from sqlalchemy.orm import sessionmaker
+
+from vibrae_core import migrations
+from vibrae_core.db import make_engine
+from vibrae_core.migrations import MIGRATIONS, Migration, current_version, migrate
+from vibrae_core.models import Routine
+from vibrae_core.routine_index import RoutineWindow
+
+LEGACY = """
+CREATE TABLE scenes (id INTEGER PRIMARY KEY, name VARCHAR UNIQUE, path VARCHAR);
+CREATE TABLE routines (id INTEGER PRIMARY KEY, scene_id INTEGER REFERENCES scenes(id), start_time VARCHAR,
+                       end_time VARCHAR, weekdays VARCHAR, months VARCHAR, volume INTEGER);
+INSERT INTO scenes VALUES (1, 'day', 'day');
+INSERT INTO routines VALUES (1, 1, '08:00', '12:30', 'mon,tue', '', 40);
+INSERT INTO routines VALUES (2, 1, '22:00', '06:00', NULL, 'dec,jan', 60);
+INSERT INTO routines VALUES (3, 1, 'late', '06:00', 'xyz', NULL, 50);
+"""
+
+
+def test_legacy_database_is_converted_once(tmp_path):
+    path = tmp_path / 'garden.db'
+    with sqlite3.connect(path) as conn:
+        conn.executescript(LEGACY)
+    engine = make_engine(f'sqlite:///{path}')
+    try:
+        assert migrate(engine) == MIGRATIONS[-1].version
+        insp = inspect(engine)
+        assert 'start_time' not in {c['name'] for c in insp.get_columns('routines')}
+        indexed = {tuple(ix['column_names']) for ix in insp.get_indexes('routines')}
+        assert ('scene_id',) in indexed and ('start_minute', 'end_minute') in indexed
+        assert insp.has_table('zones') and insp.has_table('tracks')
+
+        db = sessionmaker(bind=engine)()
+        r1, r2, r3 = db.query(Routine).order_by(Routine.id).all()
+        assert (r1.start_minute, r1.end_minute, r1.weekdays, r1.month_mask, r1.priority) == (480, 750, 'mon,tue', None, 0)
+        assert (r2.start_time, r2.end_time, r2.weekday_mask, r2.months) == ('22:00', '06:00', None, 'jan,dec')
+        assert r3.start_minute is None and r3.weekday_mask == 0  # still never matches
+        db.close()
+
+        with engine.connect() as conn:
+            recorded = conn.execute(text('SELECT version FROM schema_version')).scalars().all()
+        assert recorded == [m.version for m in MIGRATIONS]
+        assert migrate(engine) == MIGRATIONS[-1].version  # nothing left to run
+        with engine.connect() as conn:
+            assert conn.execute(text('SELECT COUNT(*) FROM schema_version')).scalar() == len(MIGRATIONS)
+    finally:
+        engine.dispose()
+
+
+def test_failed_migration_rolls_back(tmp_path, monkeypatch):
+    engine = make_engine(f"sqlite:///{tmp_path / 'g.db'}")
+
+    def broken(conn):
+        conn.exec_driver_sql('CREATE TABLE half_done (id INTEGER)')
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS + [Migration(99, 'broken', broken)])
+    try:
+        with pytest.raises(RuntimeError):
+            migrations.migrate(engine)
+        assert current_version(engine) == MIGRATIONS[-1].version
+        assert not inspect(engine).has_table('half_done')
+    finally:
+        engine.dispose()
+
+
+def test_string_views_validate_and_sql_filter_matches_windows(tmp_path):
+    r = Routine(start_time='22:15', end_time='06:00', weekdays='Fri, sat', months='')
+    assert (r.start_minute, r.weekday_mask, r.month_mask) == (22 * 60 + 15, 0b110000, None)
+    with pytest.raises(ValueError):
+        r.start_time = '25:00'
+    with pytest.raises(ValueError):
+        r.weekdays = 'mon,funday'
+
+    engine = make_engine(f"sqlite:///{tmp_path / 'g.db'}")
+    try:
+        migrate(engine)
+        db = sessionmaker(bind=engine)()
+        rng = random.Random(5)
+        for _ in range(40):
+            start, end = rng.randrange(0, 1440, 30), rng.randrange(0, 1440, 30)
+            db.add(Routine(scene_id=1, start_minute=start, end_minute=end, volume=50,
+                           weekday_mask=rng.choice((None, rng.randrange(1, 128))),
+                           month_mask=rng.choice((None, 1, 0b100000000001))))
+        db.commit()
+        routines = db.query(Routine).all()
+        t = datetime(2025, 1, 1)
+        for _ in range(200):
+            t += timedelta(minutes=rng.randrange(1, 4000))
+            found = set(db.execute(select(Routine.id).where(Routine.active_at(t))).scalars())
+            expected = {x.id for x in routines if (w := RoutineWindow.compile(x)) is not None and w.matches(t)}
+            assert found == expected, t
+        db.close()
+    finally:
+        engine.dispose()
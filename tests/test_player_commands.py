@@ -0,0 +1,58 @@
+import os
+import time
+
+from vibrae_core.commands import STOP, SWITCH, VOLUME, CommandQueue
+from vibrae_core.library import SceneLibrary
+
+
+def _scene(root, name, *tracks):
+    os.makedirs(root / name)
+    for t in tracks:
+        (root / name / t).write_bytes(b'')
+
+
+def test_queue_coalesces_superseded_commands():
+    q = CommandQueue()
+    first = q.put(SWITCH, 'a', None)
+    vol = q.put(VOLUME, 10)
+    second = q.put(SWITCH, 'b', None)
+    latest_vol = q.put(VOLUME, 20)
+    assert first.result(0) is False and vol.result(0) is False
+    assert [(c.kind, c.args) for c in q.take()] == [(SWITCH, ('b', None)), (VOLUME, (20,))]
+    assert not second.done() and not latest_vol.done()
+
+    stop = q.put(STOP)
+    q.put(SWITCH, 'c', None)
+    (cmd,) = [c for c in q.take() if c.kind == STOP]
+    q.done(cmd)
+    assert stop.result(0) is True
+    stats = q.stats()
+    assert stats['coalesced'] == 2 and stats['applied'] == 1
+    assert stats['by_kind'][STOP]['count'] == 1
+
+
+def test_control_calls_return_immediately_and_apply_on_playback_thread(player_module, tmp_path):
+    _scene(tmp_path, 'day', 'a.mp3', 'b.mp3')
+    _scene(tmp_path, 'night', 'c.mp3', 'd.mp3')
+    p = player_module.Player(str(tmp_path), scenes=SceneLibrary(watch=False))
+    try:
+        t0 = time.monotonic()
+        started = p.play_scene('day', volume=40)
+        assert time.monotonic() - t0 < 0.05
+        assert started.result(timeout=1) is True
+        assert player_module.wait_until(p.is_playing, 1.0)
+        assert p.get_volume() == 40
+
+        dropped = p.switch_scene('missing')
+        switched = p.switch_scene('night')
+        assert dropped.result(timeout=1) in (True, False)
+        assert switched.result(timeout=1) is True
+        assert player_module.wait_until(lambda: p.current_folder == 'night', 3.0)
+
+        assert p.stop().result(timeout=1) is True
+        assert player_module.wait_until(lambda: not p.is_playing(), 1.0)
+        stats = p.get_playback_metrics()['commands']
+        assert stats['applied'] >= 3 and stats['latency_ms']['count'] >= 3
+    finally:
+        p.shutdown()
+    assert p.set_volume(10).result(0) is False
@@ -43,7 +43,7 @@ def test_crossfade_promotion_and_guard(player_module, monkeypatch):
     if last_id is not None:
         assert guard_until >= time.monotonic() - 0.05
 
-    p.stop(force=True)
+    p.stop().result(timeout=1)
     t.join(timeout=1)
     assert len(recorder.events) >= 1
     # Listener removal not strictly needed; process end clears registry.
@@ -0,0 +1,65 @@
+import threading
+import time
+
+
+def test_playing_track_sleeps_until_deadline_and_wakes_on_end(player_module):
+    Player = player_module.Player
+    wait_until = player_module.wait_until
+
+    p = Player(music_base_dir='.')
+    p._get_song_length = lambda song, player=None: 60.0
+    p.queue = ['a.mp3', 'b.mp3']
+    p.queue_pos = 0
+
+    t = threading.Thread(target=p._play_loop, daemon=True)
+    t.start()
+    try:
+        # now_playing is set just before the main MediaPlayer is acquired.
+        assert wait_until(lambda: p.get_now_playing() == 'a.mp3' and p._player_main is not None, 1.0)
+        first = p._player_main
+        time.sleep(1.5)
+        before = p._status.loop_wakeups
+        time.sleep(1.0)
+        # With events attached the loop only wakes on its idle cap (2s), not every 50 ms.
+        assert p._status.loop_wakeups - before <= 1
+
+        first.finish()
+        assert wait_until(lambda: p.get_now_playing() == 'b.mp3', 0.5)
+    finally:
+        p.stop().result(timeout=1)
+        t.join(timeout=1)
+
+
+def test_wait_until_wakes_on_event(player_module):
+    ev = threading.Event()
+    flag = {'v': False}
+    def flip():
+        flag['v'] = True
+        ev.set()
+    threading.Timer(0.05, flip).start()
+    start = time.monotonic()
+    assert player_module.wait_until(lambda: flag['v'], 2.0, poll=1.0, event=ev)
+    assert time.monotonic() - start < 0.5
+
+
+def test_unindexed_track_is_never_probed_on_the_play_loop(player_module, tmp_path, monkeypatch):
+    import os
+
+    import conftest
+    from vibrae_core.library import SceneLibrary, TrackIndex
+
+    os.makedirs(tmp_path / 'day')
+    (tmp_path / 'day' / 'a.mp3').write_bytes(b'')
+    probed_on = []
+    monkeypatch.setattr(player_module.Player, '_probe_track', lambda self, path: probed_on.append(threading.current_thread().name))
+    monkeypatch.setattr(TrackIndex, 'refresh_async', lambda self, paths: None)  # keep the index cold
+    monkeypatch.setattr(conftest.MockMediaPlayer, 'get_length', lambda self: 0)  # and VLC unsure of the length
+    p = player_module.Player(str(tmp_path), scenes=SceneLibrary(watch=False))
+    try:
+        p.play_scene('day', volume=40)
+        assert player_module.wait_until(lambda: p._player_main is not None and p.now_playing, 2.0)
+        time.sleep(0.2)
+        assert probed_on == []
+        assert p._get_song_length(p.now_playing, p._player_main) == 180.0  # default until indexed
+    finally:
+        p.shutdown()
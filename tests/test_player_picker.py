@@ -0,0 +1,25 @@
+import os
+
+
+def test_picker_skips_same_identity_without_io(player_module, monkeypatch):
+    p = player_module.Player(music_base_dir='.')
+    for path, ident in {'a.mp3': (1, 10), 'a-alias.mp3': (1, 10), 'b.mp3': (1, 11), 'c.mp3': (1, 12)}.items():
+        p._paths.intern(path, ident)
+    p.queue = ['a.mp3', 'a-alias.mp3', 'a.mp3', 'b.mp3', 'c.mp3', 'c.mp3']
+
+    def no_io(*a, **k):
+        raise AssertionError('filesystem call in picker')
+    monkeypatch.setattr(os, 'stat', no_io)
+    monkeypatch.setattr(os.path, 'samefile', no_io)
+    monkeypatch.setattr(os.path, 'realpath', no_io)
+
+    assert p._pick_next_distinct_index(0) == 3
+    assert p._pick_next_distinct_index(1) == 3
+    assert p._pick_next_distinct_index(3) == 4
+    assert p._pick_next_distinct_index(4) == 0  # wraps past the trailing run
+    assert p._same_track('a.mp3', 'a-alias.mp3')
+
+    p.queue = ['b.mp3', 'b.mp3']
+    assert p._pick_next_distinct_index(0) is None
+    p.queue = ['b.mp3', 'c.mp3', 'b.mp3']
+    assert p._pick_next_distinct_index(2) == 1
@@ -0,0 +1,62 @@
+import threading
+
+
+def test_pool_recycles_handles_across_crossfades(player_module):
+    Player = player_module.Player
+    wait_until = player_module.wait_until
+
+    p = Player(music_base_dir='.')
+    p.crossfade_sec = 0.1
+    p.preroll_sec = 0.2
+    p.queue = ['a.mp3', 'b.mp3', 'c.mp3']
+    p.queue_pos = 0
+    starts = []
+    orig_acquire = p._pool.acquire
+    def acquire(path, *args):
+        starts.append(path)
+        return orig_acquire(path, *args)
+    p._pool.acquire = acquire
+
+    t = threading.Thread(target=p._play_loop, daemon=True)
+    t.start()
+    try:
+        assert wait_until(lambda: len(starts) >= 4, 6.0)
+        stats = p.get_pool_stats()
+        assert stats['created'] <= 3
+        assert stats['live'] <= 3
+        assert stats['reused'] >= 1
+    finally:
+        p.stop().result(timeout=1)
+        t.join(timeout=1)
+    p.shutdown()
+    stats = p.get_pool_stats()
+    assert stats['live'] == 0 and stats['in_use'] == 0
+
+
+def test_pool_release_is_idempotent(player_module):
+    from vibrae_core.vlc_pool import MediaPlayerPool
+    import vlc
+    pool = MediaPlayerPool(vlc.Instance(), max_idle=1)
+    a = pool.acquire('a.mp3')
+    b = pool.acquire('b.mp3')
+    pool.release(a)
+    pool.release(a)
+    pool.release(b)  # pool full -> native release
+    assert pool.stats() == {'created': 2, 'released': 1, 'reused': 0, 'live': 1, 'in_use': 0, 'idle': 1}
+    c = pool.acquire('c.mp3')
+    assert c is a and c.path == 'c.mp3'
+
+
+def test_recycled_player_leaves_no_ramp_level_behind(player_module):
+    p = player_module.Player(music_base_dir='.')
+    try:
+        handle = p._pool.acquire('a.mp3')
+        p._ramps.set(handle, 30)
+        assert p._ramps.level(handle) == 30
+        p._recycle(handle)
+        assert id(handle) not in p._ramps._levels
+        # The pooled handle comes back as a fresh player: its ramp starts from its real volume.
+        handle.audio_set_volume(0)
+        assert p._pool.acquire('b.mp3') is handle and p._ramps.level(handle) == 0
+    finally:
+        p.shutdown()
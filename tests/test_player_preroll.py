@@ -0,0 +1,38 @@
+import threading
+
+
+class PathRecorder:
+    def __init__(self):
+        self.songs = []
+    def __call__(self, song, volume=None):
+        self.songs.append(song)
+
+
+def test_next_track_is_prerolled_before_fade(player_module):
+    Player = player_module.Player
+    wait_until = player_module.wait_until
+    recorder = PathRecorder()
+    player_module.register_player_listener(recorder)
+
+    p = Player(music_base_dir='.')
+    p.crossfade_sec = 0.2
+    p.preroll_sec = 0.5
+    p.queue = ['a.mp3', 'b.mp3']
+    p.queue_pos = 0
+
+    t = threading.Thread(target=p._play_loop, daemon=True)
+    t.start()
+    try:
+        assert wait_until(lambda: p._status.preroll_active, 3.0)
+        nxt = p._player_next
+        assert nxt is not None and nxt.path == 'b.mp3'
+        assert wait_until(lambda: nxt.paused_at is not None, 1.0)
+        assert p.get_phase() != player_module.PlayerPhase.CROSSFADE
+
+        assert wait_until(lambda: 'b.mp3' in recorder.songs, 3.0)
+        margin = p.get_preroll_margin()
+        assert margin is not None and margin > 0.2
+    finally:
+        p.stop().result(timeout=1)
+        t.join(timeout=1)
+        player_module.unregister_player_listener(recorder)
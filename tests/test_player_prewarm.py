@@ -0,0 +1,53 @@
+import os
+
+from vibrae_core.library import SceneLibrary
+
+
+def _scene(tmp_path, name, n=5):
+    os.makedirs(tmp_path / name)
+    for i in range(n):
+        (tmp_path / name / f'{name}{i}.mp3').write_bytes(b'')
+
+
+def test_play_uses_prewarmed_queue_and_open_first_track(player_module, tmp_path, monkeypatch):
+    _scene(tmp_path, 'evening')
+    scenes = SceneLibrary(watch=False)
+    p = player_module.Player(str(tmp_path), scenes=scenes)
+    try:
+        assert p.prewarm_scene('evening').result(timeout=3)
+        prepared = p._prepared
+        assert prepared.player is not None and prepared.player.paused_at is not None
+        assert prepared.player.audio_get_volume() == 0
+        # The switch must not touch the folder again.
+        monkeypatch.setattr(scenes, 'iter_entries', lambda *a, **k: (_ for _ in ()).throw(AssertionError('rescanned')))
+
+        p.play_scene('evening', volume=40)
+        assert player_module.wait_until(p.is_playing, 2.0)
+        assert p._player_main is prepared.player
+        assert list(p.queue) == list(prepared.queue) and p.now_playing == prepared.queue[0]
+        metrics = p.get_playback_metrics()['prewarm']
+        assert metrics['used'] == 1 and metrics['pending'] is None
+        assert metrics['last_scene_start_ms'] is not None
+    finally:
+        p.shutdown()
+
+
+def test_prewarm_for_another_scene_stays_pending_and_expires(player_module, tmp_path):
+    _scene(tmp_path, 'day')
+    _scene(tmp_path, 'night')
+    p = player_module.Player(str(tmp_path), scenes=SceneLibrary(watch=False))
+    try:
+        assert not p.prewarm_scene('missing').result(timeout=3)
+        assert p.prewarm_scene('night').result(timeout=3)
+        p.play_scene('day', volume=40)
+        assert player_module.wait_until(p.is_playing, 2.0)
+        assert p._prepared is not None and p._prepared.folder == 'night'
+
+        p.prewarm_ttl = 0.0  # stale by the time it is asked for
+        p.switch_scene('night').result(timeout=2)
+        assert player_module.wait_until(lambda: p.now_playing and '/night/' in p.now_playing, 5.0)
+        stats = p.get_playback_metrics()['prewarm']
+        assert stats['used'] == 0 and stats['discarded'] == 1
+        assert p.get_pool_stats()['in_use'] <= 2
+    finally:
+        p.shutdown()
@@ -0,0 +1,125 @@
+import os
+import time
+
+from vibrae_core.library import SceneLibrary
+
+
+def _scene(tmp_path, name, n=4):
+    os.makedirs(tmp_path / name)
+    for i in range(n):
+        (tmp_path / name / f'{name}{i}.mp3').write_bytes(b'')
+
+
+def test_switch_crossfades_into_new_scene_mid_track(player_module, tmp_path, monkeypatch):
+    import conftest
+    monkeypatch.setattr(conftest.MockMedia, 'duration_ms', 60_000)
+    _scene(tmp_path, 'day')
+    _scene(tmp_path, 'night')
+    p = player_module.Player(str(tmp_path), scenes=SceneLibrary(watch=False))
+    try:
+        p.play_scene('day', volume=40)
+        assert player_module.wait_until(lambda: p.is_playing() and p._player_main is not None, 2.0)
+        old = p._player_main
+
+        t0 = time.monotonic()
+        p.switch_scene('night', fade_sec=0.3).result(timeout=2)
+        # Well before the 60 s track would end on its own.
+        assert player_module.wait_until(lambda: p.now_playing and '/night/' in p.now_playing, 2.0)
+        assert time.monotonic() - t0 < 1.5
+        assert p._player_main is not old and p.current_folder == 'night'
+        assert p.now_playing == p.queue[0]
+
+        switch = p.get_playback_metrics()['switch']
+        assert switch['count'] == 1 and switch['last_ms'] is not None
+        assert 0 <= switch['last_ms'] < 1000
+    finally:
+        p.shutdown()
+
+
+def test_switch_without_fade_waits_for_track_end(player_module, tmp_path):
+    _scene(tmp_path, 'day')
+    _scene(tmp_path, 'night')
+    p = player_module.Player(str(tmp_path), scenes=SceneLibrary(watch=False))
+    p.switch_fade_sec = None
+    p.crossfade_sec = 0.1
+    try:
+        p.play_scene('day', volume=40)
+        assert player_module.wait_until(lambda: p.is_playing() and p._player_main is not None, 2.0)
+        p.switch_scene('night').result(timeout=2)
+        assert '/day/' in p.now_playing
+        assert player_module.wait_until(lambda: p.now_playing and '/night/' in p.now_playing, 4.0)
+        assert p.get_playback_metrics()['switch']['count'] == 1
+    finally:
+        p.shutdown()
+
+
+def _run_until(clock, predicate, limit=30.0, step=0.05):
+    """Advance virtual time until ``predicate`` holds or ``limit`` seconds pass."""
+    end = clock.elapsed() + limit
+    while not predicate():
+        if clock.elapsed() >= end:
+            return False
+        clock.run_for(step)
+    return True
+
+
+def test_switch_during_crossfade_lets_it_finish_then_switches(player_module, sim_clock, tmp_path):
+    import conftest
+    _scene(tmp_path, 'day')
+    _scene(tmp_path, 'night')
+    p = player_module.Player(str(tmp_path), scenes=SceneLibrary(watch=False), clock=sim_clock)
+    p.crossfade_sec = 0.6
+    try:
+        p.play_scene('day', volume=40)
+        assert _run_until(sim_clock, lambda: p._status.crossfade_active)
+        incoming = p._player_next
+        fut = p.switch_scene('night', fade_sec=0.3)
+        assert _run_until(sim_clock, fut.done) and fut.result()
+        # The running crossfade keeps its incoming track.
+        assert p._status.crossfade_active and p._player_next is incoming
+        assert _run_until(sim_clock, lambda: p.now_playing and '/night/' in p.now_playing)
+        assert _run_until(sim_clock, lambda: p._player_main is not None and p._player_main.get_state() == conftest.MockState.Playing)
+        events = p.handoffs.events()
+        assert events and all(ev.next_started for ev in events)
+        assert '/day/' in events[0].to_path
+        assert p.get_playback_metrics()['switch']['count'] == 1
+    finally:
+        p.shutdown()
+
+
+def test_stop_drops_a_deferred_switch(player_module, sim_clock, tmp_path):
+    for name in ('day', 'night', 'eve'):
+        _scene(tmp_path, name)
+    p = player_module.Player(str(tmp_path), scenes=SceneLibrary(watch=False), clock=sim_clock)
+    p.crossfade_sec = 0.6
+    heard = []
+    try:
+        p.play_scene('day', volume=40)
+        assert _run_until(sim_clock, lambda: p._status.crossfade_active)
+        switch = p.switch_scene('night', fade_sec=0.3)
+        assert _run_until(sim_clock, switch.done, step=0.01)
+        assert p._switch_scene_request is not None  # deferred behind the crossfade
+        assert _run_until(sim_clock, p.stop().done, step=0.01)
+        assert p._switch_scene_request is None
+        p.play_scene('eve', volume=40)
+        assert _run_until(sim_clock, lambda: heard.append(p.now_playing) or (p.now_playing and '/eve/' in p.now_playing))
+        sim_clock.run_for(5.0)  # a few more handoffs
+        heard.append(p.now_playing)
+        assert not any(song and '/night/' in song for song in heard)
+        assert p.get_playback_metrics()['switch']['count'] == 0
+    finally:
+        p.shutdown()
+
+
+def test_play_drops_a_switch_requested_while_idle(player_module, sim_clock, tmp_path):
+    _scene(tmp_path, 'day')
+    _scene(tmp_path, 'night')
+    p = player_module.Player(str(tmp_path), scenes=SceneLibrary(watch=False), clock=sim_clock)
+    try:
+        assert _run_until(sim_clock, p.switch_scene('night').done)
+        p.play_scene('day', volume=40)
+        assert _run_until(sim_clock, lambda: p.now_playing is not None)
+        sim_clock.run_for(5.0)
+        assert p.current_folder == 'day' and '/day/' in p.now_playing
+    finally:
+        p.shutdown()
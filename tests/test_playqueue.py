@@ -0,0 +1,52 @@
+from vibrae_core.playqueue import PathTable, PlayQueue
+
+
+def test_queue_reads_like_a_path_list():
+    table = PathTable()
+    q = PlayQueue(table, ['a.mp3', 'b.mp3', 'c.mp3'])
+    assert len(q) == 3 and q
+    assert q[1] == 'b.mp3' and q[-1] == 'c.mp3'
+    assert q[1:] == ['b.mp3', 'c.mp3']
+    assert list(q) == ['a.mp3', 'b.mp3', 'c.mp3']
+    assert q.nbytes == 3 * 4
+    assert not PlayQueue(table)
+
+
+def test_paths_are_interned_across_queues():
+    table = PathTable()
+    a = PlayQueue(table, ['x/' + 'a.mp3', 'b.mp3'])
+    b = PlayQueue(table, ['b.mp3', 'x/a.mp3'])
+    assert len(table) == 2
+    assert a[0] is b[1]
+
+
+def test_shuffle_and_merge_keep_every_track():
+    table = PathTable()
+    paths = [f'{i}.mp3' for i in range(1000)]
+    q = PlayQueue(table, paths)
+    v = q.version
+    q.shuffle()
+    assert q.version > v
+    assert sorted(q) == sorted(paths)
+
+    head = q[:3]
+    q.insert_shuffled([table.intern(f'new{i}.mp3') for i in range(50)], start=3)
+    assert q[:3] == head
+    assert len(q) == 1050
+    new = {f'new{i}.mp3' for i in range(50)}
+    assert sorted(q[3:]) == sorted((set(paths) - set(head)) | new)
+
+
+def test_append_extends_the_run_table_in_place():
+    import random
+    rnd = random.Random(3)
+    q = PlayQueue(PathTable(), ['a.mp3'])
+    q.append('a.mp3')
+    assert q.next_distinct(0) is None
+    runs = q._runs[1]
+    for _ in range(300):
+        q.append(rnd.choice(['a.mp3', 'b.mp3', 'c.mp3']))
+        assert q._runs[1] is runs  # no rebuild
+    incremental = [q.next_distinct(i) for i in range(len(q))]
+    q._runs = None
+    assert incremental == [q.next_distinct(i) for i in range(len(q))]
@@ -0,0 +1,262 @@
+import random
+import types
+from datetime import datetime, timedelta
+
+from vibrae_core.db import Base, SessionLocal, engine
+from vibrae_core.models import Routine, Scene
+import vibrae_core.routine_index as routine_index
+from vibrae_core.routine_index import RoutineIndex, RoutineWindow, find_conflicts
+from vibrae_core.scheduler import Scheduler
+
+WEEKDAYS_ALL = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+def setup_function():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        session.query(Routine).delete()
+        session.query(Scene).delete()
+        session.commit()
+    finally:
+        session.close()
+
+
+def _routine(id, start, end, weekdays='', months='', zone_id=None, scene_id=1):
+    return types.SimpleNamespace(id=id, scene_id=scene_id, zone_id=zone_id, start_time=start, end_time=end,
+                                 weekdays=weekdays, months=months, volume=50)
+
+
+def test_index_agrees_with_first_match_scan():
+    rng = random.Random(7)
+    days, months = WEEKDAYS_ALL, ['jan', 'jun', 'dec']
+    routines = []
+    for i in range(1, 40):
+        start, end = f'{rng.randrange(24):02d}:{rng.choice((0, 15, 30))}', f'{rng.randrange(24):02d}:45'
+        routines.append(_routine(
+            i, start, end,
+            weekdays=','.join(rng.sample(days, rng.randrange(0, 4))),
+            months=','.join(rng.sample(months, rng.randrange(0, 2))),
+            zone_id=rng.choice((None, 2)),
+        ))
+    routines.append(_routine(99, '25:00', '26:00'))  # invalid: never matches
+    index = RoutineIndex(routines, [types.SimpleNamespace(id=1, path='x')])
+
+    def scan(now, zone_id):
+        for r in routines:
+            w = RoutineWindow.compile(r)
+            if r.zone_id == zone_id and w is not None and w.matches(now):
+                return r
+        return None
+
+    t = datetime(2025, 1, 1)
+    while t < datetime(2026, 1, 1):
+        for zone_id in (None, 2, 3):
+            assert index.routine_at(t, zone_id) is scan(t, zone_id), (t, zone_id)
+        t += timedelta(minutes=rng.randrange(7, 97))
+
+
+def test_wrapping_window_uses_day_of_the_current_minute():
+    index = RoutineIndex([_routine(1, '22:00', '06:00', weekdays='fri', months='sep')], [])
+    assert index.routine_at(datetime(2025, 9, 5, 23, 0)) is not None  # Friday night
+    assert index.routine_at(datetime(2025, 9, 5, 1, 0)) is not None  # Friday early morning
+    assert index.routine_at(datetime(2025, 9, 6, 1, 0)) is None  # Saturday: not listed
+    assert index.routine_at(datetime(2025, 10, 3, 23, 0)) is None  # October
+
+
+def test_scheduler_reads_db_only_after_schedule_changes(monkeypatch):
+    session = SessionLocal()
+    try:
+        scene = Scene(name='day', path='day')
+        session.add(scene)
+        session.commit()
+        session.add(Routine(scene_id=scene.id, start_time='08:00', end_time='12:00', weekdays='', months='', volume=40))
+        session.commit()
+        scene_id = scene.id
+    finally:
+        session.close()
+
+    loads = []
+    real_load = RoutineIndex.load.__func__
+    monkeypatch.setattr(RoutineIndex, 'load', classmethod(lambda cls: loads.append(1) or real_load(cls)))
+    sched = Scheduler(types.SimpleNamespace())
+    now = datetime(2025, 9, 9, 13, 0)
+    for _ in range(5):
+        assert sched._get_current_routine_and_scene(now) == (None, None)
+    assert len(loads) == 1
+
+    session = SessionLocal()
+    try:
+        session.add(Routine(scene_id=scene_id, start_time='12:00', end_time='18:00', weekdays='', months='', volume=60))
+        session.commit()
+    finally:
+        session.close()
+    assert sched._get_current_routine_and_scene(now) == (None, None)  # not told yet
+    sched.notify_schedule_changed()
+    routine, scene = sched._get_current_routine_and_scene(now)
+    assert routine.volume == 60 and scene.path == 'day'
+    assert len(loads) == 2
+
+
+def test_next_change_finds_starts_ends_and_month_boundaries():
+    index = RoutineIndex([
+        _routine(1, '08:00', '12:00', weekdays='mon,tue'),
+        _routine(2, '11:00', '13:30', weekdays='tue'),  # overlap: starts when routine 1 ends
+        _routine(3, '09:00', '10:00', zone_id=5),
+    ], [])
+    mon = datetime(2025, 9, 1, 7, 59, 30)
+    assert index.next_change(mon) == datetime(2025, 9, 1, 8, 0)
+    assert index.next_change(datetime(2025, 9, 1, 8, 0)) == datetime(2025, 9, 1, 12, 0)
+    assert index.next_change(datetime(2025, 9, 2, 9, 0)) == datetime(2025, 9, 2, 12, 0)
+    assert index.next_change(datetime(2025, 9, 2, 12, 0)) == datetime(2025, 9, 2, 13, 30)
+    assert index.next_change(datetime(2025, 9, 2, 13, 30)) == datetime(2025, 9, 8, 8, 0)  # next Monday
+    assert index.next_change(datetime(2025, 9, 30, 20, 0)) == datetime(2025, 10, 1)  # month tables differ
+    assert index.next_change(mon, zone_id=5) == datetime(2025, 9, 1, 9, 0)
+    assert index.next_change(mon, zone_id=6) is None
+
+
+def test_scheduler_sleeps_to_boundaries_and_wakes_on_change(sim_clock):
+    class _Player:
+        def __init__(self):
+            self.calls = []
+
+        def is_playing(self):
+            return bool(self.calls) and self.calls[-1][0] == 'play'
+
+        def play_scene(self, path, volume=None):
+            self.calls.append(('play', sim_clock.now(), path))
+
+        def switch_scene(self, path, volume=None):
+            self.calls.append(('switch', sim_clock.now(), path))
+
+        def stop_after_current_or_timeout(self, timeout_sec=300):
+            self.calls.append(('stop', sim_clock.now(), None))
+
+    session = SessionLocal()
+    try:
+        scene = Scene(name='day', path='day')
+        session.add(scene)
+        session.commit()
+        session.add(Routine(scene_id=scene.id, start_time='08:00', end_time='09:00', weekdays='', months='', volume=40))
+        session.commit()
+        scene_id = scene.id
+    finally:
+        session.close()
+
+    p = _Player()
+    sched = Scheduler(p, clock=sim_clock)  # sim clock starts Monday 2025-01-06 00:00
+    try:
+        sched.start()
+        sim_clock.run_to(datetime(2025, 1, 6, 9, 30))
+        assert [k for k, _, _ in p.calls] == ['play', 'stop']
+        for (_, t, _), due in zip(p.calls, (datetime(2025, 1, 6, 8), datetime(2025, 1, 6, 9))):
+            assert due <= t < due + timedelta(seconds=1)
+        ticks_before = sim_clock.advances
+
+        session = SessionLocal()
+        try:
+            session.add(Routine(scene_id=scene_id, start_time='09:00', end_time='11:00', weekdays='', months='', volume=60))
+            session.commit()
+        finally:
+            session.close()
+        sched.notify_schedule_changed()
+        sim_clock.run_for(1)
+        assert p.calls[-1][0] == 'play' and p.calls[-1][1] < datetime(2025, 1, 6, 9, 30, 1)
+        assert sim_clock.advances - ticks_before <= 2
+    finally:
+        sched.stop()
+
+
+def test_overlaps_resolve_by_priority_then_id():
+    routines = [
+        _routine(1, '08:00', '12:00'),
+        types.SimpleNamespace(**vars(_routine(2, '10:00', '14:00')), priority=5),
+        types.SimpleNamespace(**vars(_routine(3, '11:00', '13:00')), priority=5),
+    ]
+    index = RoutineIndex(routines, [])
+    assert index.routine_at(datetime(2025, 9, 9, 9, 0)).id == 1
+    assert index.routine_at(datetime(2025, 9, 9, 10, 30)).id == 2  # outranks the older routine 1
+    assert index.routine_at(datetime(2025, 9, 9, 11, 30)).id == 2  # equal priority: lower id
+    assert index.next_change(datetime(2025, 9, 9, 9, 0)) == datetime(2025, 9, 9, 10, 0)
+
+
+def test_find_conflicts_lists_each_overlapping_pair_once():
+    routines = [
+        _routine(1, '08:00', '12:00', weekdays='mon,tue'),
+        types.SimpleNamespace(**vars(_routine(2, '11:00', '13:00', weekdays='tue,wed')), priority=1),
+        _routine(3, '12:00', '14:00', weekdays='mon'),  # touches routine 1 at 12:00: no overlap
+        _routine(4, '22:00', '09:00', weekdays='mon', months='jan,feb'),  # early hours overlap 1 on Monday
+        _routine(5, '09:00', '10:00', months='jul'),  # overlaps 1; 4 shares no month
+        _routine(6, '08:00', '12:00', weekdays='mon', zone_id=2),  # other zone
+        _routine(7, '09:00', '09:00'),  # empty window
+    ]
+    conflicts = find_conflicts(routines)
+    assert [(c.first, c.second) for c in conflicts] == [(1, 2), (1, 4), (1, 5)]
+    c12, c14 = conflicts[0], conflicts[1]
+    assert c12.winner == 2 and c12.weekdays == ['tue'] and len(c12.months) == 12
+    assert c14.winner == 1 and c14.weekdays == ['mon'] and c14.months == ['jan', 'feb']
+    assert conflicts[2].months == ['jul'] and conflicts[2].weekdays == ['mon', 'tue']
+
+
+def test_find_conflicts_matches_brute_force():
+    rng = random.Random(11)
+    routines = []
+    for i in range(1, 60):
+        start, end = rng.randrange(0, 1440, 30), rng.randrange(0, 1440, 30)
+        routines.append(types.SimpleNamespace(
+            **vars(_routine(i, f'{start // 60:02d}:{start % 60:02d}', f'{end // 60:02d}:{end % 60:02d}',
+                            weekdays=','.join(rng.sample(WEEKDAYS_ALL, rng.randrange(1, 4))),
+                            months=rng.choice(('', 'jan', 'jan,jul', 'dec')), zone_id=rng.choice((None, 1)))),
+            priority=rng.randrange(3)))
+    windows = {r.id: RoutineWindow.compile(r) for r in routines}
+
+    def minutes(r):
+        w = windows[r.id]
+        return set() if w is None else {m for lo, hi in w.week_spans() for m in range(lo, hi)}
+
+    expected = set()
+    for a in routines:
+        for b in routines:
+            if a.id < b.id and a.zone_id == b.zone_id and windows[a.id] and windows[b.id] \
+                    and windows[a.id].months & windows[b.id].months and minutes(a) & minutes(b):
+                expected.add((a.id, b.id))
+    assert {(c.first, c.second) for c in find_conflicts(routines)} == expected
+
+
+def test_forecast_segments_follow_wrapping_windows_and_gaps():
+    scenes = [types.SimpleNamespace(id=1, name='Night', path='night')]
+    index = RoutineIndex([_routine(1, '22:00', '06:00', weekdays='fri,sat')], scenes)
+    segments = index.forecast(datetime(2025, 9, 5, 12, 30, 15), 2)  # Friday 12:30 -> Sunday 12:30
+    assert [(s.start, s.end, s.routine_id) for s in segments] == [
+        (datetime(2025, 9, 5, 12, 30), datetime(2025, 9, 5, 22, 0), None),
+        (datetime(2025, 9, 5, 22, 0), datetime(2025, 9, 6, 6, 0), 1),  # Friday night into Saturday morning
+        (datetime(2025, 9, 6, 6, 0), datetime(2025, 9, 6, 22, 0), None),
+        (datetime(2025, 9, 6, 22, 0), datetime(2025, 9, 7, 0, 0), 1),  # Sunday's early hours are not listed
+        (datetime(2025, 9, 7, 0, 0), datetime(2025, 9, 7, 12, 30), None),
+    ]
+    assert (segments[1].scene_name, segments[1].scene_path, segments[1].volume) == ('Night', 'night', 50)
+
+
+def test_forecast_matches_minute_lookups_across_months(monkeypatch):
+    rng = random.Random(3)
+    routines = [
+        types.SimpleNamespace(**vars(_routine(
+            i, f'{rng.randrange(24):02d}:{rng.randrange(0, 60, 15):02d}', f'{rng.randrange(24):02d}:30',
+            weekdays=','.join(rng.sample(WEEKDAYS_ALL, rng.randrange(0, 5))),
+            months=rng.choice(('', 'jan', 'feb', 'jan,mar')))), priority=rng.randrange(2))
+        for i in range(1, 80)
+    ]
+    index = RoutineIndex(routines, [])
+    start = datetime(2025, 1, 20, 7, 45)
+    for numpy in (routine_index.np, None):
+        monkeypatch.setattr(routine_index, 'np', numpy)
+        segments = index.forecast(start, 40)
+        assert segments[0].start == start and segments[-1].end == start + timedelta(days=40)
+        for prev, seg in zip(segments, segments[1:]):
+            assert prev.end == seg.start and prev.routine_id != seg.routine_id
+        for seg in segments:
+            t = seg.start
+            while t < seg.end:
+                r = index.routine_at(t)
+                assert (r.id if r else None) == seg.routine_id, t
+                t += timedelta(minutes=17)
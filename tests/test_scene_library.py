@@ -0,0 +1,147 @@
+import os
+
+import pytest
+
+from vibrae_core.library import SceneLibrary, scan_audio_files
+
+
+def _touch(path, data=b'x'):
+    path.write_bytes(data)
+
+
+def _wait(predicate, timeout=2.0):
+    import time
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.mark.parametrize('watch', [True, False])
+def test_scene_files_track_additions_and_deletions(tmp_path, watch):
+    _touch(tmp_path / 'a.mp3')
+    _touch(tmp_path / 'b.OGG')
+    _touch(tmp_path / 'notes.txt')
+    lib = SceneLibrary(watch=watch)
+    try:
+        names = lambda: sorted(os.path.basename(p) for p in lib.files(str(tmp_path)))
+        assert names() == ['a.mp3', 'b.OGG']
+
+        _touch(tmp_path / 'c.wav')
+        (tmp_path / 'a.mp3').unlink()
+        assert _wait(lambda: names() == ['b.OGG', 'c.wav'])
+    finally:
+        lib.close()
+
+
+def test_cached_lookup_does_not_relist(tmp_path, monkeypatch):
+    _touch(tmp_path / 'a.mp3')
+    os.symlink(tmp_path / 'a.mp3', tmp_path / 'alias.mp3')
+    lib = SceneLibrary(watch=False)
+    assert lib.files(str(tmp_path)) == [os.path.realpath(tmp_path / 'a.mp3')]
+
+    calls = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, 'scandir', lambda p: calls.append(p) or real_scandir(p))
+    lib.files(str(tmp_path))
+    lib.files(str(tmp_path))
+    assert calls == []
+
+
+def _tree(root):
+    (root / 'artist' / 'album').mkdir(parents=True)
+    _touch(root / 'top.mp3')
+    _touch(root / 'artist' / 'single.ogg')
+    _touch(root / 'artist' / 'album' / 'deep.wav')
+    _touch(root / 'artist' / 'album' / 'cover.jpg')
+
+
+def _names(files):
+    return sorted(os.path.basename(f.path) for f in files)
+
+
+def test_scan_recurses_with_depth_limit(tmp_path):
+    _tree(tmp_path)
+    every = [f for batch in scan_audio_files(str(tmp_path)) for f in batch]
+    assert _names(every) == ['deep.wav', 'single.ogg', 'top.mp3']
+    shallow = [f for batch in scan_audio_files(str(tmp_path), max_depth=1) for f in batch]
+    assert _names(shallow) == ['single.ogg', 'top.mp3']
+    for f in every:
+        st = os.stat(f.path)
+        assert (f.dev, f.ino) == (st.st_dev, st.st_ino)
+
+
+def test_scan_symlink_policies_and_loops(tmp_path):
+    _tree(tmp_path)
+    outside = tmp_path.parent / (tmp_path.name + '-extra')
+    outside.mkdir()
+    _touch(outside / 'linked.mp3')
+    os.symlink(outside, tmp_path / 'linked-dir')
+    os.symlink(tmp_path / 'artist', tmp_path / 'artist' / 'album' / 'loop')
+    os.symlink(tmp_path / 'top.mp3', tmp_path / 'alias.mp3')
+
+    def scan(policy):
+        return _names(f for batch in scan_audio_files(str(tmp_path), symlinks=policy) for f in batch)
+
+    assert scan('follow') == ['deep.wav', 'linked.mp3', 'single.ogg', 'top.mp3']
+    assert scan('files') == ['deep.wav', 'single.ogg', 'top.mp3']
+    assert scan('skip') == ['deep.wav', 'single.ogg', 'top.mp3']
+    with pytest.raises(ValueError):
+        scan('sometimes')
+
+
+def test_scan_streams_batches(tmp_path):
+    for i in range(5):
+        _touch(tmp_path / f'{i}.mp3')
+    it = scan_audio_files(str(tmp_path), batch_size=2)
+    assert len(next(it)) == 2
+    assert sum(len(b) for b in it) == 3
+
+
+@pytest.mark.parametrize('watch', [True, False])
+def test_nested_folder_changes_are_picked_up(tmp_path, watch):
+    _tree(tmp_path)
+    lib = SceneLibrary(watch=watch)
+    try:
+        names = lambda: sorted(os.path.basename(p) for p in lib.files(str(tmp_path)))
+        assert names() == ['deep.wav', 'single.ogg', 'top.mp3']
+        _touch(tmp_path / 'artist' / 'album' / 'new.mp3')
+        (tmp_path / 'other').mkdir()
+        _touch(tmp_path / 'other' / 'x.ogg')
+        assert _wait(lambda: names() == ['deep.wav', 'new.mp3', 'single.ogg', 'top.mp3', 'x.ogg'])
+    finally:
+        lib.close()
+
+
+def test_player_starts_on_first_batch_and_extends_queue(player_module, tmp_path):
+    scene = tmp_path / 'scene'
+    (scene / 'a').mkdir(parents=True)
+    for i in range(5):
+        _touch(scene / 'a' / f'{i}.mp3')
+    p = player_module.Player(str(tmp_path), scenes=SceneLibrary(watch=False, batch_size=2))
+    with p._lock:
+        p._load_and_shuffle('scene')
+        assert len(p.queue) == 2
+    assert _wait(lambda: len(p.queue) == 5)
+    assert sorted(os.path.basename(x) for x in p.queue) == [f'{i}.mp3' for i in range(5)]
+
+
+def test_file_still_being_written_is_not_queued(tmp_path):
+    import time
+    _touch(tmp_path / 'a.mp3')
+    lib = SceneLibrary()
+    if not lib.watching:
+        pytest.skip('inotify unavailable')
+    try:
+        names = lambda: sorted(os.path.basename(p) for p in lib.files(str(tmp_path)))
+        assert names() == ['a.mp3']
+        with open(tmp_path / 'b.mp3', 'wb') as f:
+            f.write(b'partial')
+            f.flush()
+            time.sleep(0.2)  # let the IN_CREATE event land
+            assert names() == ['a.mp3']
+        assert _wait(lambda: names() == ['a.mp3', 'b.mp3'])
+    finally:
+        lib.close()
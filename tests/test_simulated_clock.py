@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from vibrae_core.clock import SimulatedClock
+from vibrae_core.db import Base, SessionLocal, engine
+from vibrae_core.library import SceneLibrary
+from vibrae_core.models import Routine, Scene
+from vibrae_core.scheduler import Scheduler
+
+
+def setup_function():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        session.query(Routine).delete()
+        session.query(Scene).delete()
+        session.commit()
+    finally:
+        session.close()
+
+
+def test_sleepers_wake_in_deadline_order_without_real_waiting():
+    clock = SimulatedClock()
+    woke = []
+
+    def sleeper(sec):
+        clock.sleep(sec)
+        woke.append((sec, clock.elapsed()))
+
+    for sec in (3600, 60, 600):
+        clock.spawn(lambda s=sec: sleeper(s))
+    ev = clock.event()
+    waiter = clock.spawn(lambda: woke.append(('event', clock.wait(ev, 7200), clock.elapsed())))
+    t0 = time.monotonic()
+    clock.run_for(1800)
+    ev.set()
+    clock.run_for(3600)
+    waiter.join(1)
+    assert time.monotonic() - t0 < 2.0
+    assert woke == [(60, 60.0), (600, 600.0), ('event', True, 1800.0), (3600, 3600.0)]
+    assert clock.now() == datetime(2025, 1, 6) + timedelta(seconds=5400)
+
+
+def test_week_of_routines_with_hundreds_of_crossfades(player_module, sim_clock, tmp_path, monkeypatch):
+    import conftest
+    monkeypatch.setattr(conftest.MockMedia, 'duration_ms', 240_000)  # 4 minute tracks
+    for scene in ('day', 'weekend'):
+        os.makedirs(tmp_path / scene)
+        for i in range(6):
+            (tmp_path / scene / f'{scene}{i}.mp3').write_bytes(b'')
+    session = SessionLocal()
+    try:
+        day, weekend = Scene(name='day', path='day'), Scene(name='weekend', path='weekend')
+        session.add_all([day, weekend])
+        session.commit()
+        session.add_all([
+            Routine(scene_id=day.id, start_time='08:00', end_time='12:00',
+                    weekdays='mon,tue,wed,thu,fri', months='', volume=40),
+            Routine(scene_id=weekend.id, start_time='10:00', end_time='13:00',
+                    weekdays='sat,sun', months='', volume=60),
+        ])
+        session.commit()
+    finally:
+        session.close()
+
+    timeline = []
+    player_module.register_player_listener(lambda song, volume=None: timeline.append((sim_clock.now(), song)))
+    p = player_module.Player(str(tmp_path), scenes=SceneLibrary(watch=False), clock=sim_clock)
+    sched = Scheduler(p, clock=sim_clock)
+    t0 = time.monotonic()
+    try:
+        sched.start()
+        sim_clock.run_to(datetime(2025, 1, 13))  # Monday 00:00 -> next Monday
+    finally:
+        sched.stop()
+        p.shutdown()
+    assert time.monotonic() - t0 < 60
+
+    # Reduce the timeline to per-day (first start, last stop, scenes heard).
+    days = {}
+    for at, song in timeline:
+        d = days.setdefault(at.date(), {'start': None, 'stop': None, 'scenes': set()})
+        if song is None:
+            d['stop'] = at
+        else:
+            d['start'] = d['start'] or at
+            d['scenes'].add(os.path.basename(os.path.dirname(song)))
+    assert len(days) == 7
+    for date, d in days.items():
+        weekend = date.weekday() >= 5
+        opens = datetime.combine(date, datetime.min.time()) + timedelta(hours=10 if weekend else 8)
+        closes = opens.replace(hour=13 if weekend else 12)
+        assert d['scenes'] == {'weekend' if weekend else 'day'}
+        assert opens <= d['start'] <= opens + timedelta(seconds=1)  # woken at the boundary, no poll lag
+        # Routine end is a soft stop: the current track finishes (or 5 minutes pass).
+        assert closes <= d['stop'] <= closes + timedelta(minutes=6, seconds=1)
+
+    # Each day's scene was scanned and opened two minutes ahead of its routine.
+    prewarm = p.get_playback_metrics()['prewarm']
+    assert prewarm['prepared'] == prewarm['used'] == 7
+
+    summary = p.handoffs.summary()
+    assert summary['total'] > 300
+    assert summary['by_kind']['crossfade'] == summary['total']
+    assert summary['fade_start_late']['max'] < 0.1
@@ -0,0 +1,124 @@
+import json
+import os
+import time
+from datetime import datetime
+
+from vibrae_core.library import SceneLibrary
+from vibrae_core.snapshot import PlaybackState, SnapshotStore
+from vibrae_core.scheduler import Scheduler
+
+
+def _wait_for(cond, timeout=3.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if cond():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_store_round_trip_and_torn_queue_is_ignored(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'playback.json'))
+    state = PlaybackState(folder='day', queue_pos=1, track='/m/b.mp3', offset=42.5, volume=55,
+                          playing=True, saved_at=1.0)
+    store.save(state, (1, 0), lambda: ['/m/a.mp3', '/m/b.mp3'])
+    assert store.flush(2)
+    loaded = SnapshotStore(store.path).load()
+    assert loaded.queue == ['/m/a.mp3', '/m/b.mp3']
+    assert (loaded.track, loaded.offset, loaded.volume, loaded.playing) == ('/m/b.mp3', 42.5, 55, True)
+    assert not [n for n in os.listdir(tmp_path) if '.tmp.' in n]
+
+    # A queue file from another write generation (crash between the two files) is rejected.
+    with open(store.queue_path, 'w') as fh:
+        json.dump({'version': 1, 'token': 'other', 'paths': ['/m/x.mp3']}, fh)
+    assert SnapshotStore(store.path).load() is None
+
+
+def test_player_resumes_saved_track_and_offset_without_scanning(player_module, tmp_path, monkeypatch):
+    import conftest
+    monkeypatch.setattr(conftest.MockMedia, 'duration_ms', 60_000)
+    os.makedirs(tmp_path / 'day')
+    for i in range(4):
+        (tmp_path / 'day' / f'{i}.mp3').write_bytes(b'')
+    store_path = str(tmp_path / 'data' / 'playback.json')
+
+    p = player_module.Player(str(tmp_path), scenes=SceneLibrary(watch=False), snapshots=SnapshotStore(store_path))
+    p.snapshot_interval = 0.1
+    try:
+        p.play_scene('day', volume=35)
+        assert _wait_for(p.is_playing)
+        time.sleep(0.6)
+        order, track = list(p.queue), p.now_playing
+    finally:
+        p.shutdown()  # keeps the last "playing" snapshot
+    assert p.snapshots.flush(2)
+
+    scenes = SceneLibrary(watch=False)
+    monkeypatch.setattr(scenes, 'iter_entries', lambda *a, **k: (_ for _ in ()).throw(AssertionError('rescanned')))
+    q = player_module.Player(str(tmp_path), scenes=scenes, snapshots=SnapshotStore(store_path))
+    try:
+        t0 = time.monotonic()
+        assert q.resume_from_snapshot() is not None
+        assert _wait_for(q.is_playing, 1.0)
+        assert time.monotonic() - t0 < 1.0
+        assert q.now_playing == track and list(q.queue) == order
+        assert q.current_folder == 'day' and q.current_volume == 35
+        starts = [o for o in q._player_main.get_media().options if o.startswith(':start-time=')]
+        assert starts and float(starts[-1].split('=')[1]) >= 0.3
+        assert q.resumed_folder == 'day'
+    finally:
+        q.shutdown()
+
+
+def test_stopped_snapshot_does_not_resume(player_module, tmp_path):
+    store = SnapshotStore(str(tmp_path / 'playback.json'))
+    store.save(PlaybackState(folder='day', queue_pos=0, track=None, offset=0.0, volume=50,
+                             playing=False, saved_at=1.0), (1, 0), lambda: ['/m/a.mp3'])
+    assert store.flush(2)
+    p = player_module.Player(str(tmp_path), scenes=SceneLibrary(watch=False), snapshots=store)
+    try:
+        assert p.resume_from_snapshot() is None
+        assert p.resumed_folder is None
+    finally:
+        p.shutdown()
+
+
+class _ResumedPlayer:
+    def __init__(self, folder):
+        self.resumed_folder = folder
+        self.calls = []
+
+    def is_playing(self):
+        return True
+
+    def play_scene(self, path, volume=None):
+        self.calls.append(('play', path, volume))
+
+    def switch_scene(self, path, volume=None):
+        self.calls.append(('switch', path, volume))
+
+    def stop_after_current_or_timeout(self, timeout_sec=300):
+        self.calls.append(('stop_after', timeout_sec))
+
+
+def test_scheduler_adopts_matching_resume_and_soft_stops_unscheduled_one():
+    from types import SimpleNamespace as NS
+    scene = NS(id=7, path='day')
+    routine = NS(id=3, volume=40)
+
+    p = _ResumedPlayer('day')
+    sched = Scheduler(p)
+    sched._apply(None, p, routine, scene)
+    assert p.calls == []
+    sched._apply(None, p, routine, scene)  # same routine on later ticks: still nothing to do
+    assert p.calls == []
+
+    p = _ResumedPlayer('day')
+    sched = Scheduler(p)
+    sched._apply(None, p, None, None)
+    assert p.calls == [('stop_after', 300)]
+
+    p = _ResumedPlayer('night')
+    sched = Scheduler(p)
+    sched._apply(None, p, routine, scene)
+    assert p.calls and p.calls[0][1] == 'day'
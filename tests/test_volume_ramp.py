@@ -0,0 +1,69 @@
+import math
+import time
+
+from vibrae_core.ramp import EQUAL_POWER, LINEAR, LOG, RampEngine, curve_value
+
+
+class FakePlayer:
+    def __init__(self, volume=0):
+        self.volume = volume
+        self.history = []
+    def audio_set_mute(self, mute):
+        pass
+    def audio_set_volume(self, v):
+        self.volume = v
+        self.history.append(v)
+    def audio_get_volume(self):
+        return self.volume
+
+
+def test_equal_power_crossfade_keeps_constant_power():
+    for x in (0.0, 0.25, 0.5, 0.75, 1.0):
+        out = curve_value(EQUAL_POWER, 100, 0, x) / 100
+        inn = curve_value(EQUAL_POWER, 0, 100, x) / 100
+        assert math.isclose(out ** 2 + inn ** 2, 1.0, abs_tol=1e-9)
+    # Linear dips to half power in the middle
+    mid = curve_value(LINEAR, 100, 0, 0.5) / 100
+    assert math.isclose(2 * mid ** 2, 0.5)
+
+
+def test_log_curve_endpoints_and_monotonic():
+    values = [curve_value(LOG, 0, 80, x / 10) for x in range(11)]
+    assert values[0] == 0 and values[-1] == 80
+    assert values == sorted(values)
+
+
+def test_engine_runs_ramp_and_reports_jitter():
+    engine = RampEngine(rate_hz=100)
+    p = FakePlayer()
+    ramp = engine.start(p, 60, 0.2, curve=EQUAL_POWER, start_volume=0)
+    assert ramp.wait(1.0)
+    assert p.volume == 60
+    assert p.history == sorted(p.history)
+    stats = engine.stats()
+    assert stats['count'] > 0 and stats['max_ms'] >= stats['p50_ms']
+
+
+def test_new_ramp_interrupts_active_one():
+    engine = RampEngine(rate_hz=100)
+    p = FakePlayer(volume=100)
+    slow = engine.start(p, 0, 5.0)
+    time.sleep(0.05)
+    fast = engine.start(p, 100, 0.05)
+    assert slow.done.is_set() and slow.cancelled
+    assert fast.wait(1.0)
+    assert p.volume == 100
+    assert not engine.is_active(p)
+
+
+def test_close_cancels_ramps_and_stops_the_worker():
+    import pytest
+    engine = RampEngine(rate_hz=100)
+    ramp = engine.start(FakePlayer(), 60, 10.0, start_volume=0)
+    worker = engine._thread
+    engine.close()
+    assert ramp.cancelled and ramp.done.is_set()
+    assert not worker.is_alive()
+    with pytest.raises(RuntimeError):
+        engine.start(FakePlayer(), 60, 0.1)
+    engine.close()  # idempotent
@@ -0,0 +1,121 @@
+import importlib
+import types
+from datetime import datetime
+
+from vibrae_core.db import Base, SessionLocal, engine
+from vibrae_core.models import Routine, Scene, Zone
+from vibrae_core.scheduler import Scheduler
+
+
+def setup_function():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        session.query(Routine).delete()
+        session.query(Scene).delete()
+        session.query(Zone).delete()
+        session.commit()
+    finally:
+        session.close()
+
+
+class _RecordingPlayer:
+    def __init__(self):
+        self.calls = []
+        self.playing = False
+
+    def is_playing(self):
+        return self.playing
+
+    def play_scene(self, path, volume=None):
+        self.calls.append(('play', path, volume))
+        self.playing = True
+
+    def switch_scene(self, path, volume=None):
+        self.calls.append(('switch', path, volume))
+
+    def stop_after_current_or_timeout(self, timeout_sec=300):
+        self.calls.append(('stop_after', timeout_sec))
+
+
+def test_zone_players_share_instance_library_and_scenes(player_module):
+    import vibrae_core.zones as zones_mod
+    zones_mod = importlib.reload(zones_mod)
+    instance = player_module.vlc.Instance()
+    zm = zones_mod.ZoneManager('.', vlc_instance=instance)
+    try:
+        zm.sync([types.SimpleNamespace(id=1, name='bar', audio_device='hw:1'),
+                 types.SimpleNamespace(id=2, name='garden', audio_device=None)])
+        bar, garden = zm.get(1), zm.get(2)
+        assert {z for z, _ in zm.items()} == {None, 1, 2}
+        assert bar._vlc_instance is garden._vlc_instance is zm.default._vlc_instance is instance
+        assert bar.library is garden.library and bar.scenes is garden.scenes
+        assert bar.analyzer is garden.analyzer
+        assert bar.audio_device == 'hw:1' and bar.zone_id == 1
+
+        zm.sync([types.SimpleNamespace(id=1, name='bar', audio_device='hw:2')])
+        assert zm.get(1) is bar and bar.audio_device == 'hw:2'
+        assert zm.get(2) is None and garden._closed
+    finally:
+        zm.shutdown()
+
+
+def test_one_tick_schedules_each_zone_from_its_own_routines():
+    session = SessionLocal()
+    try:
+        bar = Zone(name='bar')
+        day, night = Scene(name='day', path='day'), Scene(name='night', path='night')
+        session.add_all([bar, day, night])
+        session.commit()
+        session.add_all([
+            Routine(scene_id=day.id, start_time='08:00', end_time='20:00', weekdays='', months='', volume=40),
+            Routine(scene_id=night.id, zone_id=bar.id, start_time='10:00', end_time='23:00',
+                    weekdays='', months='', volume=70),
+        ])
+        session.commit()
+        bar_id = bar.id
+    finally:
+        session.close()
+
+    default, bar_player = _RecordingPlayer(), _RecordingPlayer()
+    zones = types.SimpleNamespace(items=lambda: [(None, default), (bar_id, bar_player)])
+    sched = Scheduler(default, zones=zones)
+
+    sched.tick(datetime(2025, 9, 9, 9, 0))
+    assert default.calls == [('play', 'day', 40)]
+    assert bar_player.calls == []
+
+    sched.tick(datetime(2025, 9, 9, 21, 0))
+    assert default.calls[-1] == ('stop_after', 300)
+    assert bar_player.calls == [('play', 'night', 70)]
+
+
+def test_zone_ids_resolve_to_known_zones_and_shutdown_closes_scenes(player_module, monkeypatch, tmp_path):
+    import pytest
+    from fastapi import HTTPException
+
+    import vibrae_core.zones as zones_mod
+    monkeypatch.chdir(tmp_path)  # importing the app configures file logging under ./logs
+    from apps.api.src.vibrae_api import main
+    from apps.api.src.vibrae_api.routes import control
+    from apps.api.src.vibrae_api.routes.zones import resolve_zone
+
+    zones_mod = importlib.reload(zones_mod)
+    zm = zones_mod.ZoneManager('.', vlc_instance=player_module.vlc.Instance())
+    monkeypatch.setattr(main, 'zones', zm)
+    inotify = zm.scenes._inotify
+    try:
+        zm.sync([types.SimpleNamespace(id=3, name='bar', audio_device=None)])
+        assert resolve_zone(None) is None and resolve_zone(0) is None and resolve_zone(3) == 3
+        with pytest.raises(HTTPException) as err:
+            resolve_zone(9)
+        assert err.value.status_code == 422
+        zm.default.current_volume = 35
+        assert control.get_volume(zone=0, user=None) == {'volume': 35}
+        with pytest.raises(HTTPException) as err:
+            control.get_volume(zone=9, user=None)
+        assert err.value.status_code == 422
+    finally:
+        zm.shutdown()
+    assert zm.scenes._inotify is None
+    assert inotify is None or not inotify._thread.is_alive()